@@ -28,9 +28,14 @@ def _setup_api(app: FastAPI = None) -> None:
     from app.routes.jd_load             import  router          as  jd_cv_router
     from app.routes.speech              import  router          as  speech_router
     from app.routes.mail                import  router          as  send_mail
+    from app.routes.jobs                import  router          as  jobs_router
+    from app.routes.llm                 import  router          as  llm_router
     from app.utilities.openAI_helper    import  OpenAIHelper
+    from app.services.ingestion         import  IngestionManager
     # Initialize OpenAI Helper singleton
     OpenAIHelper()
+    # Start the ingestion job heartbeat: fails the jobs left queued/running by a stopped worker
+    IngestionManager()
 
     # Setup CORS to allow Streamlit frontend to call backend
     app.add_middleware(
@@ -43,6 +48,8 @@ def _setup_api(app: FastAPI = None) -> None:
     app.include_router(speech_router, prefix = "/routes/speech")
     app.include_router(jd_router, prefix="/routes/jd")
     app.include_router(cv_router, prefix="/routes/cv")
+    app.include_router(jobs_router, prefix="/routes/jobs")
+    app.include_router(llm_router, prefix="/routes/llm")
     app.include_router(qna_router, prefix = "/routes/qna")
     app.include_router(report_router, prefix="/routes/report")
     app.include_router(jd_cv_router, prefix = "/api")
@@ -1,8 +1,11 @@
 
 
+from typing import List
 from fastapi import APIRouter, HTTPException, File, UploadFile
 from starlette.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from ..utilities.log_manager import LoggingManager
+from ..services.ingestion import IngestionManager
 from ..services import cv_service as cv_service
 import os
 
@@ -51,21 +54,26 @@ def get_cv_by_id(id: str):
         app_logger.error(f"Error in get_cv_by_id: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post(path="", summary="Upload a new CV")
+@router.post(path="", status_code=202, summary="Upload a new CV")
 async def upload_cv(file: UploadFile = File(...)):
-    """ Upload a new CV file (.pdf or .docx)."""
+    """ Upload a new CV file (.pdf or .docx).
+    The file is stored right away and processed in the background, poll /routes/jobs/{job_id} for the progress."""
     app_logger = LoggingManager().get_logger("AppLogger")
     app_logger.debug(f"POST request to upload file: {file.filename}")
     try:
         contents = await file.read()
 
-        new_id = cv_service.upload(
+        # File I/O and the id lock must not block the event loop either
+        new_id = await run_in_threadpool(
+            cv_service.save_upload,
             original_filename=f"{file.filename}",
             file_contents=contents,
             content_type=file.content_type
         )
+        # The job row is written to the metadata database
+        job = await run_in_threadpool(IngestionManager().submit, "cv", new_id, f"{file.filename}", cv_service.ingest)
 
-        return {"id": new_id, "filename": file.filename, "status": "uploaded"}
+        return {"id": new_id, "job_id": job["job_id"], "filename": file.filename, "status": job["status"]}
 
     except ValueError as e:  # Handle bad content type
         app_logger.warn(f"Upload failed (ValueError): {e}")
@@ -75,6 +83,25 @@ async def upload_cv(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {e}")
 
 
+@router.post(path="/bulk", summary="Upload many CVs at once")
+async def bulk_upload_cvs(files: List[UploadFile] = File(...)):
+    """ Upload several CV files (.pdf, .docx or .zip archives of them) and process them together.
+    Returns one result per CV, failed files don't stop the others."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    app_logger.debug(f"POST request to bulk upload {len(files)} file(s)")
+    try:
+        uploads = [(f"{file.filename}", await file.read(), file.content_type) for file in files]
+
+        results = await run_in_threadpool(cv_service.bulk_upload, uploads)
+
+        uploaded = sum(1 for result in results if result["status"] == "uploaded")
+        return {"data": results, "uploaded": uploaded, "failed": len(results) - uploaded}
+
+    except Exception as e:
+        app_logger.error(f"Bulk upload failed (Exception): {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to upload files: {e}")
+
+
 @router.delete(path="/{id}", summary="Delete a CV")
 def delete_cv_by_id(id: str):
     """ Delete a CV file and its metadata by ID."""
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.services.report_generator import ReportGenerator
 
 router = APIRouter()
@@ -7,7 +8,8 @@ service = ReportGenerator()
 @router.get(path="")
 async def report_interview(session_id: str):
     try:
-        result = service.report_interview(session_id)
+        # Blocking LLM calls: keep them off the event loop serving the interview turns
+        result = await run_in_threadpool(service.report_interview, session_id)
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
         return result
@@ -2,7 +2,9 @@
 
 from fastapi import APIRouter, HTTPException, File, UploadFile
 from starlette.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from ..utilities.log_manager import LoggingManager
+from ..services.ingestion import IngestionManager
 from ..services import job_description_service as jd_service
 import os
 
@@ -51,21 +53,26 @@ def get_jd_by_id(id: str):
         app_logger.error(f"Error in get_jd_by_id: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post(path="", summary="Upload a new Job Description")
+@router.post(path="", status_code=202, summary="Upload a new Job Description")
 async def upload_jd(file: UploadFile = File(...)):
-    """ Upload a new JD file (.pdf or .docx)."""
+    """ Upload a new JD file (.pdf or .docx).
+    The file is stored right away and processed in the background, poll /routes/jobs/{job_id} for the progress."""
     app_logger = LoggingManager().get_logger("AppLogger")
     app_logger.debug(f"POST request to upload file: {file.filename}")
     try:
         contents = await file.read()
 
-        new_id = jd_service.upload(
+        # File I/O and the id lock must not block the event loop either
+        new_id = await run_in_threadpool(
+            jd_service.save_upload,
             original_filename=f"{file.filename}",
             file_contents=contents,
             content_type=file.content_type
         )
+        # The job row is written to the metadata database
+        job = await run_in_threadpool(IngestionManager().submit, "jd", new_id, f"{file.filename}", jd_service.ingest)
 
-        return {"id": new_id, "filename": file.filename, "status": "uploaded"}
+        return {"id": new_id, "job_id": job["job_id"], "filename": file.filename, "status": job["status"]}
 
     except ValueError as e:  # Handle bad content type
         app_logger.warn(f"Upload failed (ValueError): {e}")
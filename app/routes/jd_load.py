@@ -1,9 +1,11 @@
 # main.py
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, Query, Response
 from fastapi.middleware.cors import CORSMiddleware # Cần thiết cho việc giao tiếp với React
-from app.services.scan_cv_jd import get_processed_jd_data, get_batch_matching_results
+from fastapi.responses import StreamingResponse
+from app.services.scan_cv_jd import get_processed_jd_data, get_batch_matching_report, stream_batch_matching_results
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 router = APIRouter()
 
@@ -22,7 +24,35 @@ def scan_cv_endpoint():
     return processed_data
 
 @router.get("/batch-match", response_model=List[Dict[str, Any]])
-def batch_match_endpoint(jd_id: str):
-    results = get_batch_matching_results(jd_id=jd_id)
-    return results
+def batch_match_endpoint(
+    response: Response,
+    jd_id: str,
+    top_k: Optional[int] = Query(None, ge=0, description="Only the K best pre-ranked CVs are scored by the LLM"),
+    min_score: Optional[float] = Query(None, ge=0, le=1, description="Only CVs with a pre-rank score >= threshold are scored by the LLM")
+):
+    report = get_batch_matching_report(jd_id=jd_id, top_k=top_k, min_score=min_score)
+    # The body stays a plain list for the frontend, the pre-ranking stats go to the headers
+    response.headers["X-Prerank-Total"] = str(report["prerank"]["total"])
+    response.headers["X-Prerank-Pruned"] = str(report["prerank"]["pruned"])
+    response.headers["Access-Control-Expose-Headers"] = "X-Prerank-Total, X-Prerank-Pruned"
+    return report["results"]
 
+@router.get("/batch-match/stream")
+def batch_match_stream_endpoint(
+    jd_id: str,
+    top_k: Optional[int] = Query(None, ge=0),
+    min_score: Optional[float] = Query(None, ge=0, le=1)
+):
+    """
+    Server-Sent Events variant of /batch-match: one `match` (or `error`) event per CV
+    as soon as it is scored, then a final `summary` event (including the pre-ranking `pruned` count).
+    """
+    def event_stream():
+        for event in stream_batch_matching_results(jd_id=jd_id, top_k=top_k, min_score=min_score):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
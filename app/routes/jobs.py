@@ -0,0 +1,67 @@
+import json
+import time
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from starlette.responses import StreamingResponse
+from ..utilities.log_manager import LoggingManager
+from ..services.ingestion import IngestionManager
+
+router = APIRouter()
+
+@router.get(path="", summary="List ingestion jobs")
+def get_all_jobs(doc_type: Optional[str] = Query(None, description="cv or jd"),
+                 status: Optional[str] = Query(None, description="queued, running, done or failed")):
+    """ List the background CV/JD ingestion jobs, newest first."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    app_logger.debug(f"Get ingestion jobs (doc_type={doc_type}, status={status}).")
+    return {"data": IngestionManager().list_jobs(doc_type=doc_type, status=status)}
+
+
+@router.get(path="/{job_id}", summary="Get an ingestion job status")
+def get_job_by_id(job_id: str):
+    """ Stage, per-stage timings and error of an upload's ingestion job."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    app_logger.debug(f"GET request for job ID: {job_id}")
+    job = IngestionManager().get(job_id)
+    if not job:
+        app_logger.warn(f"Job not found: {job_id}")
+        raise HTTPException(status_code=404, detail=f"No ingestion job with id: {job_id}")
+    return job
+
+
+@router.get(path="/{job_id}/stream", summary="Stream an ingestion job progress")
+async def stream_job_by_id(job_id: str, interval: float = Query(0.25, gt=0, le=5),
+                           timeout: float = Query(600, gt=0, le=3600, description="Seconds before the stream ends with a `timeout` event")):
+    """ Server-Sent Events: a `progress` event with the job every time its stage or page progress changes,
+    then a final `done` or `failed` event, or a `timeout` event with the last job state after `timeout` seconds."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    app_logger.debug(f"Stream request for job ID: {job_id}")
+    # Job rows are read from the metadata database: off the event loop
+    if not await asyncio.to_thread(IngestionManager().get, job_id):
+        app_logger.warn(f"Job not found: {job_id}")
+        raise HTTPException(status_code=404, detail=f"No ingestion job with id: {job_id}")
+
+    async def event_stream():
+        version = None
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(IngestionManager().get, job_id)
+            if not job:
+                return
+            if job["status"] in ("done", "failed"):
+                yield f"event: {job['status']}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                return
+            if job["version"] != version:
+                version = job["version"]
+                yield f"event: progress\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
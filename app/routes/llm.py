@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from ..utilities.log_manager import LoggingManager
+from ..utilities.llm_scheduler import LLMScheduler
+from ..utilities.llm_resilience import LLMResilience
+
+router = APIRouter()
+
+@router.get(path="/stats", summary="LLM scheduler and resilience metrics")
+def get_llm_stats():
+    """ Per priority class (interactive, report, batch): queue depth, running calls, wait times and preempted calls;
+    plus the retry / throttling / circuit breaker counters of the LLM calls."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    app_logger.debug("Get LLM scheduler stats.")
+    return {"scheduler": LLMScheduler().stats(), "resilience": LLMResilience().stats()}
@@ -1,8 +1,9 @@
+import json
 import asyncio
 
 from pydantic                   import BaseModel
 from fastapi                    import APIRouter, status
-from fastapi.responses          import JSONResponse
+from fastapi.responses          import JSONResponse, StreamingResponse
 from ..utilities.log_manager    import LoggingManager
 from ..services                 import qna_session_mgr        as qna_smgr
 from ..services                 import qna_generator          as qna_svc
@@ -40,13 +41,13 @@ async def handle_interview_begin_session(param_in: InterviewStartRequest):
     }
 
     app_logger = LoggingManager().get_logger("AppLogger")
-    svc_resp = qna_svc.handle_initialize_interview(param_in.jd_id, param_in.cv_id)
+    svc_resp = await qna_svc.ahandle_initialize_interview(param_in.jd_id, param_in.cv_id)
     if not svc_resp:
         result["error"] = f"Failed to initialize interview session"
         app_logger.error(result["error"])
         return JSONResponse(content = result, status_code = status.HTTP_400_BAD_REQUEST)
 
-    qna_session_mgr = qna_smgr.SessionManager().get_session(svc_resp["session_id"])
+    qna_session_mgr = await qna_smgr.SessionManager().aget_session(svc_resp["session_id"])
     app_logger.info(f'Initializing interview session for session_id: {svc_resp["session_id"]}')
     if not qna_session_mgr:
         result["error"] = f'Session ID {svc_resp["session_id"]} not found.'
@@ -61,15 +62,11 @@ async def handle_interview_begin_session(param_in: InterviewStartRequest):
 #       Process Interview Answer
 # =======================================
 @router.post("/answer")
-def handle_interview_answer_submission(param_in: InterviewAnswerRequest):
+async def handle_interview_answer_submission(param_in: InterviewAnswerRequest):
     """
     Submit answer for the current question in the interview session
+    The LLM call is awaited on the event loop, so concurrent sessions don't hold a threadpool worker each
     """
-    qna_session_mgr = qna_smgr.SessionManager().get_session(param_in.session_id)
-    if not qna_session_mgr:
-        app_logger.error(f"Session ID {param_in.session_id} not found.")
-        return JSONResponse(content = result, status_code = status.HTTP_404_NOT_FOUND)
-
     result: dict = {
         "role": "ai",
         "reply": None,
@@ -81,21 +78,27 @@ def handle_interview_answer_submission(param_in: InterviewAnswerRequest):
     }
 
     app_logger = LoggingManager().get_logger("AppLogger")
+    qna_session_mgr = await qna_smgr.SessionManager().aget_session(param_in.session_id)
+    if not qna_session_mgr:
+        result["error"] = f"Session ID {param_in.session_id} not found."
+        app_logger.error(result["error"])
+        return JSONResponse(content = result, status_code = status.HTTP_404_NOT_FOUND)
+
     app_logger.info(f"Submitting answer for session_id: {param_in.session_id}")
     if qna_session_mgr["phase"] == qna_smgr.SessionPhase.UNKNOWN:
-        svc_resp = qna_svc.handle_start_interview(param_in.session_id, param_in.answer)
+        svc_resp = await qna_svc.ahandle_start_interview(param_in.session_id, param_in.answer)
         err_msg = "Failed to start interview session or generate questions bank"
     elif qna_session_mgr["phase"] == qna_smgr.SessionPhase.INTRO:
-        svc_resp = qna_svc.handle_readniess_interview(param_in.session_id, param_in.answer)
+        svc_resp = await qna_svc.ahandle_readniess_interview(param_in.session_id, param_in.answer)
         err_msg = "Failed to ask the candidate's readniess"
     elif qna_session_mgr["phase"] == qna_smgr.SessionPhase.READINESS:
-        svc_resp = qna_svc.handle_readniess_interview(param_in.session_id, param_in.answer)
+        svc_resp = await qna_svc.ahandle_readniess_interview(param_in.session_id, param_in.answer)
         err_msg = "Failed to evaluate the candidate's readniess"
     elif qna_session_mgr["phase"] == qna_smgr.SessionPhase.INTERVIEW:
-        svc_resp = qna_svc.handle_qna_interview(param_in.session_id, param_in.answer)
+        svc_resp = await qna_svc.ahandle_qna_interview(param_in.session_id, param_in.answer)
         err_msg = "Failed to continious the candidate's interview"
     elif qna_session_mgr["phase"] == qna_smgr.SessionPhase.WARMUP:
-        svc_resp = qna_svc.handle_warmup_interview(param_in.session_id, param_in.answer)
+        svc_resp = await qna_svc.ahandle_warmup_interview(param_in.session_id, param_in.answer)
         err_msg = "Failed to continious the candidate's warm-up"
     else:
         result["error"] = f"UNKNOWN the phase for interviewing session ID: {param_in.session_id}"
@@ -105,11 +108,64 @@ def handle_interview_answer_submission(param_in: InterviewAnswerRequest):
         result["error"] = err_msg
         return JSONResponse(content = result, status_code = status.HTTP_400_BAD_REQUEST)
 
+    # The turn saved an updated copy of the session
+    qna_session_mgr = await qna_smgr.SessionManager().aget_session(param_in.session_id) or qna_session_mgr
     result["reply"]                   = svc_resp
     result["question"]["total"]       = qna_session_mgr["question"]["total"]
     result["question"]["current_idx"] = qna_session_mgr["question"]["current"]
     return JSONResponse(content = result, status_code = status.HTTP_200_OK)
 
+# =======================================
+#       Stream Interview Answer
+# =======================================
+@router.post("/answer/stream")
+async def handle_interview_answer_stream(param_in: InterviewAnswerRequest):
+    """
+    Submit answer like /answer, but the reply is streamed as Server-Sent Events:
+    `delta` events with the assistant's text as it is generated ({"text": ...}),
+    then `done` with the same payload as /answer once the session is updated, or `failed` with its error
+    """
+    result: dict = {
+        "role": "ai",
+        "reply": None,
+        "question": {
+            "total": None,
+            "current": None,
+        },
+        "error": None
+    }
+
+    app_logger = LoggingManager().get_logger("AppLogger")
+    if not await qna_svc.acan_stream_turn(param_in.session_id):
+        result["error"] = f"Session ID {param_in.session_id} not found or in an UNKNOWN phase."
+        app_logger.error(result["error"])
+        return JSONResponse(content = result, status_code = status.HTTP_404_NOT_FOUND)
+
+    app_logger.info(f"Streaming answer for session_id: {param_in.session_id}")
+    async def event_stream():
+        async for event in qna_svc.astream_interview_turn(param_in.session_id, param_in.answer):
+            if "delta" in event:
+                yield f"event: delta\ndata: {json.dumps({'text': event['delta']}, ensure_ascii=False)}\n\n"
+                continue
+
+            if not event["reply"]:
+                result["error"] = f"Failed to process the candidate's answer for session ID: {param_in.session_id}"
+                app_logger.error(result["error"])
+                yield f"event: failed\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+                return
+
+            qna_session_mgr = await qna_smgr.SessionManager().aget_session(param_in.session_id) or {"question": {}}
+            result["reply"]                   = event["reply"]
+            result["question"]["total"]       = qna_session_mgr["question"].get("total")
+            result["question"]["current_idx"] = qna_session_mgr["question"].get("current")
+            yield f"event: done\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # =======================================
 #       Terminate Interview Session
 # =======================================
@@ -118,11 +174,6 @@ def handle_terminate_interview_session(session_id: str = None):
     """
     Delete interview session
     """
-    qna_session_mgr = qna_smgr.SessionManager().get_session(session_id)
-    if not qna_session_mgr:
-        app_logger.error(f"Session ID {session_id} not found.")
-        return JSONResponse(content = result, status_code = status.HTTP_400_BAD_REQUEST)
-
     result: dict = {
         "role": "ai",
         "reply": None,
@@ -131,6 +182,12 @@ def handle_terminate_interview_session(session_id: str = None):
     }
 
     app_logger = LoggingManager().get_logger("AppLogger")
+    qna_session_mgr = qna_smgr.SessionManager().get_session(session_id)
+    if not qna_session_mgr:
+        result["error"] = f"Session ID {session_id} not found."
+        app_logger.error(result["error"])
+        return JSONResponse(content = result, status_code = status.HTTP_400_BAD_REQUEST)
+
     app_logger.info(f"Deleting interview session for session_id: {session_id}")
     deleted = qna_smgr.SessionManager().delete_session(session_id)
     result["deleted"] = deleted
@@ -139,4 +196,13 @@ def handle_terminate_interview_session(session_id: str = None):
         return JSONResponse(content = result, status_code = status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     app_logger.info(f"The interview session {session_id} has been deleted: {deleted}")
-    return JSONResponse(content = result, status_code = status.HTTP_200_OK)
\ No newline at end of file
+    return JSONResponse(content = result, status_code = status.HTTP_200_OK)
+# =======================================
+#       Interview Session Store Stats
+# =======================================
+@router.get("/sessions/stats")
+def handle_session_stats():
+    """
+    Live sessions, approximate memory, bounds and evictions
+    """
+    return JSONResponse(content = qna_smgr.SessionManager().stats(), status_code = status.HTTP_200_OK)
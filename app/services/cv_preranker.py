@@ -0,0 +1,214 @@
+import re
+import json
+import math
+import datetime
+
+from collections import Counter
+from typing      import List, Dict, Any, Optional, Tuple
+
+__all__ = ["prerank_cvs", "score_cv_locally"]
+
+# =======================================================
+# 1. Config
+# =======================================================
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Weight of each signal in the final pre-rank score (sum = 1)
+SCORE_WEIGHTS = {
+    "skills": 0.4,
+    "bm25": 0.3,
+    "experience": 0.2,
+    "education": 0.1,
+}
+
+# Education ranking, matched as sub-strings of the lower-cased degree / studyType
+EDUCATION_LEVELS = [
+    (4, ("tiến sĩ", "tien si", "phd", "ph.d", "doctor")),
+    (3, ("thạc sĩ", "thac si", "master", "mba", "msc")),
+    (2, ("đại học", "dai hoc", "cử nhân", "cu nhan", "kỹ sư", "ky su", "bachelor", "engineer", "university", "bsc")),
+    (1, ("cao đẳng", "cao dang", "college", "associate", "diploma")),
+]
+
+_TOKEN_RE = re.compile(r"[\w+#]+(?:\.[\w+#]+)*", re.UNICODE)
+_PRESENT_WORDS = ("present", "now", "current", "hiện tại", "nay")
+
+# =======================================================
+# 2. Text helpers
+# =======================================================
+def _tokenize(text: str) -> List[str]:
+    """Lower-case word tokens that keep technical names such as `c++`, `c#` or `node.js` intact."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+def _flatten_text(node: Any) -> str:
+    """Concatenate every string value of a parsed JSON document."""
+    if isinstance(node, dict):
+        return " ".join(_flatten_text(value) for value in node.values())
+    if isinstance(node, list):
+        return " ".join(_flatten_text(value) for value in node)
+    return str(node) if isinstance(node, (str, int, float)) else ""
+
+def _education_level(text: Optional[str]) -> int:
+    text = (text or "").lower()
+    for level, names in EDUCATION_LEVELS:
+        if any(name in text for name in names):
+            return level
+    return 0
+
+def _parse_date(value: Optional[str], today: datetime.date) -> Optional[datetime.date]:
+    if not value or any(word in str(value).lower() for word in _PRESENT_WORDS):
+        return today
+    parts = re.findall(r"\d+", str(value))
+    if not parts or len(parts[0]) != 4:
+        return None
+    try:
+        return datetime.date(int(parts[0]), int(parts[1]) if len(parts) > 1 else 1, 1)
+    except ValueError:
+        return None
+
+def _years_of_experience(cv: Dict[str, Any], today: datetime.date) -> float:
+    """Total years covered by the CV's work entries, overlapping periods counted once."""
+    periods = []
+    for work in cv.get("work") or []:
+        if not isinstance(work, dict):
+            continue
+        start = _parse_date(work.get("startDate"), today) if work.get("startDate") else None
+        end = _parse_date(work.get("endDate"), today)
+        if start and end and end > start:
+            periods.append((start, end))
+
+    total_days, last_end = 0, None
+    for start, end in sorted(periods):
+        if last_end and start < last_end:
+            start = last_end
+        if end > start:
+            total_days += (end - start).days
+            last_end = end
+    return total_days / 365.25
+
+# =======================================================
+# 3. JD criteria
+# =======================================================
+def _jd_criteria(job_summary: Dict[str, Any]) -> Dict[str, Any]:
+    criteria = job_summary.get("match_criteria") or {}
+
+    skills = []
+    for skill in criteria.get("skills") or []:
+        tokens = _tokenize(skill.get("name", "")) if isinstance(skill, dict) else []
+        if tokens:
+            weight = float(skill.get("weight") or 3)
+            # Mandatory skills count twice as much as preferred ones
+            skills.append((tokens, weight * (2 if skill.get("level") == "mandatory" else 1)))
+
+    query = []
+    for tokens, weight in skills:
+        query.extend(tokens * max(1, round(weight)))
+    for keyword in criteria.get("keywords") or []:
+        query.extend(_tokenize(keyword))
+    for cert in criteria.get("certifications") or []:
+        if isinstance(cert, dict):
+            query.extend(_tokenize(cert.get("name", "")))
+
+    education_required = max(
+        (_education_level(edu.get("degree")) for edu in criteria.get("education") or [] if isinstance(edu, dict)),
+        default=0
+    )
+    return {
+        "skills": skills,
+        "query": query,
+        "min_years": float((criteria.get("experience") or {}).get("min_years") or 0),
+        "education_level": education_required,
+    }
+
+# =======================================================
+# 4. Scoring
+# =======================================================
+def _bm25_scores(query: List[str], docs: List[List[str]]) -> List[float]:
+    if not query or not docs:
+        return [0.0] * len(docs)
+
+    avg_len = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    doc_freq = Counter()
+    for doc in docs:
+        doc_freq.update(set(doc))
+    query_tf = Counter(query)
+
+    scores = []
+    for doc in docs:
+        term_freq = Counter(doc)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+        score = 0.0
+        for term, q_weight in query_tf.items():
+            tf = term_freq.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += q_weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+def score_cv_locally(cv: Dict[str, Any], criteria: Dict[str, Any], cv_tokens: List[str], today: datetime.date) -> Dict[str, float]:
+    """Structured (non-BM25) signals of a parsed CV against the JD criteria, each in [0, 1]."""
+    token_set = set(cv_tokens)
+
+    skills_total = sum(weight for _, weight in criteria["skills"])
+    skills_hit = sum(weight for tokens, weight in criteria["skills"] if all(tok in token_set for tok in tokens))
+    years = _years_of_experience(cv, today)
+    cv_education = max((_education_level(edu.get("studyType")) for edu in cv.get("education") or [] if isinstance(edu, dict)), default=0)
+
+    return {
+        "skills": skills_hit / skills_total if skills_total else 1.0,
+        "experience": min(1.0, years / criteria["min_years"]) if criteria["min_years"] else 1.0,
+        "education": 1.0 if cv_education >= criteria["education_level"] else 0.5 * cv_education / criteria["education_level"],
+        "years": round(years, 1),
+    }
+
+def prerank_cvs(cv_list: List[Dict[str, Any]], job_summary: Dict[str, Any],
+                top_k: Optional[int] = None, min_score: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Deterministic local pre-ranking of CVs (the parsed JSON documents, as returned by `DocumentRepository("cv").all()`) against the JD `match_criteria`.
+    Combines BM25 over the whole CV JSON with skill coverage, years of experience and education level rules.
+    Keeps the CVs whose score is >= `min_score` (0..1), then at most the `top_k` best ones.
+
+    Returns:
+        (selected CVs in their original order, stats {"total", "selected", "pruned", "ranking": [...]})
+    """
+    today = datetime.date.today()
+    criteria = _jd_criteria(job_summary)
+
+    parsed, docs = [], []
+    for cv_data in cv_list:
+        try:
+            cv = json.loads(cv_data["content"]) if isinstance(cv_data["content"], str) else cv_data["content"]
+        except json.JSONDecodeError:
+            cv = {}
+        parsed.append(cv if isinstance(cv, dict) else {})
+        docs.append(_tokenize(_flatten_text(cv)))
+
+    bm25 = _bm25_scores(criteria["query"], docs)
+    bm25_max = max(bm25, default=0.0) or 1.0
+
+    ranking = []
+    for idx, (cv_data, cv, tokens) in enumerate(zip(cv_list, parsed, docs)):
+        signals = score_cv_locally(cv, criteria, tokens, today)
+        signals["bm25"] = bm25[idx] / bm25_max
+        score = sum(SCORE_WEIGHTS[name] * signals[name] for name in SCORE_WEIGHTS)
+        ranking.append({"cv_id": cv_data["id"], "index": idx, "score": round(score, 4), **{k: round(v, 4) for k, v in signals.items()}})
+
+    # Ties are broken by the original order to stay deterministic
+    ranking.sort(key=lambda item: (-item["score"], item["index"]))
+    kept = [item for item in ranking if min_score is None or item["score"] >= min_score]
+    if top_k is not None:
+        kept = kept[:max(0, top_k)]
+    kept_idx = {item["index"] for item in kept}
+    for item in ranking:
+        item["selected"] = item["index"] in kept_idx
+
+    selected = [cv_data for idx, cv_data in enumerate(cv_list) if idx in kept_idx]
+    return selected, {
+        "total": len(cv_list),
+        "selected": len(selected),
+        "pruned": len(cv_list) - len(selected),
+        "ranking": ranking,
+    }
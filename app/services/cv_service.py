@@ -1,10 +1,18 @@
 import datetime
+import io
 import os
+import zipfile
+import multiprocessing
 from pathlib import Path
-from app.utilities.csv_utils import CsvUtils
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from app.utilities.metadata_store import create_metadata_store
+from app.utilities.match_cache import MatchCache
+from app.utilities.extraction_cache import ExtractionCache, file_hash
+from app.services.document_repository import DocumentRepository
+from app.services.document_index import write_document_json, metadata_row
 import app.utilities.content_2_json as Content2Json
 import app.utilities.text_extraction_utils as TextractUtils
-import json
 from dotenv import load_dotenv
 from data.schema import CV_SCHEMA
 
@@ -24,11 +32,13 @@ META_DATA_FILE_PATH = UPLOAD_DIRECTORY / "cv_file.csv"
 # Schema: "id" is the unique UUid, "name" is the original uploaded filename
 DATA_SCHEMA = ["id", "name","uploadBy","uploadDate"]
 
-# Initialize the CSV handler with the absolute path
+# Initialize the metadata store (METADATA_BACKEND: sqlite by default, csv for the legacy file)
 try:
-    csv_handler = CsvUtils(str(META_DATA_FILE_PATH), DATA_SCHEMA)
+    metadata_store = create_metadata_store("cv", DATA_SCHEMA, META_DATA_FILE_PATH)
+    # Persisted CV-NNN counter; seeded from the metadata and the files already in the upload directory
+    id_allocator = metadata_store.id_allocator("CV", extra_ids=lambda: (path.stem for path in UPLOAD_DIRECTORY.iterdir()))
 except Exception as e:
-    print(f"Error initializing CsvUtils: {e}")
+    print(f"Error initializing the metadata store: {e}")
     print("Please ensure the path is correct and within a /data directory.")
     # In a real app, you'd exit or handle this more gracefully
     exit(1)
@@ -43,22 +53,23 @@ ALLOWED_CONTENT_TYPES = [
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document"  # docx
 ]
 
-
-# --- Helper Function ---
-def _convert_dict_to_list(data: list[dict]) -> list[list]:
-    """Converts a list of dicts back to a list of lists for writing."""
-    new_list_of_lists = []
-    for row_dict in data:
-        # Ensure order is maintained using the schema
-        new_row = [row_dict.get(key, "") for key in DATA_SCHEMA]
-        new_list_of_lists.append(new_row)
-    return new_list_of_lists
+# Bulk upload: ZIP archives are expanded, members get their content type from the extension
+ZIP_CONTENT_TYPES = ["application/zip", "application/x-zip-compressed"]
+EXTENSION_CONTENT_TYPES = {"pdf": ALLOWED_CONTENT_TYPES[0], "docx": ALLOWED_CONTENT_TYPES[1]}
+# Processes extracting text in parallel (default: one per CPU) and concurrent LLM structuring calls
+BULK_EXTRACT_PROCESSES = int(os.getenv("BULK_EXTRACT_PROCESSES") or os.cpu_count() or 2)
+BULK_STRUCTURE_CONCURRENCY = int(os.getenv("BULK_STRUCTURE_CONCURRENCY", "4"))
+# Largest ZIP member that gets decompressed (bytes)
+BULK_MAX_FILE_SIZE = int(os.getenv("BULK_MAX_FILE_SIZE", str(20 * 1024 * 1024)))
+# Files and decompressed bytes a bulk upload may reach: an archive that goes past them is rejected
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "500"))
+BULK_MAX_TOTAL_SIZE = int(os.getenv("BULK_MAX_TOTAL_SIZE", str(500 * 1024 * 1024)))
 
 
 # --- Core Functions ---
 def get_all() -> list[dict]:
     """ 
-    Get all CV metadata from the CSV file.
+    Get all CV metadata from the metadata store.
 
     Returns:
         list[dict]: A list of dictionaries, e.g., 
@@ -66,7 +77,7 @@ def get_all() -> list[dict]:
     """
     print("--- Getting all CVs ---")
     try:
-        return csv_handler.read_from_csv()
+        return metadata_store.get_all()
     except FileNotFoundError:
         print("CV metadata file not found. Returning empty list.")
         return []
@@ -90,9 +101,7 @@ def get_by_id(id: str) -> tuple[Path, str]:
                            or if the file itself is missing.
     """
     print(f"--- Getting CV by id: {id} ---")
-    all_cvs = get_all()
-
-    cv_meta = next((cv for cv in all_cvs if cv.get("id") == id), None)
+    cv_meta = metadata_store.get(id)
 
     if not cv_meta:
         raise FileNotFoundError(f"No metadata found for CV with id: {id}")
@@ -111,12 +120,11 @@ def get_by_id(id: str) -> tuple[Path, str]:
     return file_path,original_filename
 
 
-def upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
+def save_upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
     """ 
-    Uploads a CV file.
-    1. Determines the next sequential ID (e.g., CV-001).
+    Stores an uploaded CV file without processing it (see `ingest`).
+    1. Allocates the next sequential ID (e.g., CV-001), unique across workers.
     2. Saves the file to the upload directory with that new id.
-    3. Updates the CSV metadata file.
 
     Args:
         original_filename (str): The original name of the file (e.g., "job.pdf").
@@ -128,73 +136,240 @@ def upload(original_filename: str, file_contents: bytes, content_type: str) -> s
 
     Raises:
         ValueError: If the content type is not allowed.
-        Exception: If file saving or metadata update fails.
+        Exception: If file saving fails.
     """
     print(f"--- Uploading file: {original_filename} ---")
 
     if content_type not in ALLOWED_CONTENT_TYPES:
         raise ValueError(f"File type not allowed: {content_type}")
 
-    try:
-        all_cvs_data = get_all()  # This is list[dict]
-    except Exception as e:
-        raise Exception(f"Failed to read existing metadata: {e}")
-
-    last_id_num = 0
-    if all_cvs_data:
-        for cv in all_cvs_data:
-            current_id_str = cv.get('id', '')
-            if current_id_str.startswith('CV-'):
-                try:
-                    num_part = int(current_id_str.split('-')[-1])
-                    if num_part > last_id_num:
-                        last_id_num = num_part
-                except (ValueError, IndexError):
-                    print(f"Warning: Skipping malformed ID: {current_id_str}")
-                    pass
-
-    next_id_num = last_id_num + 1
-    new_id = f"CV-{next_id_num:03d}"
+    new_id = id_allocator.next_id()
     print(f"Generated new ID: {new_id}")
 
     file_extension = original_filename.split(".")[-1]
     save_path = UPLOAD_DIRECTORY / f"{new_id}.{file_extension}"
 
     try:
-        with open(save_path, 'wb') as f:
+        # 'xb' never overwrites: a clash means the id counter is out of sync, fail instead of losing a file
+        with open(save_path, 'xb') as f:
             f.write(file_contents)
         print(f"File saved to: {save_path}")
     except IOError as e:
         raise Exception(f"Failed to save file: {e}")
 
-    try:
-        # Create JSON DATA FILE
-        now = datetime.datetime.now().strftime("%Y%m%d%H:%M:%S")
-        json_content = __extract_data_to_json__( file_id=new_id, file_name=original_filename, time=now)
-        data_to_write = _convert_dict_to_list(all_cvs_data)
-        data_to_write.append([new_id, original_filename, json_content['metadata']['uploaded_by'], now])
-        csv_handler.write_to_csv(data_to_write)
-        print(f"Successfully added metadata for id: {new_id}")
+    return new_id
 
-        return new_id
+
+def ingest(file_id: str, original_filename: str, on_stage: Callable[[str], None] = None,
+           on_progress: Callable[[dict], None] = None) -> dict:
+    """ 
+    Processes a CV file saved by `save_upload`:
+    1. extracting: reads the text of the PDF/DOCX (OCR if needed).
+    2. structuring: converts the text to JSON following CV_SCHEMA with the LLM.
+    3. indexing: writes the JSON file and the metadata row, refreshes the caches.
+    The saved files are rolled back if any stage fails.
+
+    Args:
+        file_id (str): The id returned by `save_upload`.
+        original_filename (str): The original name of the file.
+        on_stage (Callable[[str], None]): Called with the stage name when each stage starts.
+        on_progress (Callable[[dict], None]): Called with each extracted page (without its text), see
+            TextractUtils.iter_text_from_file; once with every page and source "cache" when the text was cached.
+
+    Returns:
+        dict: The structured JSON content.
+    """
+    on_stage = on_stage or (lambda stage: None)
+    now = datetime.datetime.now().strftime("%Y%m%d%H:%M:%S")
+    try:
+        on_stage("extracting")
+        file_sha = _file_hash(file_id, original_filename)
+        file_contents = _extract_text(file_id, original_filename, file_sha, on_progress)
+        on_stage("structuring")
+        json_content = _structure_text(file_id, original_filename, now, file_contents, file_sha)
+        on_stage("indexing")
+        _index_document(file_id, original_filename, now, json_content)
+        return json_content
 
     except Exception as e:
-        # Attempt to roll back: delete the file we just saved
-        print(f"Error updating metadata: {e}. Rolling back file save...")
-        if save_path.exists():
+        print(f"Error processing {file_id}: {e}. Rolling back file save...")
+        rollback_upload(file_id, original_filename)
+        raise
+
+
+def upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
+    """ 
+    Uploads a CV file and processes it synchronously (`save_upload` then `ingest`).
+
+    Returns:
+        str: The newly generated sequential id (e.g., "CV-001") for the file.
+
+    Raises:
+        ValueError: If the content type is not allowed.
+        Exception: If file saving, extraction or metadata update fails.
+    """
+    new_id = save_upload(original_filename, file_contents, content_type)
+    ingest(new_id, original_filename)
+    return new_id
+
+def bulk_upload(files: list[tuple[str, bytes, str]]) -> list[dict]:
+    """ 
+    Uploads many CV files at once; ZIP archives are expanded to their .pdf/.docx members.
+    1. Saves every file with its own id (see `save_upload`).
+    2. Extracts the text of all files in parallel in a process pool (PyMuPDF/Tesseract are CPU-bound).
+    3. Structures the texts with concurrent LLM calls (BULK_STRUCTURE_CONCURRENCY at a time).
+    Files uploaded before (same bytes) reuse the extraction cache and skip steps 2 and 3.
+    4. Writes the JSON files and adds all metadata rows in a single write.
+    A file that fails at any step is rolled back without affecting the others.
+
+    Args:
+        files (list[tuple[str, bytes, str]]): (original filename, raw content, MIME type) of each upload.
+
+    Returns:
+        list[dict]: One result per file, in upload order:
+            {"filename", "id", "status": "uploaded" | "failed", "error"}.
+    """
+    print(f"--- Bulk uploading {len(files)} file(s) ---")
+    results = []
+    for original_filename, file_contents, content_type, error in expand_archives(files):
+        result = {"filename": original_filename, "id": None, "status": "failed", "error": error}
+        if error is None:
             try:
-                os.remove(save_path)
-                delete_by_id(new_id)
-                print(f"Rolled back: Deleted {save_path}")
-            except OSError as os_err:
-                print(f"Rollback failed: Could not delete {save_path}. Error: {os_err}")
-        raise  # Re-raise the original metadata exception
+                result["id"] = save_upload(original_filename, file_contents, content_type)
+            except Exception as e:
+                result["error"] = str(e)
+        results.append(result)
+
+    pending = [result for result in results if result["id"]]
+    now = datetime.datetime.now().strftime("%Y%m%d%H:%M:%S")
+
+    def fail(result: dict, error: Exception):
+        print(f"Error processing {result['id']}: {error}. Rolling back file save...")
+        rollback_upload(result["id"], result["filename"])
+        result["error"] = str(error)
+        pending.remove(result)
+
+    # --- 1. Extraction: extraction cache, then process pool ---
+    texts, hashes = {}, {}
+    for result in list(pending):
+        try:
+            hashes[result["id"]] = _file_hash(result["id"], result["filename"])
+            cached_text = ExtractionCache().get_text(hashes[result["id"]])
+            if cached_text:
+                texts[result["id"]] = cached_text
+        except Exception as e:
+            fail(result, e)
+
+    to_extract = [result for result in pending if result["id"] not in texts]
+    if to_extract:
+        workers = min(len(to_extract), BULK_EXTRACT_PROCESSES)
+        # spawn: forking a threaded server process can deadlock the children
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                # The files are already spread over the pool, OCR the pages of each one sequentially
+                pool.submit(TextractUtils.extract_text_from_file, str(UPLOAD_DIRECTORY / f"{result['id']}.{result['filename'].split('.')[-1]}"), 1): result
+                for result in to_extract
+            }
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    texts[result["id"]] = future.result()
+                    if not texts[result["id"]]:
+                        raise Exception(f"No content found: {result['filename']}")
+                    ExtractionCache().put_text(hashes[result["id"]], texts[result["id"]])
+                except Exception as e:
+                    fail(result, e)
+
+    # --- 2. Structuring: concurrent LLM calls ---
+    structured = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(len(pending), BULK_STRUCTURE_CONCURRENCY)) as pool:
+            futures = {
+                pool.submit(_structure_text, result["id"], result["filename"], now, texts[result["id"]], hashes[result["id"]]): result
+                for result in pending
+            }
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    structured[result["id"]] = future.result()
+                    write_document_json(UPLOAD_DIRECTORY, result["id"], structured[result["id"]])
+                except Exception as e:
+                    fail(result, e)
+
+    # --- 3. Indexing: one metadata write for the whole batch ---
+    if pending:
+        try:
+            metadata_store.insert_many([
+                metadata_row(result["id"], result["filename"], now, structured[result["id"]]) for result in pending
+            ])
+            print(f"Successfully added metadata for {len(pending)} id(s)")
+        except Exception as e:
+            for result in list(pending):
+                fail(result, e)
+        for result in pending:
+            result["status"] = "uploaded"
+            MatchCache().invalidate(cv_id=result["id"])
+        DocumentRepository("cv").refresh()
+
+    return results
+
+
+def expand_archives(files: list[tuple[str, bytes, str]]) -> list[tuple[str, bytes, str, str | None]]:
+    """ 
+    Replaces each ZIP archive by its .pdf/.docx members (folders are flattened, other members skipped).
+    Other files are returned unchanged. Each entry comes with an error, None when the file can be saved:
+    a member larger than BULK_MAX_FILE_SIZE is not decompressed, and an archive that would bring the upload
+    past BULK_MAX_FILES files or BULK_MAX_TOTAL_SIZE bytes is rejected as a whole. Both are checked
+    on the sizes listed in the archive, before anything is decompressed.
+    """
+    expanded = []
+    total_size = 0
+    for original_filename, file_contents, content_type in files:
+        if content_type not in ZIP_CONTENT_TYPES and not original_filename.lower().endswith(".zip"):
+            expanded.append((original_filename, file_contents, content_type, None))
+            total_size += len(file_contents)
+            continue
+
+        try:
+            with zipfile.ZipFile(io.BytesIO(file_contents)) as archive:
+                members = []
+                for info in archive.infolist():
+                    member_name = Path(info.filename).name
+                    extension = member_name.split(".")[-1].lower()
+                    if info.is_dir() or member_name.startswith(".") or extension not in EXTENSION_CONTENT_TYPES:
+                        continue
+                    members.append((info, member_name, extension))
+
+                archive_size = sum(info.file_size for info, _, _ in members if info.file_size <= BULK_MAX_FILE_SIZE)
+                if len(expanded) + len(members) > BULK_MAX_FILES:
+                    error = f"ZIP archive with {len(members)} CV file(s) exceeds BULK_MAX_FILES ({BULK_MAX_FILES} files per upload)"
+                elif total_size + archive_size > BULK_MAX_TOTAL_SIZE:
+                    error = f"ZIP archive of {archive_size} bytes uncompressed exceeds BULK_MAX_TOTAL_SIZE ({BULK_MAX_TOTAL_SIZE} bytes per upload)"
+                else:
+                    error = None
+                if error:
+                    print(f"Warning: Rejected {original_filename}: {error}")
+                    expanded.append((original_filename, b"", content_type, error))
+                    continue
+
+                for info, member_name, extension in members:
+                    if info.file_size > BULK_MAX_FILE_SIZE:
+                        expanded.append((member_name, b"", EXTENSION_CONTENT_TYPES[extension],
+                                         f"{info.file_size} bytes uncompressed exceeds BULK_MAX_FILE_SIZE ({BULK_MAX_FILE_SIZE} bytes)"))
+                        continue
+                    expanded.append((member_name, archive.read(info), EXTENSION_CONTENT_TYPES[extension], None))
+                total_size += archive_size
+        except zipfile.BadZipFile:
+            print(f"Warning: Not a valid ZIP archive: {original_filename}")
+            expanded.append((original_filename, file_contents, content_type, None))
+    return expanded
+
 
 def delete_by_id(id: str):
     """ 
     Deletes a CV.
     1. Deletes the file from the upload directory.
-    2. Removes the row from the CSV metadata file.
+    2. Removes the row from the metadata store.
 
     Args:
         id (str): The UUid of the CV to delete.
@@ -203,9 +378,7 @@ def delete_by_id(id: str):
         FileNotFoundError: If no CV with that id is found.
     """
     print(f"--- Deleting CV by id: {id} ---")
-    all_cvs = get_all()  # list[dict]
-
-    cv_to_delete = next((cv for cv in all_cvs if cv.get("id") == id), None)
+    cv_to_delete = metadata_store.get(id)
 
     if not cv_to_delete:
         raise FileNotFoundError(f"No metadata found for CV with id: {id}")
@@ -224,30 +397,64 @@ def delete_by_id(id: str):
             print(f"Deleted file: {file_json_path}")
         else:
             print(f"Warning: File not found on disk, but deleting metadata: {file_path}")
+        DocumentRepository("cv").refresh(id)
 
     except Exception as e:
         print(f"Error deleting file: {e}")
         # Decide if you want to stop or continue to delete metadata
         # For this example, we'll continue
 
-    # --- 2. Remove from metadata and re-write CSV ---
-    new_data_list = [cv for cv in all_cvs if cv.get("id") != id]
-
-    # Convert list[dict] back to list[list] for writing
-    data_to_write = _convert_dict_to_list(new_data_list)
-
+    # --- 2. Remove from metadata ---
     try:
-        csv_handler.write_to_csv(data_to_write)
+        metadata_store.delete(id)
         print(f"Successfully removed metadata for id: {id}")
+        MatchCache().invalidate(cv_id=id)
     except Exception as e:
         print(f"Error re-writing metadata after deletion: {e}")
-        # At this point, the file is deleted but the CSV is out of sync.
-        # This is a risk of using CSV as a database.
+        # At this point, the file is deleted but the metadata is out of sync.
+
+
+def _file_hash(file_id: str, file_name: str) -> str:
+    return file_hash(str(UPLOAD_DIRECTORY / f"{file_id}.{file_name.split('.')[-1].strip()}"))
+
+
+def _extract_text(file_id: str, file_name: str, file_sha: str = None, on_progress: Callable[[dict], None] = None) -> str:
+    file_extension = file_name.split(".")[-1].strip()
+    file_path = (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}")
+    print(f"--- Extracting text from {file_path} ---")
+
+    # Same bytes uploaded before: reuse the extracted text (no parsing / OCR)
+    file_contents = ExtractionCache().get_text(file_sha) if file_sha else None
+    if file_contents:
+        print(f"Extraction cache hit: {len(file_contents)} characters")
+        if on_progress:
+            # Every page is done at once
+            pages = TextractUtils.count_pages(str(file_path))
+            on_progress({"page": pages, "pages": pages, "source": "cache", "chars": len(file_contents), "seconds": 0.0})
+        return file_contents
+
+    page_texts = []
+    for page in TextractUtils.iter_text_from_file(str(file_path)):
+        page_texts.append(page.pop("text"))
+        if on_progress:
+            on_progress(page)
+    file_contents = "\n".join(page_texts).strip()
+
+    if not file_contents:  # Check for empty string
+        raise Exception(f"No content found: {file_path}")
+    print(f"Content found: {len(file_contents)} characters")
+    if file_sha:
+        ExtractionCache().put_text(file_sha, file_contents)
+    return file_contents
+
 
+def _structure_text(file_id: str, file_name: str, time: str, file_contents: str, file_sha: str = None) -> dict:
+    # Same bytes structured before with this schema/prompt/model: no LLM call, only the ids/times differ
+    cached = ExtractionCache().get_json(file_sha, CV_SCHEMA, Content2Json.PARSE_MODEL, Content2Json.PARSE_PROMPT_VERSION) if file_sha else None
+    if cached:
+        print(f"Extraction cache hit: structured JSON reused for {file_id}")
+        return _patch_metadata(cached, file_id, file_name, time)
 
-def __extract_data_to_json__(file_name: str, file_id: str, time: str):
-    print(f"--- Extracting2JSON data from {UPLOAD_DIRECTORY} ---")
-    json_file_path = UPLOAD_DIRECTORY / f"{file_id}.json"
     meta_data_content = f"""
     ==PRE DATA TO REFERENCE IF OTHER NOT FOUND FIND IN THE DOCUMENT CONTENT==
             "cv_id": {file_id},
@@ -256,31 +463,47 @@ def __extract_data_to_json__(file_name: str, file_id: str, time: str):
             "uploaded_by": find in the document. Admin User as a default value in case not found
     ==END PRE DATA TO REFERENCE IF OTHER NOT FOUND FIND IN THE DOCUMENT CONTENT==
     """
-    file_extension = file_name.split(".")[-1].strip()
-    file_path = (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}")
-    print(f"file_extension: {file_extension}")
-
-    if file_extension == "docx":
-        file_contents = TextractUtils.extract_text_from_docx(str(file_path))
-    elif file_extension == "pdf":
-        file_contents = TextractUtils.extract_text_from_pdf(str(file_path))
-    else:
-        raise Exception(f"Unsupported file extension: {file_extension}")
-
-    if not file_contents:  # Check for empty string
-        raise Exception(f"No content found: {UPLOAD_DIRECTORY}")
-    else:
-        print(f"Content found: {file_contents}")
-        # Extract to JSON (this now returns a dictionary)
-        json_content = Content2Json.parse_content_to_json(
-            content_text=meta_data_content+ file_contents ,
-            parameters_schema=CV_SCHEMA
-        )
+    # Extract to JSON (this returns a dictionary); long documents are structured in parts and merged
+    json_content = Content2Json.parse_long_content_to_json(
+        content_text=file_contents,
+        parameters_schema=CV_SCHEMA,
+        context=meta_data_content
+    )
+    if file_sha:
+        ExtractionCache().put_json(file_sha, CV_SCHEMA, Content2Json.PARSE_MODEL, Content2Json.PARSE_PROMPT_VERSION, json_content)
+    return json_content
+
+
+def _patch_metadata(json_content: dict, file_id: str, file_name: str, time: str) -> dict:
+    """Point a cached structured JSON at the new upload (id, file name, scan time)."""
+    metadata = json_content.get("metadata") or {}
+    metadata.update({"cv_id": file_id, "source_file_name": file_name, "scanned_at": time})
+    json_content["metadata"] = metadata
+    if isinstance(json_content.get("basics"), dict) and "cv_id" in json_content["basics"]:
+        json_content["basics"]["cv_id"] = file_id
+    return json_content
+
+
+def _index_document(file_id: str, file_name: str, time: str, json_content: dict) -> None:
+    write_document_json(UPLOAD_DIRECTORY, file_id, json_content)
+    metadata_store.insert(metadata_row(file_id, file_name, time, json_content))
+    print(f"Successfully added metadata for id: {file_id}")
+    # The id may have been used by a deleted CV, drop its cached match results
+    MatchCache().invalidate(cv_id=file_id)
+    DocumentRepository("cv").refresh(file_id)
+
+
+def rollback_upload(file_id: str, file_name: str) -> None:
+    """Remove whatever a failed or interrupted ingestion left: upload, JSON and metadata row."""
+    file_extension = file_name.split(".")[-1]
+    for path in (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}", UPLOAD_DIRECTORY / f"{file_id}.json"):
         try:
-            with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_content, f, indent=2, ensure_ascii=False)
-                print(f"Successfully wrote file: {json_file_path}")
-                return json_content
-        except Exception as e:
-            print(f"Error writing file: {json_file_path}\n{e}")
-            raise
+            if path.exists():
+                os.remove(path)
+                print(f"Rolled back: Deleted {path}")
+        except OSError as os_err:
+            print(f"Rollback failed: Could not delete {path}. Error: {os_err}")
+    # Written last by the indexing stage: only there if the ingestion stopped right after it
+    if metadata_store.delete(file_id):
+        print(f"Rolled back: Deleted metadata for id: {file_id}")
+    DocumentRepository("cv").refresh(file_id)
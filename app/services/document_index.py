@@ -0,0 +1,30 @@
+import json
+
+from pathlib import Path
+
+__all__ = ["write_document_json", "metadata_row"]
+
+# ========================================
+#    Indexing of an ingested CV/JD
+# ========================================
+# Shared by cv_service and job_description_service, so both ingest paths write the same files and rows
+def write_document_json(upload_dir: Path, file_id: str, json_content: dict) -> None:
+    """Write the structured document as <upload_dir>/<file_id>.json; raises when the file can't be written."""
+    json_file_path = Path(upload_dir) / f"{file_id}.json"
+    try:
+        with open(json_file_path, 'w', encoding='utf-8') as f:
+            json.dump(json_content, f, indent=2, ensure_ascii=False)
+            print(f"Successfully wrote file: {json_file_path}")
+    except Exception as e:
+        print(f"Error writing file: {json_file_path}\n{e}")
+        raise
+
+
+def metadata_row(file_id: str, file_name: str, time: str, json_content: dict) -> dict:
+    """The metadata store row (DATA_SCHEMA: id, name, uploadBy, uploadDate) of an ingested document."""
+    return {
+        "id": file_id,
+        "name": file_name,
+        "uploadBy": (json_content.get('metadata') or {}).get('uploaded_by'),
+        "uploadDate": time
+    }
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import threading
+
+from pathlib import Path
+from typing  import Any, Dict, List, Optional
+
+from app.utilities.match_cache import content_hash
+
+__all__ = ["DocumentRepository"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+
+# Where each document type lives and how its secondary index fields are read from the parsed JSON
+DOCUMENT_TYPES = {
+    "cv": {
+        "folder": BASE_DIR / "data" / "upload" / "CV",
+        "id": [("basics", "cv_id"), ("metadata", "cv_id")],
+        "name": [("basics", "name")],
+        "job_title": [("basics", "label")],
+        "uploaded_by": [("metadata", "uploaded_by")],
+    },
+    "jd": {
+        "folder": BASE_DIR / "data" / "upload" / "JD",
+        "id": [("metadata", "jd_id")],
+        "name": [("basic_info", "job_title")],
+        "job_title": [("basic_info", "job_title")],
+        "uploaded_by": [("metadata", "uploaded_by")],
+    },
+}
+INDEXED_FIELDS = ("name", "job_title", "uploaded_by")
+
+# Full directory re-scans (used by `all()`) happen at most once per interval, single lookups always check the file
+SCAN_INTERVAL = float(os.getenv("DOC_REPO_SCAN_INTERVAL", "2"))
+
+def _lookup(data: Dict[str, Any], paths: list) -> Optional[str]:
+    for path in paths:
+        node = data
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if node:
+            return str(node)
+    return None
+
+# ========================================
+#    In-memory CV/JD JSON repository
+# ========================================
+class DocumentRepository:
+    """
+    Loads the parsed CV/JD JSON documents once and keeps them in memory, keyed by id (the JSON file name),
+    with secondary indexes on name, job_title and uploaded_by.
+    Entries are reloaded when their file's mtime/size changes, so edits on disk are picked up without restarting.
+    One shared instance per document type: DocumentRepository("cv"), DocumentRepository("jd").
+    The returned documents are shared, callers must not modify them.
+    """
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __new__(cls, doc_type: str = "cv"):
+        if doc_type not in DOCUMENT_TYPES:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        if doc_type not in cls._instances:
+            with cls._lock:
+                if doc_type not in cls._instances:
+                    instance = super(DocumentRepository, cls).__new__(cls)
+                    instance._doc_type  = doc_type
+                    instance._config    = DOCUMENT_TYPES[doc_type]
+                    instance._folder    = Path(instance._config["folder"])
+                    instance._entries   = {}
+                    instance._aliases   = {}
+                    instance._indexes   = {field: {} for field in INDEXED_FIELDS}
+                    instance._repo_lock = threading.RLock()
+                    instance._last_scan = 0.0
+                    cls._instances[doc_type] = instance
+        return cls._instances[doc_type]
+
+    # ----------------------------
+    # Entry maintenance
+    # ----------------------------
+    def _index(self, entry: dict, add: bool) -> None:
+        for field in INDEXED_FIELDS:
+            value = entry[field]
+            if not value:
+                continue
+            ids = self._indexes[field].setdefault(value.lower(), set())
+            if add:
+                ids.add(entry["id"])
+            else:
+                ids.discard(entry["id"])
+                if not ids:
+                    del self._indexes[field][value.lower()]
+        if entry["doc_id"] and entry["doc_id"] != entry["id"]:
+            if add:
+                self._aliases[entry["doc_id"]] = entry["id"]
+            else:
+                self._aliases.pop(entry["doc_id"], None)
+
+    def _drop(self, doc_id: str) -> None:
+        entry = self._entries.pop(doc_id, None)
+        if entry:
+            self._index(entry, add=False)
+
+    def _load(self, doc_id: str, path: Path, stat: os.stat_result) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Failed to read the JSON file {path.name}: {e}")
+            self._drop(doc_id)
+            return None
+
+        self._drop(doc_id)
+        # Serialized once per load: this is what the LLM prompts and the match cache use
+        content = json.dumps(data, ensure_ascii=False, indent=2)
+        entry = {
+            "id": doc_id,
+            "doc_id": _lookup(data, self._config["id"]) or doc_id,
+            "path": path,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "data": data,
+            "content": content,
+            "hash": content_hash(content),
+            **{field: _lookup(data, self._config[field]) for field in INDEXED_FIELDS},
+        }
+        self._entries[doc_id] = entry
+        self._index(entry, add=True)
+        return entry
+
+    def _sync(self, doc_id: str) -> Optional[dict]:
+        """Bring one entry in line with its file: load, reload if changed, or drop if gone."""
+        path = self._folder / f"{doc_id}.json"
+        try:
+            stat = path.stat()
+        except OSError:
+            self._drop(doc_id)
+            return None
+
+        entry = self._entries.get(doc_id)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+        return self._load(doc_id, path, stat)
+
+    def _scan(self, force: bool = False) -> None:
+        if not force and time.monotonic() - self._last_scan < SCAN_INTERVAL:
+            return
+        if not self._folder.exists():
+            print(f"Error: The directory path does not exist: {self._folder}")
+            return
+
+        seen = set()
+        with os.scandir(self._folder) as it:
+            for item in it:
+                if not item.name.endswith(".json") or not item.is_file():
+                    continue
+                doc_id = item.name[:-len(".json")]
+                seen.add(doc_id)
+                stat = item.stat()
+                entry = self._entries.get(doc_id)
+                if not entry or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                    self._load(doc_id, Path(item.path), stat)
+        for doc_id in set(self._entries) - seen:
+            self._drop(doc_id)
+        self._last_scan = time.monotonic()
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def refresh(self, doc_id: str = None) -> None:
+        """Re-sync one document (e.g. after an upload/delete), or the whole folder when no id is given."""
+        with self._repo_lock:
+            if doc_id:
+                self._sync(doc_id)
+            else:
+                self._scan(force=True)
+
+    def get_entry(self, doc_id: str) -> Optional[dict]:
+        if not doc_id:
+            return None
+        with self._repo_lock:
+            doc_id = self._aliases.get(doc_id, doc_id)
+            return self._sync(doc_id)
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """The parsed JSON document of `doc_id` (file name or embedded id), None if it doesn't exist."""
+        entry = self.get_entry(doc_id)
+        return entry["data"] if entry else None
+
+    def get_content(self, doc_id: str) -> Optional[str]:
+        """The document serialized as pretty JSON (as sent to the LLM), cached until the file changes."""
+        entry = self.get_entry(doc_id)
+        return entry["content"] if entry else None
+
+    def find_by(self, field: str, value: str) -> List[Dict[str, Any]]:
+        """Documents whose `field` (one of name, job_title, uploaded_by) equals `value`, case-insensitive."""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Field {field} is not indexed")
+        with self._repo_lock:
+            self._scan()
+            ids = sorted(self._indexes[field].get((value or "").lower(), ()))
+            return [self._entries[doc_id]["data"] for doc_id in ids if doc_id in self._entries]
+
+    def entries(self) -> List[dict]:
+        """Every entry sorted by id: {"id", "doc_id", "path", "data", "content", "hash", "name", "job_title", "uploaded_by", ...}."""
+        with self._repo_lock:
+            self._scan()
+            return [self._entries[doc_id] for doc_id in sorted(self._entries)]
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [entry["data"] for entry in self.entries()]
+
+    def __len__(self) -> int:
+        return len(self.entries())
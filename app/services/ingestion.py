@@ -0,0 +1,199 @@
+import os
+import time
+import uuid
+import socket
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing             import Callable, Optional
+
+from ..utilities.job_store import JobStore
+
+__all__ = ["IngestionManager", "JOB_STAGES"]
+
+# Number of uploads processed at the same time (extraction/OCR + LLM structuring)
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+# Finished jobs kept for the status API
+INGESTION_JOB_HISTORY = int(os.getenv("INGESTION_JOB_HISTORY", "500"))
+# Seconds between two heartbeats of a worker's queued/running jobs, and without one after which they are failed
+INGESTION_HEARTBEAT_INTERVAL = float(os.getenv("INGESTION_HEARTBEAT_INTERVAL", "10"))
+INGESTION_JOB_STALE_AFTER = float(os.getenv("INGESTION_JOB_STALE_AFTER", "60"))
+
+JOB_STAGES = ("queued", "extracting", "structuring", "indexing", "done")
+
+# =========================================================
+# Singleton background ingestion pipeline
+# =========================================================
+class IngestionManager:
+    """
+    Runs the CV/JD ingestion (extraction -> structuring -> indexing) on a worker pool
+    so the upload endpoints only have to store the file and return a job id.
+    Jobs run in the worker process that took the upload, their rows are kept in the metadata database
+    (JobStore) so the status API answers from any worker process and across restarts.
+    Each worker heartbeats the jobs it owns; the queued/running jobs of a worker that stopped (no heartbeat
+    for INGESTION_JOB_STALE_AFTER, or a dead pid on this host) are failed and their upload rolled back,
+    at startup and then on every heartbeat.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, max_workers: int = None):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(IngestionManager, cls).__new__(cls)
+                    instance._pool = ThreadPoolExecutor(max_workers=max_workers or INGESTION_WORKERS,
+                                                        thread_name_prefix="ingestion")
+                    instance._store = JobStore()
+                    instance._host = socket.gethostname()
+                    # The pid alone could be reused by the next process (e.g. pid 1 of a restarted container)
+                    instance._owner = f"{instance._host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+                    threading.Thread(target=instance._heartbeat_loop, name="ingestion-heartbeat", daemon=True).start()
+                    cls._instance = instance
+        return cls._instance
+
+    # ========================================
+    #           Job submission
+    # ========================================
+    def submit(self, doc_type: str, document_id: str, filename: str,
+               ingest: Callable[[str, str, Callable[[str], None], Callable[[dict], None]], dict]) -> dict:
+        """
+        Queue `ingest(document_id, filename, on_stage, on_progress)` and return the new job.
+        `ingest` is the service function (cv_service.ingest / job_description_service.ingest).
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "doc_type": doc_type,
+            "document_id": document_id,
+            "filename": filename,
+            "status": "queued",
+            "stage": "queued",
+            "timings": {},
+            "progress": {"pages_done": 0, "pages_total": None, "ocr_pages": 0},
+            "error": None,
+            "version": 0,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "owner": self._owner,
+            "heartbeat": time.time(),
+        }
+        self._store.save(job)
+        snapshot = self._snapshot(job)
+        self._pool.submit(self._run, job, ingest)
+        return snapshot
+
+    def _run(self, job: dict, ingest: Callable) -> None:
+        """Run the job on a pool thread; the job dict is only changed here and stored after every change."""
+        stage_started = [time.perf_counter()]
+        self._update(job, status="running", started_at=time.time())
+
+        def on_stage(stage: str):
+            now = time.perf_counter()
+            # Close the previous stage before moving on
+            job["timings"][job["stage"]] = round(now - stage_started[0], 3)
+            self._update(job, stage=stage)
+            stage_started[0] = now
+
+        def on_progress(page: dict):
+            self._update(job, progress={
+                "pages_done": page["page"],
+                "pages_total": page["pages"],
+                "ocr_pages": job["progress"]["ocr_pages"] + (page["source"] in ("ocr", "ocr_failed")),
+            })
+
+        try:
+            ingest(job["document_id"], job["filename"], on_stage, on_progress)
+            on_stage("done")
+            self._update(job, status="done", finished_at=time.time())
+        except Exception as e:
+            job["timings"][job["stage"]] = round(time.perf_counter() - stage_started[0], 3)
+            print(f"Ingestion job {job['job_id']} ({job['document_id']}) failed: {e}")
+            self._update(job, status="failed", error=str(e), finished_at=time.time())
+        finally:
+            self._store.prune(INGESTION_JOB_HISTORY)
+
+    # ========================================
+    #           Job status
+    # ========================================
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._store.get(job_id)
+        return self._snapshot(job) if job else None
+
+    def list_jobs(self, doc_type: str = None, status: str = None) -> list[dict]:
+        """Jobs newest first, optionally filtered."""
+        return [self._snapshot(job) for job in self._store.list(doc_type=doc_type, status=status)]
+
+    @staticmethod
+    def _snapshot(job: dict) -> dict:
+        snapshot = dict(job, timings=dict(job["timings"]), progress=dict(job["progress"]))
+        end = job["finished_at"] or time.time()
+        snapshot["elapsed"] = round(end - job["created_at"], 3)
+        return snapshot
+
+    def _update(self, job: dict, **fields) -> None:
+        job.update(fields)
+        job["version"] += 1
+        job["heartbeat"] = time.time()
+        self._store.save(job)
+
+    # ========================================
+    #      Jobs of stopped worker processes
+    # ========================================
+    def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                self._store.heartbeat(self._owner, time.time())
+                self.reconcile()
+            except Exception as e:
+                print(f"Warning: ingestion job heartbeat failed: {e}")
+            time.sleep(INGESTION_HEARTBEAT_INTERVAL)
+
+    def reconcile(self) -> int:
+        """Fail the queued/running jobs whose worker process stopped and roll back their upload; returns their count."""
+        now = time.time()
+        failed = 0
+        for job in self._store.active():
+            if self._owner_alive(job, now):
+                continue
+            # Conditional on the row found: a single worker rolls back, and never a job that moved on meanwhile
+            if not self._store.fail_stale(job["job_id"], job["owner"], job["heartbeat"],
+                                          "Interrupted: the worker process running the job stopped", now):
+                continue
+            print(f"Ingestion job {job['job_id']} ({job['document_id']}) interrupted at stage {job['stage']}, rolling back the upload")
+            try:
+                _rollback_upload(job["doc_type"], job["document_id"], job["filename"])
+            except Exception as e:
+                print(f"Rollback of ingestion job {job['job_id']} ({job['document_id']}) failed: {e}")
+            failed += 1
+        if failed:
+            self._store.prune(INGESTION_JOB_HISTORY)
+        return failed
+
+    def _owner_alive(self, job: dict, now: float) -> bool:
+        if job["owner"] == self._owner:
+            return True
+        if (job["heartbeat"] or 0) < now - INGESTION_JOB_STALE_AFTER:
+            return False
+        host, pid, _ = job["owner"].rsplit(":", 2)
+        # Another host: only its heartbeat tells
+        if host != self._host or os.name != "posix":
+            return True
+        if int(pid) == os.getpid():
+            # An earlier process that had this pid
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+
+def _rollback_upload(doc_type: str, document_id: str, filename: str) -> None:
+    # Imported here: the services are only needed to clean up after a stopped worker
+    from . import cv_service, job_description_service
+    services = {"cv": cv_service, "jd": job_description_service}
+    services[doc_type].rollback_upload(document_id, filename)
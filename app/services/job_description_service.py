@@ -1,10 +1,14 @@
 import datetime
 import os
 from pathlib import Path
-from app.utilities.csv_utils import CsvUtils
+from typing import Callable
+from app.utilities.metadata_store import create_metadata_store
+from app.utilities.match_cache import MatchCache
+from app.utilities.extraction_cache import ExtractionCache, file_hash
+from app.services.document_repository import DocumentRepository
+from app.services.document_index import write_document_json, metadata_row
 import app.utilities.content_2_json as Content2Json
 import app.utilities.text_extraction_utils as TextractUtils
-import json
 from dotenv import load_dotenv
 from data.schema import JD_SCHEMA
 
@@ -24,11 +28,13 @@ META_DATA_FILE_PATH = UPLOAD_DIRECTORY / "jd_file.csv"
 # Schema: "id" is the unique UUid, "name" is the original uploaded filename
 DATA_SCHEMA = ["id", "name","uploadBy","uploadDate"]
 
-# Initialize the CSV handler with the absolute path
+# Initialize the metadata store (METADATA_BACKEND: sqlite by default, csv for the legacy file)
 try:
-    csv_handler = CsvUtils(str(META_DATA_FILE_PATH), DATA_SCHEMA)
+    metadata_store = create_metadata_store("jd", DATA_SCHEMA, META_DATA_FILE_PATH)
+    # Persisted JD-NNN counter; seeded from the metadata and the files already in the upload directory
+    id_allocator = metadata_store.id_allocator("JD", extra_ids=lambda: (path.stem for path in UPLOAD_DIRECTORY.iterdir()))
 except Exception as e:
-    print(f"Error initializing CsvUtils: {e}")
+    print(f"Error initializing the metadata store: {e}")
     print("Please ensure the path is correct and within a /data directory.")
     # In a real app, you'd exit or handle this more gracefully
     exit(1)
@@ -44,21 +50,10 @@ ALLOWED_CONTENT_TYPES = [
 ]
 
 
-# --- Helper Function ---
-def _convert_dict_to_list(data: list[dict]) -> list[list]:
-    """Converts a list of dicts back to a list of lists for writing."""
-    new_list_of_lists = []
-    for row_dict in data:
-        # Ensure order is maintained using the schema
-        new_row = [row_dict.get(key, "") for key in DATA_SCHEMA]
-        new_list_of_lists.append(new_row)
-    return new_list_of_lists
-
-
 # --- Core Functions ---
 def get_all() -> list[dict]:
     """ 
-    Get all JD metadata from the CSV file.
+    Get all JD metadata from the metadata store.
 
     Returns:
         list[dict]: A list of dictionaries, e.g., 
@@ -66,7 +61,7 @@ def get_all() -> list[dict]:
     """
     print("--- Getting all JDs ---")
     try:
-        return csv_handler.read_from_csv()
+        return metadata_store.get_all()
     except FileNotFoundError:
         print("JD metadata file not found. Returning empty list.")
         return []
@@ -90,9 +85,7 @@ def get_by_id(id: str) -> tuple[Path, str]:
                            or if the file itself is missing.
     """
     print(f"--- Getting JD by id: {id} ---")
-    all_jds = get_all()
-
-    jd_meta = next((jd for jd in all_jds if jd.get("id") == id), None)
+    jd_meta = metadata_store.get(id)
 
     if not jd_meta:
         raise FileNotFoundError(f"No metadata found for JD with id: {id}")
@@ -111,12 +104,11 @@ def get_by_id(id: str) -> tuple[Path, str]:
     return file_path,original_filename
 
 
-def upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
+def save_upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
     """ 
-    Uploads a JD file.
-    1. Determines the next sequential ID (e.g., JD-001).
+    Stores an uploaded JD file without processing it (see `ingest`).
+    1. Allocates the next sequential ID (e.g., JD-001), unique across workers.
     2. Saves the file to the upload directory with that new id.
-    3. Updates the CSV metadata file.
 
     Args:
         original_filename (str): The original name of the file (e.g., "job.pdf").
@@ -128,73 +120,87 @@ def upload(original_filename: str, file_contents: bytes, content_type: str) -> s
 
     Raises:
         ValueError: If the content type is not allowed.
-        Exception: If file saving or metadata update fails.
+        Exception: If file saving fails.
     """
     print(f"--- Uploading file: {original_filename} ---")
 
     if content_type not in ALLOWED_CONTENT_TYPES:
         raise ValueError(f"File type not allowed: {content_type}")
 
-    try:
-        all_jds_data = get_all()  # This is list[dict]
-    except Exception as e:
-        raise Exception(f"Failed to read existing metadata: {e}")
-
-    last_id_num = 0
-    if all_jds_data:
-        for jd in all_jds_data:
-            current_id_str = jd.get('id', '')
-            if current_id_str.startswith('JD-'):
-                try:
-                    num_part = int(current_id_str.split('-')[-1])
-                    if num_part > last_id_num:
-                        last_id_num = num_part
-                except (ValueError, IndexError):
-                    print(f"Warning: Skipping malformed ID: {current_id_str}")
-                    pass
-
-    next_id_num = last_id_num + 1
-    new_id = f"JD-{next_id_num:03d}"
+    new_id = id_allocator.next_id()
     print(f"Generated new ID: {new_id}")
 
     file_extension = original_filename.split(".")[-1]
     save_path = UPLOAD_DIRECTORY / f"{new_id}.{file_extension}"
 
     try:
-        with open(save_path, 'wb') as f:
+        # 'xb' never overwrites: a clash means the id counter is out of sync, fail instead of losing a file
+        with open(save_path, 'xb') as f:
             f.write(file_contents)
         print(f"File saved to: {save_path}")
     except IOError as e:
         raise Exception(f"Failed to save file: {e}")
 
-    try:
-        # Create JSON DATA FILE
-        now = datetime.datetime.now().strftime("%Y%m%d%H:%M:%S")
-        json_content = __extract_data_to_json__( file_id=new_id, file_name=original_filename, time=now)
-        data_to_write = _convert_dict_to_list(all_jds_data)
-        data_to_write.append([new_id, original_filename, json_content['metadata']['uploaded_by'], now])
-        csv_handler.write_to_csv(data_to_write)
-        print(f"Successfully added metadata for id: {new_id}")
+    return new_id
+
+
+def ingest(file_id: str, original_filename: str, on_stage: Callable[[str], None] = None,
+           on_progress: Callable[[dict], None] = None) -> dict:
+    """ 
+    Processes a JD file saved by `save_upload`:
+    1. extracting: reads the text of the PDF/DOCX (OCR if needed).
+    2. structuring: converts the text to JSON following JD_SCHEMA with the LLM.
+    3. indexing: writes the JSON file and the metadata row, refreshes the caches.
+    The saved files are rolled back if any stage fails.
+
+    Args:
+        file_id (str): The id returned by `save_upload`.
+        original_filename (str): The original name of the file.
+        on_stage (Callable[[str], None]): Called with the stage name when each stage starts.
+        on_progress (Callable[[dict], None]): Called with each extracted page (without its text), see
+            TextractUtils.iter_text_from_file; once with every page and source "cache" when the text was cached.
 
-        return new_id
+    Returns:
+        dict: The structured JSON content.
+    """
+    on_stage = on_stage or (lambda stage: None)
+    now = datetime.datetime.now().strftime("%Y%m%d%H:%M:%S")
+    try:
+        on_stage("extracting")
+        file_sha = _file_hash(file_id, original_filename)
+        file_contents = _extract_text(file_id, original_filename, file_sha, on_progress)
+        on_stage("structuring")
+        json_content = _structure_text(file_id, original_filename, now, file_contents, file_sha)
+        on_stage("indexing")
+        _index_document(file_id, original_filename, now, json_content)
+        return json_content
 
     except Exception as e:
-        # Attempt to roll back: delete the file we just saved
-        print(f"Error updating metadata: {e}. Rolling back file save...")
-        if save_path.exists():
-            try:
-                os.remove(save_path)
-                delete_by_id(new_id)
-                print(f"Rolled back: Deleted {save_path}")
-            except OSError as os_err:
-                print(f"Rollback failed: Could not delete {save_path}. Error: {os_err}")
-        raise  # Re-raise the original metadata exception
+        print(f"Error processing {file_id}: {e}. Rolling back file save...")
+        rollback_upload(file_id, original_filename)
+        raise
+
+
+def upload(original_filename: str, file_contents: bytes, content_type: str) -> str:
+    """ 
+    Uploads a JD file and processes it synchronously (`save_upload` then `ingest`).
+
+    Returns:
+        str: The newly generated sequential id (e.g., "JD-001") for the file.
+
+    Raises:
+        ValueError: If the content type is not allowed.
+        Exception: If file saving, extraction or metadata update fails.
+    """
+    new_id = save_upload(original_filename, file_contents, content_type)
+    ingest(new_id, original_filename)
+    return new_id
 
 def delete_by_id(id: str):
     """ 
     Deletes a JD.
     1. Deletes the file from the upload directory.
-    2. Removes the row from the CSV metadata file.
+    2. Removes the row from the metadata store.
 
     Args:
         id (str): The UUid of the JD to delete.
@@ -203,9 +209,7 @@ def delete_by_id(id: str):
         FileNotFoundError: If no JD with that id is found.
     """
     print(f"--- Deleting JD by id: {id} ---")
-    all_jds = get_all()  # list[dict]
-
-    jd_to_delete = next((jd for jd in all_jds if jd.get("id") == id), None)
+    jd_to_delete = metadata_store.get(id)
 
     if not jd_to_delete:
         raise FileNotFoundError(f"No metadata found for JD with id: {id}")
@@ -224,30 +228,64 @@ def delete_by_id(id: str):
             print(f"Deleted file: {file_json_path}")
         else:
             print(f"Warning: File not found on disk, but deleting metadata: {file_path}")
+        DocumentRepository("jd").refresh(id)
 
     except Exception as e:
         print(f"Error deleting file: {e}")
         # Decide if you want to stop or continue to delete metadata
         # For this example, we'll continue
 
-    # --- 2. Remove from metadata and re-write CSV ---
-    new_data_list = [jd for jd in all_jds if jd.get("id") != id]
-
-    # Convert list[dict] back to list[list] for writing
-    data_to_write = _convert_dict_to_list(new_data_list)
-
+    # --- 2. Remove from metadata ---
     try:
-        csv_handler.write_to_csv(data_to_write)
+        metadata_store.delete(id)
         print(f"Successfully removed metadata for id: {id}")
+        MatchCache().invalidate(jd_id=id)
     except Exception as e:
         print(f"Error re-writing metadata after deletion: {e}")
-        # At this point, the file is deleted but the CSV is out of sync.
-        # This is a risk of using CSV as a database.
+        # At this point, the file is deleted but the metadata is out of sync.
+
+
+def _file_hash(file_id: str, file_name: str) -> str:
+    return file_hash(str(UPLOAD_DIRECTORY / f"{file_id}.{file_name.split('.')[-1].strip()}"))
 
 
-def __extract_data_to_json__(file_name: str, file_id: str, time: str):
-    print(f"--- Extracting2JSON data from {UPLOAD_DIRECTORY} ---")
-    json_file_path = UPLOAD_DIRECTORY / f"{file_id}.json"
+def _extract_text(file_id: str, file_name: str, file_sha: str = None, on_progress: Callable[[dict], None] = None) -> str:
+    file_extension = file_name.split(".")[-1].strip()
+    file_path = (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}")
+    print(f"--- Extracting text from {file_path} ---")
+
+    # Same bytes uploaded before: reuse the extracted text (no parsing / OCR)
+    file_contents = ExtractionCache().get_text(file_sha) if file_sha else None
+    if file_contents:
+        print(f"Extraction cache hit: {len(file_contents)} characters")
+        if on_progress:
+            # Every page is done at once
+            pages = TextractUtils.count_pages(str(file_path))
+            on_progress({"page": pages, "pages": pages, "source": "cache", "chars": len(file_contents), "seconds": 0.0})
+        return file_contents
+
+    page_texts = []
+    for page in TextractUtils.iter_text_from_file(str(file_path)):
+        page_texts.append(page.pop("text"))
+        if on_progress:
+            on_progress(page)
+    file_contents = "\n".join(page_texts).strip()
+
+    if not file_contents:  # Check for empty string
+        raise Exception(f"No content found: {file_path}")
+    print(f"Content found: {len(file_contents)} characters")
+    if file_sha:
+        ExtractionCache().put_text(file_sha, file_contents)
+    return file_contents
+
+
+def _structure_text(file_id: str, file_name: str, time: str, file_contents: str, file_sha: str = None) -> dict:
+    # Same bytes structured before with this schema/prompt/model: no LLM call, only the ids/times differ
+    cached = ExtractionCache().get_json(file_sha, JD_SCHEMA, Content2Json.PARSE_MODEL, Content2Json.PARSE_PROMPT_VERSION) if file_sha else None
+    if cached:
+        print(f"Extraction cache hit: structured JSON reused for {file_id}")
+        return _patch_metadata(cached, file_id, file_name, time)
+
     meta_data_content = f"""
     ==PRE DATA TO REFERENCE IF OTHER NOT FOUND FIND IN THE DOCUMENT CONTENT==
             "jd_id": {file_id},
@@ -256,31 +294,45 @@ def __extract_data_to_json__(file_name: str, file_id: str, time: str):
             "uploaded_by": find in the document. Admin User as a default value in case not found
     ==END PRE DATA TO REFERENCE IF OTHER NOT FOUND FIND IN THE DOCUMENT CONTENT==
     """
-    file_extension = file_name.split(".")[-1].strip()
-    file_path = (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}")
-    print(f"file_extension: {file_extension}")
-
-    if file_extension == "docx":
-        file_contents = TextractUtils.extract_text_from_docx(str(file_path))
-    elif file_extension == "pdf":
-        file_contents = TextractUtils.extract_text_from_pdf(str(file_path))
-    else:
-        raise Exception(f"Unsupported file extension: {file_extension}")
-
-    if not file_contents:  # Check for empty string
-        raise Exception(f"No content found: {UPLOAD_DIRECTORY}")
-    else:
-        print(f"Content found: {file_contents}")
-        # Extract to JSON (this now returns a dictionary)
-        json_content = Content2Json.parse_content_to_json(
-            content_text=meta_data_content+ file_contents ,
-            parameters_schema=JD_SCHEMA
-        )
+    # Extract to JSON (this returns a dictionary); long documents are structured in parts and merged
+    json_content = Content2Json.parse_long_content_to_json(
+        content_text=file_contents,
+        parameters_schema=JD_SCHEMA,
+        context=meta_data_content
+    )
+    if file_sha:
+        ExtractionCache().put_json(file_sha, JD_SCHEMA, Content2Json.PARSE_MODEL, Content2Json.PARSE_PROMPT_VERSION, json_content)
+    return json_content
+
+
+def _patch_metadata(json_content: dict, file_id: str, file_name: str, time: str) -> dict:
+    """Point a cached structured JSON at the new upload (id, file name, scan time)."""
+    metadata = json_content.get("metadata") or {}
+    metadata.update({"jd_id": file_id, "source_file_name": file_name, "scanned_at": time})
+    json_content["metadata"] = metadata
+    return json_content
+
+
+def _index_document(file_id: str, file_name: str, time: str, json_content: dict) -> None:
+    write_document_json(UPLOAD_DIRECTORY, file_id, json_content)
+    metadata_store.insert(metadata_row(file_id, file_name, time, json_content))
+    print(f"Successfully added metadata for id: {file_id}")
+    # The id may have been used by a deleted JD, drop its cached match results
+    MatchCache().invalidate(jd_id=file_id)
+    DocumentRepository("jd").refresh(file_id)
+
+
+def rollback_upload(file_id: str, file_name: str) -> None:
+    """Remove whatever a failed or interrupted ingestion left: upload, JSON and metadata row."""
+    file_extension = file_name.split(".")[-1]
+    for path in (UPLOAD_DIRECTORY / f"{file_id}.{file_extension}", UPLOAD_DIRECTORY / f"{file_id}.json"):
         try:
-            with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_content, f, indent=2, ensure_ascii=False)
-                print(f"Successfully wrote file: {json_file_path}")
-                return json_content
-        except Exception as e:
-            print(f"Error writing file: {json_file_path}\n{e}")
-            raise
+            if path.exists():
+                os.remove(path)
+                print(f"Rolled back: Deleted {path}")
+        except OSError as os_err:
+            print(f"Rollback failed: Could not delete {path}. Error: {os_err}")
+    # Written last by the indexing stage: only there if the ingestion stopped right after it
+    if metadata_store.delete(file_id):
+        print(f"Rolled back: Deleted metadata for id: {file_id}")
+    DocumentRepository("jd").refresh(file_id)
@@ -1,32 +1,24 @@
 import json
+import asyncio
 
-from .qna_session_mgr             import SessionManager, SessionPhase
+from .qna_session_mgr             import SessionManager, SessionPhase, SessionConflictError
+from .qna_summarizer              import schedule_summary
+from .document_repository         import DocumentRepository
 from ..utilities.openAI_helper    import OpenAIHelper
 from ..utilities.log_manager      import LoggingManager
+from ..utilities.token_utils      import estimate_tokens, estimate_message_tokens
 from data.schema                  import *
-from pathlib                      import Path
 
 # =======================================
 def handle_initialize_interview(jd_id: str = None, cv_id:str = None) -> dict:
     app_logger = LoggingManager().get_logger("AppLogger")
-    try:
-        full_path: str = Path(__file__).resolve().parents[2]/"data"/"upload"/"JD"/f"{jd_id}.json"
-        with open(full_path, 'r') as jd_file:
-            jd_info = json.load(jd_file)
-        if cv_id:
-            full_path: str = Path(__file__).resolve().parents[2] / "data" / "upload" / "CV" / f"{cv_id}.json"
-            with open(full_path, 'r') as cv_file:
-                cv_info = json.load(cv_file)
-        else:
-            cv_info = None
-    except FileNotFoundError as e:
-        app_logger.error(f"The file {e.filename} was not found.")
-        return None
-    except json.JSONDecodeError as e:
-        app_logger.error(f"The file {e.doc} is not a valid JSON.")
+    jd_info = DocumentRepository("jd").get(jd_id)
+    if jd_info is None:
+        app_logger.error(f"The JD {jd_id} was not found.")
         return None
-    except Exception as e:
-        app_logger.error(f"An unexpected error occurred while loading {e}")
+    cv_info = DocumentRepository("cv").get(cv_id) if cv_id else None
+    if cv_id and cv_info is None:
+        app_logger.error(f"The CV {cv_id} was not found.")
         return None
 
     params = {
@@ -74,19 +66,81 @@ Response structure:
     # app_logger.info(cv_info)
     return {"session_id": new_ssid}
 
-# =======================================
-def handle_start_interview(session_id: str = None, user_prompt: str = None) -> str:
+async def ahandle_initialize_interview(jd_id: str = None, cv_id:str = None) -> dict:
     """
-    Handle the start of an interview for the given session ID.
-    This is a placeholder function and should be implemented with actual logic.
+    Async counterpart of `handle_initialize_interview`: the JD/CV documents may have to be read from disk,
+    so it runs on a worker thread instead of the event loop.
     """
+    return await asyncio.to_thread(handle_initialize_interview, jd_id, cv_id)
+
+# =======================================
+#       LLM turn runners
+# =======================================
+# Every LLM-backed handler is split in two: `build_request` returns the `make_request` parameters
+# for the session's turn and `apply_reply` updates the session from the LLM answer and returns the reply.
+# The sync `handle_*` and async `ahandle_*` handlers share them, only the LLM call differs.
+def _run_turn(build_request, apply_reply, session_id: str, user_prompt: str):
     app_logger = LoggingManager().get_logger("AppLogger")
     qna_session_mgr = SessionManager().get_session(session_id)
     if not qna_session_mgr:
         app_logger.error(f"Session ID {session_id} not found.")
         return None
 
-    prompt_text = SessionManager().get_trim_history(session_id)
+    request = build_request(qna_session_mgr, session_id, user_prompt)
+    _log_prompt_size(session_id, qna_session_mgr, request)
+    ai_response = OpenAIHelper().make_request(**request)
+    return _apply_and_save(apply_reply, qna_session_mgr, user_prompt, ai_response)
+
+async def _arun_turn(build_request, apply_reply, session_id: str, user_prompt: str):
+    app_logger = LoggingManager().get_logger("AppLogger")
+    qna_session_mgr = await SessionManager().aget_session(session_id)
+    if not qna_session_mgr:
+        app_logger.error(f"Session ID {session_id} not found.")
+        return None
+
+    request = build_request(qna_session_mgr, session_id, user_prompt)
+    _log_prompt_size(session_id, qna_session_mgr, request)
+    ai_response = await OpenAIHelper().amake_request(**request)
+    return await _aapply_and_save(apply_reply, qna_session_mgr, user_prompt, ai_response)
+
+def _log_prompt_size(session_id: str, qna_session_mgr: dict, request: dict) -> None:
+    """Estimated prompt tokens of the turn (messages + function definitions) and the history window sent."""
+    prompt_tokens = sum(estimate_message_tokens(message) for message in request["msg_prompt"])
+    prompt_tokens += estimate_tokens(json.dumps(request.get("func_defs") or [], ensure_ascii=False))
+    kept, total, history_tokens = getattr(qna_session_mgr, "window", None) or (0, 0, 0)
+    LoggingManager().get_logger("AppLogger").info(
+        f"Turn prompt for session {session_id}: ~{prompt_tokens} tokens, history {kept}/{total} messages (~{history_tokens} tokens)"
+    )
+
+def _apply_and_save(apply_reply, qna_session_mgr: dict, user_prompt: str, ai_response: dict):
+    """Update the session from the LLM answer and store it; the reply is dropped (None) when another request
+    (a double submit, another worker) saved the session first, since it answered an outdated conversation.
+    Messages the next turn will leave out of its history window are then summarized in the background."""
+    reply = apply_reply(qna_session_mgr, user_prompt, ai_response)
+    try:
+        SessionManager().save_session(qna_session_mgr)
+    except SessionConflictError as e:
+        LoggingManager().get_logger("AppLogger").error(f"Interview turn discarded: {e}")
+        return None
+    schedule_summary(qna_session_mgr)
+    return reply
+
+async def _aapply_and_save(apply_reply, qna_session_mgr: dict, user_prompt: str, ai_response: dict):
+    """Async counterpart of `_apply_and_save`: the session is stored from a worker thread, not the event loop."""
+    return await asyncio.to_thread(_apply_and_save, apply_reply, qna_session_mgr, user_prompt, ai_response)
+
+# =======================================
+def handle_start_interview(session_id: str = None, user_prompt: str = None) -> str:
+    """
+    Handle the start of an interview for the given session ID: greet the candidate and generate the questions bank.
+    """
+    return _run_turn(_start_interview_request, _start_interview_reply, session_id, user_prompt)
+
+async def ahandle_start_interview(session_id: str = None, user_prompt: str = None) -> str:
+    return await _arun_turn(_start_interview_request, _start_interview_reply, session_id, user_prompt)
+
+def _start_interview_request(qna_session_mgr: dict, session_id: str, user_prompt: str) -> dict:
+    prompt_text = SessionManager().trim_history(qna_session_mgr)
     prompt_text.append({
         "role": "user",
         "content": f"""
@@ -102,13 +156,15 @@ Required:
     - Ensure that the set of questions includes at least one easy and one hard question that align closely with the job’s key requirements and responsibilities.
     - The question should be added the text transition to(e.g: Question 1: What's...)
 """})
-    ai_response = OpenAIHelper().make_request(
-        msg_prompt = prompt_text,
-        func_defs  = FN_START_INTERVIEWING,
-        func_name  = "auto",
-        temp = 0.9
-    )
+    return {
+        "msg_prompt": prompt_text,
+        "func_defs" : FN_START_INTERVIEWING,
+        "func_name" : "auto",
+        "temp"      : 0.9
+    }
 
+def _start_interview_reply(qna_session_mgr: dict, user_prompt: str, ai_response: dict) -> str:
+    app_logger = LoggingManager().get_logger("AppLogger")
     if "error" in ai_response:
         app_logger.critical(f"OpenAI call failed..... {ai_response['error']}")
         return None
@@ -125,18 +181,20 @@ Required:
 #       Process Interview Answer
 # =======================================
 def handle_readniess_interview(session_id: str = None, user_prompt: str = None) -> str | list:
-    app_logger = LoggingManager().get_logger("AppLogger")
-    qna_session_mgr = SessionManager().get_session(session_id)
-    if not qna_session_mgr:
-        app_logger.error(f"Session ID {session_id} not found.")
-        return None
+    return _run_turn(_readniess_interview_request, _readniess_interview_reply, session_id, user_prompt)
+
+async def ahandle_readniess_interview(session_id: str = None, user_prompt: str = None) -> str | list:
+    return await _arun_turn(_readniess_interview_request, _readniess_interview_reply, session_id, user_prompt)
 
+def _readniess_interview_request(qna_session_mgr: dict, session_id: str, user_prompt: str) -> dict:
     params = {
         "msg_prompt" : None,
         "func_defs" : None,
+        "func_name" : "auto",
+        "temp"      : 0.7
     }
     
-    params["msg_prompt"] = SessionManager().get_trim_history(session_id)
+    params["msg_prompt"] = SessionManager().trim_history(qna_session_mgr)
     if SessionPhase.INTRO == qna_session_mgr["phase"]:
         params["func_defs"] = FN_ASK_FOR_READINESS
         params["msg_prompt"].append({
@@ -165,14 +223,10 @@ Response as:
     next_stage: True only if the candidate's readiness is READY
     text_summarize: Provide a concise, first-person summary of your reply. For example: To clarify, you said.....
 """})
+    return params
 
-    ai_response = OpenAIHelper().make_request(
-        msg_prompt = params["msg_prompt"],
-        func_defs  = params["func_defs"],
-        func_name  = "auto",
-        temp       = 0.7
-    )
-
+def _readniess_interview_reply(qna_session_mgr: dict, user_prompt: str, ai_response: dict) -> str | list:
+    app_logger = LoggingManager().get_logger("AppLogger")
     if "error" in ai_response:
         app_logger.critical(f"OpenAI call failed..... {ai_response['error']}")
         return None
@@ -224,13 +278,13 @@ Response as:
 
 # =======================================
 def handle_qna_interview(session_id: str = None, user_prompt: str = None) -> str | list:
-    app_logger = LoggingManager().get_logger("AppLogger")
-    qna_session_mgr = SessionManager().get_session(session_id)
-    if not qna_session_mgr:
-        app_logger.error(f"Session ID {session_id} not found.")
-        return None
+    return _run_turn(_qna_interview_request, _qna_interview_reply, session_id, user_prompt)
 
-    prompt_text = SessionManager().get_trim_history(session_id)
+async def ahandle_qna_interview(session_id: str = None, user_prompt: str = None) -> str | list:
+    return await _arun_turn(_qna_interview_request, _qna_interview_reply, session_id, user_prompt)
+
+def _qna_interview_request(qna_session_mgr: dict, session_id: str, user_prompt: str) -> dict:
+    prompt_text = SessionManager().trim_history(qna_session_mgr)
     prompt_text.append({
             "role": "user",
             "content": f"""You are supporting a candidate in a Q&A interview.
@@ -258,14 +312,15 @@ Instructions:
         - Provide a short positive text or clarification to reinforce the concept.
         - Transition smoothly to the next question (e.g: use natural connectors like “Great job on that! Let’s move on to the next question…”).
 """})
+    return {
+        "msg_prompt": prompt_text,
+        "func_defs" : FN_QNA_INTERVIEW,
+        "func_name" : "auto",
+        "temp"      : 0.5
+    }
 
-    ai_response = OpenAIHelper().make_request(
-        msg_prompt = prompt_text,
-        func_defs  = FN_QNA_INTERVIEW,
-        func_name  = "auto",
-        temp       = 0.5
-    )
-
+def _qna_interview_reply(qna_session_mgr: dict, user_prompt: str, ai_response: dict) -> str | list:
+    app_logger = LoggingManager().get_logger("AppLogger")
     if "error" in ai_response:
         app_logger.critical(f"OpenAI call failed..... {ai_response['error']}")
         return None
@@ -317,13 +372,13 @@ Instructions:
 
 # =======================================
 def handle_warmup_interview(session_id: str = None, user_prompt: str = None) -> str | list:
-    app_logger = LoggingManager().get_logger("AppLogger")
-    qna_session_mgr = SessionManager().get_session(session_id)
-    if not qna_session_mgr:
-        app_logger.error(f"Session ID {session_id} not found.")
-        return None
+    return _run_turn(_warmup_interview_request, _warmup_interview_reply, session_id, user_prompt)
 
-    prompt_text = SessionManager().get_trim_history(session_id)
+async def ahandle_warmup_interview(session_id: str = None, user_prompt: str = None) -> str | list:
+    return await _arun_turn(_warmup_interview_request, _warmup_interview_reply, session_id, user_prompt)
+
+def _warmup_interview_request(qna_session_mgr: dict, session_id: str, user_prompt: str) -> dict:
+    prompt_text = SessionManager().trim_history(qna_session_mgr)
     prompt_text.append({
             "role": "user",
             "content": f"""
@@ -335,14 +390,15 @@ Instructions:
     2. Politely ask if the candidate has any questions, confusion, or concerns they’d like to discuss.
     3. If the candidate has no further questions, close with an encouraging message that wishes them confidence and growth in their real interview.
 """})
+    return {
+        "msg_prompt": prompt_text,
+        "func_defs" : FN_WARMUP_INTERVIEW,
+        "func_name" : "auto",
+        "temp"      : 0.9
+    }
 
-    ai_response = OpenAIHelper().make_request(
-        msg_prompt = prompt_text,
-        func_defs  = FN_WARMUP_INTERVIEW,
-        func_name  = "auto",
-        temp       = 0.9
-    )
-
+def _warmup_interview_reply(qna_session_mgr: dict, user_prompt: str, ai_response: dict) -> str | list:
+    app_logger = LoggingManager().get_logger("AppLogger")
     if "error" in ai_response:
         app_logger.critical(f"OpenAI call failed..... {ai_response['error']}")
         return None
@@ -373,6 +429,46 @@ Instructions:
     app_logger.info(f"PHASE CHANGED: {qna_session_mgr['phase']}\n\n")
     return ai_reply_text
 
+# =======================================
+#       Streamed interview turn
+# =======================================
+# Per session phase: the turn's request builder, reply applier and the tool argument shown to the candidate
+_STREAMED_TURNS = {
+    SessionPhase.UNKNOWN:   (_start_interview_request, _start_interview_reply, "intro"),
+    SessionPhase.INTRO:     (_readniess_interview_request, _readniess_interview_reply, "text"),
+    SessionPhase.READINESS: (_readniess_interview_request, _readniess_interview_reply, "text"),
+    SessionPhase.INTERVIEW: (_qna_interview_request, _qna_interview_reply, "text"),
+    SessionPhase.WARMUP:    (_warmup_interview_request, _warmup_interview_reply, "text"),
+}
+
+async def acan_stream_turn(session_id: str = None) -> bool:
+    qna_session_mgr = await SessionManager().aget_session(session_id)
+    return bool(qna_session_mgr) and qna_session_mgr["phase"] in _STREAMED_TURNS
+
+async def astream_interview_turn(session_id: str = None, user_prompt: str = None):
+    """
+    Streaming counterpart of the `ahandle_*` handler of the session's current phase.
+    Yields `{"delta": text}` while the assistant's reply is generated, then `{"reply": ...}` once the
+    function-call arguments are complete and the session is updated (reply is None when the turn failed).
+    """
+    app_logger = LoggingManager().get_logger("AppLogger")
+    qna_session_mgr = await SessionManager().aget_session(session_id)
+    if not qna_session_mgr or qna_session_mgr["phase"] not in _STREAMED_TURNS:
+        app_logger.error(f"Session ID {session_id} not found or not in a streamable phase.")
+        yield {"reply": None}
+        return
+
+    build_request, apply_reply, stream_field = _STREAMED_TURNS[qna_session_mgr["phase"]]
+    ai_response = {"error": "The LLM stream ended without a result"}
+    request = build_request(qna_session_mgr, session_id, user_prompt)
+    _log_prompt_size(session_id, qna_session_mgr, request)
+    async for event in OpenAIHelper().astream_request(**request, stream_field = stream_field):
+        if "delta" in event:
+            yield event
+        else:
+            ai_response = event
+    yield {"reply": await _aapply_and_save(apply_reply, qna_session_mgr, user_prompt, ai_response)}
+
 # =======================================
 def handle_build_interview_summary(session_id: str = None) -> dict:
     qna_session_mgr = SessionManager().get_session(session_id)
@@ -1,10 +1,41 @@
+import os
+import json
+import time
 import uuid
-import copy
+import zlib
+import asyncio
+import threading
 
 from enum                       import Enum
+from pathlib                    import Path
 from threading                  import Lock
+from collections                import OrderedDict
 
-__all__ = ["SessionManager", "SessionPhase"]
+from ..utilities.session_store  import SessionStore, StoredSession, SessionConflictError, create_session_store
+from ..utilities.token_utils    import estimate_message_tokens
+from ..utilities.log_manager    import LoggingManager
+
+__all__ = ["SessionManager", "SessionPhase", "Session", "SessionConflictError", "archive_transcript"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+
+# Sessions idle longer than the TTL (seconds, 0 = never) are dropped, then the least recently used ones
+# above the session count / size bounds (0 = unbounded). The sweeper checks every SESSION_SWEEP_INTERVAL seconds.
+SESSION_IDLE_TTL        = float(os.getenv("SESSION_IDLE_TTL", "3600"))
+SESSION_MAX_COUNT       = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+SESSION_MAX_MEMORY_MB   = float(os.getenv("SESSION_MAX_MEMORY_MB", "256"))
+SESSION_SWEEP_INTERVAL  = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+# Transcripts of evicted sessions are archived here (empty = not archived)
+SESSION_ARCHIVE_DIR     = os.getenv("SESSION_ARCHIVE_DIR", str(BASE_DIR / "data" / "session_archive"))
+# Estimated tokens of conversation history sent with each turn (0 = whole history)
+HISTORY_TOKEN_BUDGET    = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+# Part of the budget kept for the running summary of the messages left out of the window (0 = no summary)
+HISTORY_SUMMARY_TOKENS  = int(os.getenv("HISTORY_SUMMARY_TOKENS", "400"))
+
+# Reading a session refreshes its last access at most this often (seconds): saves refresh it anyway
+_TOUCH_INTERVAL = 60
+# Decoded JD/CV of the recently used sessions: they never change once the session is created
+_META_CACHE_SIZE = 256
 
 # ========================================
 #        QnA Session Phases
@@ -17,10 +48,99 @@ class SessionPhase(Enum):
     COMPLETED = 5
     UNKNOWN   = 99
 
+# ========================================
+#    Loaded session
+# ========================================
+class Session(dict):
+    """
+    A session as returned by `SessionManager.get_session`: the session dict (phase, question, jd_meta, cv_meta,
+    conversation_history, summary), private to the caller. Changes are only shared once passed to `save_session`,
+    except the summary ({"text", "upto": history messages it covers}), written with `save_summary`.
+    """
+    __slots__ = ("session_id", "version", "saved_messages", "message_bytes", "meta_bytes", "message_tokens", "window")
+
+    def history_tokens(self) -> list:
+        """
+        Estimated tokens of each history message, counted once per message (the history is append-only):
+        the count is saved with the message, loaded messages come with theirs.
+        """
+        history = self["conversation_history"]
+        if len(history) < len(self.message_tokens):
+            self.message_tokens = []
+        self.message_tokens += [estimate_message_tokens(message) for message in history[len(self.message_tokens):]]
+        return self.message_tokens
+
+# ========================================
+#    Compact serialization
+# ========================================
+# state: [phase value, total, current, question items]; message: [role, content, estimated tokens]
+# (other shapes as the dict); meta: zlib-compressed [jd_meta, cv_meta]
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+def _encode_state(session: dict) -> str:
+    question = session["question"]
+    return _dumps([session["phase"].value, question["total"], question["current"], question["items"]])
+
+def _encode_message(message: dict, tokens: int) -> str:
+    return _dumps([message["role"], message["content"], tokens] if message.keys() == {"role", "content"} else message)
+
+def _decode_message(data: str) -> tuple[dict, int]:
+    """The message and its estimated tokens (counted here for the other shapes and messages saved without them)."""
+    value = json.loads(data)
+    if not isinstance(value, list):
+        return value, estimate_message_tokens(value)
+    message = {"role": value[0], "content": value[1]}
+    return message, value[2] if len(value) > 2 else estimate_message_tokens(message)
+
+def _encode_meta(jd_meta, cv_meta) -> bytes:
+    return zlib.compress(_dumps([jd_meta, cv_meta]).encode("utf-8"))
+
+def _decode_meta(data: bytes) -> tuple:
+    jd_meta, cv_meta = json.loads(zlib.decompress(data))
+    return jd_meta, cv_meta
+
+def _encoded_size(data: str) -> int:
+    return len(data.encode("utf-8"))
+
+# ========================================
+#    Default eviction callback
+# ========================================
+def _document_id(meta, key: str):
+    return (meta.get("metadata") or {}).get(key) if isinstance(meta, dict) else None
+
+def archive_transcript(session_id: str, session: dict, reason: str) -> None:
+    """Write the transcript of an evicted session to SESSION_ARCHIVE_DIR/<session_id>.json."""
+    archive_dir = Path(SESSION_ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    transcript = {
+        "session_id": session_id,
+        "reason": reason,
+        "evicted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "phase": session["phase"].name,
+        "question": session["question"],
+        "jd_id": _document_id(session["jd_meta"], "jd_id"),
+        "cv_id": _document_id(session["cv_meta"], "cv_id"),
+        # Without the system prompt
+        "conversation_history": session["conversation_history"][1:]
+    }
+    with open(archive_dir / f"{session_id}.json", "w", encoding="utf-8") as f:
+        json.dump(transcript, f, indent=2, ensure_ascii=False, default=str)
+
 # ========================================
 #    QnA Session Manager
 # ========================================
 class SessionManager:
+    """
+    Interview sessions kept in the SESSION_BACKEND store (see `create_session_store`), so every uvicorn
+    worker sees the same sessions and they survive restarts. `get_session` returns a private copy; a turn
+    applies its changes with `save_session`, which fails with SessionConflictError when another request
+    saved the session first (optimistic concurrency: the losing turn is rejected, not merged).
+
+    A session is dropped once idle for SESSION_IDLE_TTL, or when the session count / total size exceeds its
+    bound (least recently used first); the eviction callbacks (archive_transcript by default) receive it
+    before it is dropped. Explicit deletes do not trigger them.
+    """
     _instance = None
     _lock = Lock()
 
@@ -28,46 +148,273 @@ class SessionManager:
         if not cls._instance:
             with cls._lock:
                 if not cls._instance:
-                    cls._instance = super(SessionManager, cls).__new__(cls)         
-                    cls._instance._sessions     = {}
-                    cls._instance._session_lock = Lock()
+                    instance = super(SessionManager, cls).__new__(cls)
+                    instance._store: SessionStore = create_session_store()
+                    instance._session_lock  = Lock()
+                    instance._meta_cache    = OrderedDict()
+                    instance._callbacks     = [archive_transcript] if SESSION_ARCHIVE_DIR else []
+                    instance._evictions     = {"idle": 0, "capacity": 0, "memory": 0}
+                    instance._sweeper       = None
+                    cls._instance = instance
         return cls._instance
 
     def create_session(self, **kwargs) -> str:
+        self._start_sweeper()
+        session_id = str(uuid.uuid4().hex[-8:])
+        session = {
+            "phase": kwargs.get("phase_state", SessionPhase.UNKNOWN),
+            "question": {
+                "total": kwargs.get("total_question", 0),
+                "current": kwargs.get("current_question", 0),
+                "items": kwargs.get("question_items", [])
+            },
+            "jd_meta": kwargs.get("jd_meta", []),
+            "cv_meta": kwargs.get("cv_meta", []),
+            "conversation_history": [{"role": "system", "content": kwargs.get("sys_prompt", None)}]
+        }
+        state = _encode_state(session)
+        meta = _encode_meta(session["jd_meta"], session["cv_meta"])
+        messages = [_encode_message(message, estimate_message_tokens(message)) for message in session["conversation_history"]]
+        size = _encoded_size(state) + len(meta) + sum(_encoded_size(message) for message in messages)
+        self._store.create(session_id, state, meta, messages, size)
+        self._cache_meta(session_id, (session["jd_meta"], session["cv_meta"]))
+
+        count, total = self._store.totals()
+        if (SESSION_MAX_COUNT > 0 and count > SESSION_MAX_COUNT) or \
+                (SESSION_MAX_MEMORY_MB > 0 and total > SESSION_MAX_MEMORY_MB * 1024 * 1024):
+            self._notify(self._evict_over_bounds(self._store.usage(), keep=session_id))
+        return session_id
+
+    def get_session(self, session_id: str = None) -> Session:
+        if not session_id:
+            return None
         with self._session_lock:
-            session_id = str(uuid.uuid4().hex[-8:])
-            self._sessions[session_id] = {
-                "phase": kwargs.get("phase_state", SessionPhase.UNKNOWN),
-                "question": {
-                    "total": kwargs.get("total_question", 0),
-                    "current": kwargs.get("current_question", 0),
-                    "items": kwargs.get("question_items", [])
-                },
-                "jd_meta": kwargs.get("jd_meta", []),
-                "cv_meta": kwargs.get("cv_meta", []),
-                "conversation_history": [{"role": "system", "content": kwargs.get("sys_prompt", None)}]
-            }
-            return session_id
-    
-    def get_session(self, session_id: str = None) -> str:
-        return self._sessions.get(session_id) if session_id else None
-    
-    def get_trim_history(self, session_id: str = None, max_hst: int = 20, msg_nb_first: int = 6) -> list:
-        if session_id not in self._sessions:
+            meta = self._meta_cache.get(session_id)
+            if meta is not None:
+                self._meta_cache.move_to_end(session_id)
+        stored = self._store.load(session_id, with_meta=meta is None)
+        if stored is None:
             return None
+        if time.time() - stored.last_access > _TOUCH_INTERVAL:
+            self._store.touch(session_id)
+        if meta is None:
+            meta = _decode_meta(stored.meta)
+            self._cache_meta(session_id, meta)
+        return self._session(session_id, stored, meta)
+
+    def save_session(self, session: Session) -> None:
+        """
+        Write back a session returned by `get_session`: its state, and only the messages added to the history
+        since it was loaded (the whole history if it was shortened). Raises SessionConflictError when the session
+        was saved by another request or removed in the meantime.
+        """
+        history = session["conversation_history"]
+        messages_from = session.saved_messages if len(history) >= session.saved_messages else 0
+        tokens = session.history_tokens()
+        messages = [_encode_message(message, count) for message, count in zip(history[messages_from:], tokens[messages_from:])]
+        message_bytes = (session.message_bytes if messages_from else 0) + sum(_encoded_size(message) for message in messages)
+        state = _encode_state(session)
+        size = _encoded_size(state) + session.meta_bytes + message_bytes
+        session.version = self._store.save(session.session_id, session.version, state, messages_from, messages, size)
+        session.saved_messages = len(history)
+        session.message_bytes = message_bytes
 
-        # Safety copy
-        chat_hst = copy.deepcopy(self._sessions[session_id]["conversation_history"])
-        if len(chat_hst) <= max_hst:
-            return chat_hst
+    # The store may block (SQLite busy timeout, Redis round-trips): async handlers use these on a worker thread
+    async def aget_session(self, session_id: str = None) -> Session:
+        return await asyncio.to_thread(self.get_session, session_id)
 
-        stat = min(msg_nb_first, max_hst)
-        end = max_hst - stat
-        return chat_hst[:stat] + chat_hst[-end:] if end > 0 else chat_hst[:]
+    async def asave_session(self, session: Session) -> None:
+        await asyncio.to_thread(self.save_session, session)
+
+    def get_trim_history(self, session_id: str = None, max_hst: int = None, msg_nb_first: int = 6,
+                         token_budget: int = None) -> list:
+        session = self.get_session(session_id)
+        if session is None:
+            return None
+        return self.trim_history(session, max_hst, msg_nb_first, token_budget)
+
+    def trim_history(self, session: Session, max_hst: int = None, msg_nb_first: int = 6, token_budget: int = None) -> list:
+        """
+        The history to send with the session's next turn (see `history_window`), the session's summary standing in
+        for the messages left out. The list is new, the messages are the session's own: append to it, don't modify
+        them. `session.window` records (messages kept, history length, estimated tokens sent).
+        """
+        history = session["conversation_history"]
+        tokens = session.history_tokens()
+        pinned, start = self.history_window(session, max_hst, msg_nb_first, token_budget)
+
+        window = history[:pinned]
+        window_tokens = sum(tokens[:pinned]) + sum(tokens[start:])
+        summary = session.get("summary")
+        if start > pinned and summary and summary["upto"] > pinned:
+            summary_message = {"role": "system", "content": f"Summary of the earlier interview:\n{summary['text']}"}
+            window.append(summary_message)
+            window_tokens += estimate_message_tokens(summary_message)
+        window += history[start:]
+        session.window = (len(window), len(history), window_tokens)
+        return window
+
+    def history_window(self, session: Session, max_hst: int = None, msg_nb_first: int = 6,
+                       token_budget: int = None) -> tuple[int, int]:
+        """
+        (pinned, start): the history sent is `history[:pinned] + history[start:]`. The first `msg_nb_first` messages
+        (system prompt, intro) are pinned, then come the newest messages that fit in `token_budget`
+        (HISTORY_TOKEN_BUDGET by default) and, if given, in `max_hst` messages; the newest message is always kept.
+        When messages have to be left out, HISTORY_SUMMARY_TOKENS of the budget are kept for the summary.
+        """
+        history = session["conversation_history"]
+        tokens = session.history_tokens()
+        token_budget = HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+        max_hst = max_hst or len(history)
+
+        pinned = min(msg_nb_first, max_hst, len(history))
+        if len(history) <= max_hst and (token_budget <= 0 or sum(tokens) <= token_budget):
+            return pinned, pinned
+        budget = token_budget - sum(tokens[:pinned]) - HISTORY_SUMMARY_TOKENS if token_budget > 0 else float("inf")
+        start = len(history)
+        while start > pinned and len(history) - start + pinned < max_hst:
+            if tokens[start - 1] > budget and start < len(history):
+                break
+            budget -= tokens[start - 1]
+            start -= 1
+        return pinned, start
+
+    def save_summary(self, session_id: str, text: str, upto: int) -> bool:
+        """Store the running summary of the first `upto` history messages; the session's version is unchanged."""
+        return self._store.save_summary(session_id, _dumps([upto, text]))
 
     def delete_session(self, session_id: str = None) -> bool:
         with self._session_lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
-                return True
-            return False
\ No newline at end of file
+            self._meta_cache.pop(session_id, None)
+        return self._store.delete(session_id)
+
+    def _session(self, session_id: str, stored: StoredSession, meta: tuple) -> Session:
+        phase, total, current, items = json.loads(stored.state)
+        history = [_decode_message(message) for message in stored.messages]
+        session = Session(
+            phase = SessionPhase(phase),
+            question = {"total": total, "current": current, "items": items},
+            jd_meta = meta[0],
+            cv_meta = meta[1],
+            conversation_history = [message for message, _ in history],
+            summary = dict(zip(("upto", "text"), json.loads(stored.summary))) if stored.summary else None
+        )
+        session.session_id = session_id
+        session.version = stored.version
+        session.saved_messages = len(stored.messages)
+        session.message_bytes = sum(_encoded_size(message) for message in stored.messages)
+        session.meta_bytes = stored.size - _encoded_size(stored.state) - session.message_bytes
+        session.message_tokens = [tokens for _, tokens in history]
+        session.window = None
+        return session
+
+    def _cache_meta(self, session_id: str, meta: tuple) -> None:
+        with self._session_lock:
+            self._meta_cache[session_id] = meta
+            self._meta_cache.move_to_end(session_id)
+            while len(self._meta_cache) > _META_CACHE_SIZE:
+                self._meta_cache.popitem(last=False)
+
+    # ========================================
+    #           Eviction
+    # ========================================
+    def add_eviction_callback(self, callback) -> None:
+        """Register `callback(session_id, session, reason)`, called before an evicted session is dropped
+        (reason: "idle", "capacity" or "memory"). Callbacks run outside the session lock."""
+        with self._session_lock:
+            self._callbacks.append(callback)
+
+    def remove_eviction_callback(self, callback) -> None:
+        with self._session_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def sweep(self) -> int:
+        """Evict the idle sessions, then the least recently used ones above the bounds; returns the number evicted."""
+        usage = self._store.usage()
+        evicted = []
+        if SESSION_IDLE_TTL > 0:
+            expired_before = time.time() - SESSION_IDLE_TTL
+            # Least recently used first: stop at the first session still in use
+            while usage and usage[0][1] <= expired_before:
+                session_id, last_access, _ = usage.pop(0)
+                evicted += self._pop(session_id, last_access, "idle")
+        evicted += self._evict_over_bounds(usage)
+        self._notify(evicted)
+        return len(evicted)
+
+    def _evict_over_bounds(self, usage: list, keep: str = None) -> list:
+        """Evict from `usage` (least recently used first) down to the session count and size bounds."""
+        evicted = []
+        usage = [entry for entry in usage if entry[0] != keep]
+        count = len(usage) + (keep is not None)
+        while SESSION_MAX_COUNT > 0 and count > SESSION_MAX_COUNT and usage:
+            session_id, last_access, _ = usage.pop(0)
+            evicted += self._pop(session_id, last_access, "capacity")
+            count -= 1
+        if SESSION_MAX_MEMORY_MB > 0:
+            max_bytes = SESSION_MAX_MEMORY_MB * 1024 * 1024
+            total = self._store.totals()[1]
+            while total > max_bytes and usage:
+                session_id, last_access, size = usage.pop(0)
+                evicted += self._pop(session_id, last_access, "memory")
+                total -= size
+        return evicted
+
+    def _pop(self, session_id: str, last_access: float, reason: str) -> list:
+        # Not evicted when used since it was listed, or when another worker evicted it first
+        stored = self._store.pop(session_id, last_access)
+        if stored is None:
+            return []
+        with self._session_lock:
+            self._evictions[reason] += 1
+            meta = self._meta_cache.pop(session_id, None)
+        return [(session_id, self._session(session_id, stored, meta or _decode_meta(stored.meta)), reason)]
+
+    def _notify(self, evicted: list) -> None:
+        if not evicted:
+            return
+        with self._session_lock:
+            callbacks = list(self._callbacks)
+        for session_id, session, reason in evicted:
+            for callback in callbacks:
+                try:
+                    callback(session_id, session, reason)
+                except Exception as e:
+                    LoggingManager().get_logger("AppLogger").error(f"Eviction callback failed for session {session_id}: {e}")
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper is not None or SESSION_SWEEP_INTERVAL <= 0:
+            return
+        with self._session_lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(SESSION_SWEEP_INTERVAL)
+            try:
+                self.sweep()
+            except Exception as e:
+                LoggingManager().get_logger("AppLogger").error(f"Session sweep failed: {e}")
+
+    # ========================================
+    #           Metrics
+    # ========================================
+    def stats(self) -> dict:
+        """Session count and serialized size in the store, bounds, and the evictions made by this process by reason."""
+        usage = self._store.usage()
+        with self._session_lock:
+            evictions = dict(self._evictions)
+        return {
+            "backend": type(self._store).__name__,
+            "sessions": len(usage),
+            "memory_bytes": sum(size for _, _, size in usage),
+            "largest_bytes": max((size for _, _, size in usage), default=0),
+            "oldest_idle_s": round(time.time() - usage[0][1], 1) if usage else 0.0,
+            "idle_ttl_s": SESSION_IDLE_TTL,
+            "max_sessions": SESSION_MAX_COUNT,
+            "max_memory_mb": SESSION_MAX_MEMORY_MB,
+            "evicted": evictions
+        }
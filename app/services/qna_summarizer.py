@@ -0,0 +1,87 @@
+import os
+import threading
+
+from concurrent.futures           import ThreadPoolExecutor
+
+from .qna_session_mgr             import SessionManager, Session, HISTORY_SUMMARY_TOKENS
+from ..utilities.openAI_helper    import OpenAIHelper
+from ..utilities.llm_scheduler    import llm_priority
+from ..utilities.log_manager      import LoggingManager
+
+__all__ = ["schedule_summary", "summarize_session"]
+
+# Summaries being written at once (background threads of this process)
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY, thread_name_prefix="qna-summary")
+_pending: set = set()
+_pending_lock = threading.Lock()
+
+# =======================================
+#       Rolling interview summary
+# =======================================
+# Once an interview outgrows the history window (SessionManager.history_window), the messages left out are
+# folded into a running summary stored on the session, which `trim_history` sends in their place.
+# It runs in the background right after a turn is saved: the window of the next turn is the one computed
+# on the saved history, so the summary is ready unless the candidate answers faster than the summary is written.
+def _needs_summary(qna_session_mgr: Session) -> bool:
+    pinned, start = SessionManager().history_window(qna_session_mgr)
+    summary = qna_session_mgr.get("summary") or {"upto": pinned}
+    return start > max(summary["upto"], pinned)
+
+def schedule_summary(qna_session_mgr: Session) -> bool:
+    """Summarize the messages the session's next turn will leave out, on a background thread (non-blocking)."""
+    if HISTORY_SUMMARY_TOKENS <= 0 or not _needs_summary(qna_session_mgr):
+        return False
+    session_id = qna_session_mgr.session_id
+    with _pending_lock:
+        # One summary per session at a time: the next turn catches up on what this one didn't fold
+        if session_id in _pending:
+            return False
+        _pending.add(session_id)
+    _executor.submit(_summarize_pending, session_id)
+    return True
+
+def _summarize_pending(session_id: str) -> None:
+    try:
+        summarize_session(session_id)
+    except Exception as e:
+        LoggingManager().get_logger("AppLogger").error(f"Summary of session {session_id} failed: {e}")
+    finally:
+        with _pending_lock:
+            _pending.discard(session_id)
+
+@llm_priority("report")
+def summarize_session(session_id: str) -> bool:
+    """Fold the history messages left out of the window, and not yet summarized, into the session's summary."""
+    app_logger = LoggingManager().get_logger("AppLogger")
+    qna_session_mgr = SessionManager().get_session(session_id)
+    if not qna_session_mgr:
+        return False
+
+    history = qna_session_mgr["conversation_history"]
+    pinned, start = SessionManager().history_window(qna_session_mgr)
+    summary = qna_session_mgr.get("summary") or {"text": "", "upto": pinned}
+    upto = max(summary["upto"], pinned)
+    if start <= upto:
+        return False
+
+    transcript = "\n".join(f"{message['role']}: {message.get('content') or ''}" for message in history[upto:start])
+    ai_response = OpenAIHelper().make_request(
+        msg_prompt=[
+            {"role": "system", "content": f"""You keep the running summary of a job interview between an AI interviewer (assistant) and a candidate (user).
+Update the summary with the new part of the transcript. Keep, for every question: the question, the key points of the candidate's answer (facts, technologies, examples, numbers), their strengths and gaps, and any follow-up or clarification.
+Also keep what the candidate said about themselves and any request they made. Drop greetings and filler.
+Write it in the language of the interview, as compact notes, under {HISTORY_SUMMARY_TOKENS // 2} words. Reply with the summary only."""},
+            {"role": "user", "content": f"Current summary:\n{summary['text'] or '(none yet)'}\n\nNew part of the transcript:\n{transcript}"}
+        ],
+        temp=0.2,
+        max_ouput_tokens=HISTORY_SUMMARY_TOKENS
+    )
+    if "error" in ai_response or not ai_response.get("msg_text"):
+        app_logger.error(f"Summary of session {session_id} failed: {ai_response.get('error', 'empty reply')}")
+        return False
+
+    saved = SessionManager().save_summary(session_id, ai_response["msg_text"], start)
+    app_logger.info(f"Summary of session {session_id} now covers {start}/{len(history)} messages")
+    return saved
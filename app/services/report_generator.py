@@ -4,6 +4,7 @@ from pathlib import Path
 from datetime import datetime
 
 from app.utilities.openAI_helper import OpenAIHelper
+from app.utilities.llm_scheduler import llm_priority
 from app.services.qna_generator import handle_build_interview_summary
 
 class ReportGenerator:
@@ -97,6 +98,7 @@ Respond strictly as JSON with this structure:
         except json.JSONDecodeError:
             return None
 
+    @llm_priority("report")
     def report_interview(self, session_id: str) -> dict:
         # Get the raw interview JSON
         interview_json = handle_build_interview_summary(session_id)
@@ -1,9 +1,15 @@
 import json
 import os
-from openai import AzureOpenAI
-from typing import List, Dict, Any
-from pathlib import Path
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from dotenv import load_dotenv
+from app.utilities.match_cache import MatchCache, content_hash
+from app.utilities.llm_gateway import LLMGateway
+from app.utilities.llm_scheduler import llm_priority, llm_deadline
+from app.services.cv_preranker import prerank_cvs
+from app.services.document_repository import DocumentRepository
 
 # =======================================================
 # 1. Config Azure OpenAI
@@ -14,17 +20,22 @@ AZURE_OPENAI_ENDPOINT = os.getenv("OPENAI_URL")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("OPENAI_QNA_MODEL")
 AZURE_OPENAI_API_VERSION = "2024-07-01-preview"
 
+# Batch matching: how many CVs are scored in parallel and how long (seconds) scoring one CV may take overall:
+# queueing for an LLM slot, rate limiting, every attempt and the waits between retries
+BATCH_MATCH_CONCURRENCY = int(os.getenv("BATCH_MATCH_CONCURRENCY", "8"))
+BATCH_MATCH_TIMEOUT = float(os.getenv("BATCH_MATCH_TIMEOUT", "60"))
+# Local pre-ranking before LLM scoring: keep the best K CVs and/or those scoring >= threshold (0..1), empty = keep all
+PRERANK_TOP_K = int(os.getenv("PRERANK_TOP_K")) if os.getenv("PRERANK_TOP_K") else None
+PRERANK_MIN_SCORE = float(os.getenv("PRERANK_MIN_SCORE")) if os.getenv("PRERANK_MIN_SCORE") else None
+
 # Setting Client
 client = None
 try:
     if not all([AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT]):
         print("WARNING: Please set the environment variables AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT.")
     else:
-        client = AzureOpenAI(
-            api_key=AZURE_OPENAI_KEY,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            api_version=AZURE_OPENAI_API_VERSION
-        )
+        # Shared connection pool with the other LLM call sites
+        client = LLMGateway().azure_client(AZURE_OPENAI_API_VERSION)
 except Exception as e:
     print(f"Azure OpenAI configuration error: {e}")
 
@@ -74,97 +85,131 @@ tools = [
 ]
 
 # =======================================================
-# 3. Read File JSON
+# 3. Batch Process Function
 # =======================================================
-def read_cv_by_json(folder_path, item_type):
-    """Read all JSON files in the directory and return them as a list of dictionaries."""
-    items = []
-    if not os.path.exists(folder_path):
-        print(f"Error: The directory path does not exist: {folder_path}")
-        return items
-        
-    for filename in os.listdir(folder_path):
-        if filename.endswith('.json'):
-            file_path = os.path.join(folder_path, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                try:
-                    data = json.load(f)
-                    if item_type == 'cv':
-                        items.append({"id": data.get('basics', {}).get('cv_id'), "content": json.dumps(data, ensure_ascii=False, indent=2)})
-                    else:
-                        items.append(data)
-                except json.JSONDecodeError:
-                    print(f"Warning: Error: Failed to read the JSON file {filename}.")
-                    continue
-    return items
+MATCH_SYSTEM_PROMPT = (
+    "Bạn là một chuyên gia Tuyển dụng. Nhiệm vụ của bạn là so sánh một Hồ sơ Ứng viên (CV) với Mô tả Công việc (Job Summary) và sử dụng hàm `match_cv_to_job` để trả về điểm số, giải thích và các kỹ năng còn thiếu. "
+    "Đánh giá một cách nghiêm túc, khách quan, dựa trên các tiêu chí trong phần 'match_criteria' của Job Summary và chỉ sử dụng hàm sau khi đánh giá. Chỉ sử dụng hàm `match_cv_to_job`."
+)
+MATCH_USER_PROMPT = (
+    "Đây là Mô tả Công việc:\n---\n{job_summary}\n---\n\n"
+    "Đây là Hồ sơ Ứng viên (CV) cần đánh giá:\n---\n{cv_content}\n---\n"
+    "Hãy đánh giá và gọi hàm `match_cv_to_job`."
+)
+# Part of the match cache key: any change to the prompts or the tool definition invalidates cached scores
+MATCH_PROMPT_VERSION = hashlib.sha256(
+    (MATCH_SYSTEM_PROMPT + MATCH_USER_PROMPT + json.dumps(tools, sort_keys=True)).encode("utf-8")
+).hexdigest()[:16]
 
-# =======================================================
-# 4. Batch Process Function
-# =======================================================
-def process_cv_batch(cv_list: List[Dict[str, Any]], job_summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+def score_cv(cv_data: Dict[str, Any], job_summary_str: str, job_title: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
-    Perform batch processing of CVs by sending each CV and the corresponding Job Summary to Azure OpenAI, utilizing Function Calling to evaluate their relevance.
+    Score a single CV against the serialized Job Summary with one LLM call.
+    Never raises: any API, timeout or parsing failure is reported in the "error" field of the result.
     """
-    if not client:
-        return []
-    
-    job_title = job_summary.get('basic_info', {}).get('job_title', 'Job Title Unknown')
-    job_summary_str = json.dumps(job_summary, ensure_ascii=False, indent=2)
-    results = []
-    
-    for cv_data in cv_list:
-        cv_id = cv_data["id"]
-        cv_content_str = cv_data["content"]
-        
-        system_prompt = (
-            "Bạn là một chuyên gia Tuyển dụng. Nhiệm vụ của bạn là so sánh một Hồ sơ Ứng viên (CV) với Mô tả Công việc (Job Summary) và sử dụng hàm `match_cv_to_job` để trả về điểm số, giải thích và các kỹ năng còn thiếu. "
-            "Đánh giá một cách nghiêm túc, khách quan, dựa trên các tiêu chí trong phần 'match_criteria' của Job Summary và chỉ sử dụng hàm sau khi đánh giá. Chỉ sử dụng hàm `match_cv_to_job`."
-        )
-        user_prompt = (
-            f"Đây là Mô tả Công việc:\n---\n{job_summary_str}\n---\n\n"
-            f"Đây là Hồ sơ Ứng viên (CV) cần đánh giá:\n---\n{cv_content_str}\n---\n"
-            "Hãy đánh giá và gọi hàm `match_cv_to_job`."
-        )
-        
-        try:
+    cv_id = cv_data["id"]
+    cv_content_str = cv_data["content"]
+
+    user_prompt = MATCH_USER_PROMPT.format(job_summary=job_summary_str, cv_content=cv_content_str)
+
+    try:
+        # Batch class: live interview turns are served first (LLMScheduler)
+        with llm_priority("batch"), llm_deadline(timeout or BATCH_MATCH_TIMEOUT):
             response = client.chat.completions.create(
                 model=AZURE_OPENAI_DEPLOYMENT_NAME,
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+                messages=[{"role": "system", "content": MATCH_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
                 tools=tools,
-                tool_choice={"type": "function", "function": {"name": "match_cv_to_job"}}
+                tool_choice={"type": "function", "function": {"name": "match_cv_to_job"}},
+                timeout=timeout or BATCH_MATCH_TIMEOUT
             )
-            
-            tool_calls = response.choices[0].message.tool_calls
-            if tool_calls and tool_calls[0].function.name == "match_cv_to_job":
-                arguments = json.loads(tool_calls[0].function.arguments)
-                match_result = match_cv_to_job(**arguments)
-                
-                results.append({
-                    "cv_id": cv_id,
-                    "job_title": job_title,
-                    "match_data": match_result
-                })
-            else:
-                results.append({"cv_id": cv_id, "error": "LLM did not call the match_cv_to_job function."})
 
-        except Exception as e:
-            results.append({"cv_id": cv_id, "error": f"API or parsing error: {e}"})
+        tool_calls = response.choices[0].message.tool_calls
+        if tool_calls and tool_calls[0].function.name == "match_cv_to_job":
+            arguments = json.loads(tool_calls[0].function.arguments)
+            match_result = match_cv_to_job(**arguments)
+
+            return {
+                "cv_id": cv_id,
+                "job_title": job_title,
+                "match_data": match_result
+            }
+        return {"cv_id": cv_id, "error": "LLM did not call the match_cv_to_job function."}
+
+    except Exception as e:
+        return {"cv_id": cv_id, "error": f"API or parsing error: {e}"}
+
+def iter_cv_batch(cv_list: List[Dict[str, Any]], job_summary: Dict[str, Any],
+                  max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Score the CVs against the Job Summary and yield `(index in cv_list, result)` pairs as soon as each one is ready.
+    Cached results (MatchCache) come first, then the LLM results in completion order.
+    Up to `max_concurrency` CVs (default BATCH_MATCH_CONCURRENCY) are scored in parallel and each CV is bounded by `timeout` seconds,
+    retries included (default BATCH_MATCH_TIMEOUT).
+    Closing the generator early cancels the CVs that haven't been sent yet.
+    """
+    if not client or not cv_list:
+        return
+
+    job_title = job_summary.get('basic_info', {}).get('job_title', 'Job Title Unknown')
+    jd_id = job_summary.get('metadata', {}).get('jd_id')
+    job_summary_str = json.dumps(job_summary, ensure_ascii=False, indent=2)
+
+    # Reuse the cached scores, only the remaining CVs go to the LLM
+    match_cache = MatchCache()
+    model = AZURE_OPENAI_DEPLOYMENT_NAME or ""
+    jd_hash = content_hash(job_summary)
+    cv_hashes = [cv_data.get("hash") or content_hash(cv_data["content"]) for cv_data in cv_list]
+    cached = match_cache.get_many(jd_hash, cv_hashes, model, MATCH_PROMPT_VERSION)
+    pending = []
+    for idx, (cv_data, cv_hash) in enumerate(zip(cv_list, cv_hashes)):
+        if cv_hash in cached:
+            yield idx, {**cached[cv_hash], "cv_id": cv_data["id"], "job_title": job_title}
+        else:
+            pending.append(idx)
+    if not pending:
+        return
 
+    workers = max(1, min(max_concurrency or BATCH_MATCH_CONCURRENCY, len(pending)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cv-match")
+    try:
+        futures = {
+            pool.submit(score_cv, cv_list[idx], job_summary_str, job_title, timeout): idx
+            for idx in pending
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            result = future.result()
+            if "match_data" in result:
+                try:
+                    match_cache.put(jd_hash, cv_hashes[idx], model, MATCH_PROMPT_VERSION,
+                                    result, jd_id=jd_id, cv_id=cv_list[idx]["id"])
+                except Exception as e:
+                    print(f"Warning: Failed to cache the match result of {cv_list[idx]['id']}: {e}")
+            yield idx, result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def process_cv_batch(cv_list: List[Dict[str, Any]], job_summary: Dict[str, Any],
+                     max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Perform batch processing of CVs by sending each CV and the corresponding Job Summary to Azure OpenAI, utilizing Function Calling to evaluate their relevance.
+    The results keep the order of `cv_list`, failed CVs included with their "error" (see `iter_cv_batch`).
+    """
+    if not client or not cv_list:
+        return []
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(cv_list)
+    for idx, result in iter_cv_batch(cv_list, job_summary, max_concurrency, timeout):
+        results[idx] = result
     return results
 
 # =======================================================
-# 5. Main function to be called from FastAPI
+# 4. Main function to be called from FastAPI
 # =======================================================
 def get_processed_jd_data() -> List[Dict[str, Any]]:
     """
     Load JD data from a file and extract basic fields for the frontend (for the main table).
     """
-    # Get folder path 'DB/JD' (backend/DB/JD)
-    # current_dir = os.path.dirname(os.path.abspath(__file__))
-    current_dir = Path(__file__).resolve().parent.parent.parent
-    jd_folder = os.path.join(current_dir,'data', 'upload','DB', 'JD')
-    
-    job_summaries = read_cv_by_json(jd_folder, 'jd')
+    job_summaries = DocumentRepository("jd").all()
     
     if not job_summaries:
         return []
@@ -201,91 +246,105 @@ def get_processed_jd_data() -> List[Dict[str, Any]]:
 
 # scan_cv_jd.py (Phần hàm get_batch_matching_results đã sửa)
 
-def get_batch_matching_results(jd_id: str) -> List[Dict[str, Any]]:
-  
-    current_dir = Path(__file__).resolve().parent.parent.parent
-    jd_folder = os.path.join(current_dir,'data', 'upload', 'JD')
-    cv_folder = os.path.join(current_dir,'data', 'upload', 'CV')
+def _load_batch_inputs(jd_id: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Load every CV and the Job Summary of `jd_id` for batch matching from the in-memory DocumentRepository."""
+    all_cvs = [
+        {"id": entry["doc_id"], "content": entry["content"], "hash": entry["hash"]}
+        for entry in DocumentRepository("cv").entries()
+    ]
+    job_summary_data = DocumentRepository("jd").get(jd_id)
 
-    all_cvs = read_cv_by_json(cv_folder, 'cv')
-    
-    job_summaries = read_cv_by_json(jd_folder, 'jd')
-    
-    job_summary_data = None
-    
-    for jd in job_summaries:
-        if jd.get('metadata', {}).get('jd_id') == jd_id:
-            job_summary_data = jd
-            break
-    
-    if not all_cvs:
-        return []
+    if all_cvs and not job_summary_data:
+        print(f"CẢNH BÁO: Không tìm thấy JD với ID '{jd_id}' trong thư mục DB.")
+    return all_cvs, job_summary_data
+
+def _format_match_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a successful `score_cv` result into the row sent to the frontend."""
+    match_data = result["match_data"]
+    return {
+        "key": result["cv_id"],
+        "cv_id": result["cv_id"],
+        "job_title": result["job_title"],
+        "name": match_data.get("name"), 
+        "phone_number": match_data.get("phone_number"),
+        "email": match_data.get("email"),
+        "work":match_data.get("work"),
+        "education":match_data.get("education"),
+        "skills":match_data.get("skills"),
+        "awards":match_data.get("awards"),
+        "match_score": match_data.get("match_score"),
+        "explanation": match_data.get("explanation"),
+        "missing_skills": match_data.get("missing_skills"),
+    }
 
+def _prerank_batch(all_cvs: List[Dict[str, Any]], job_summary: Dict[str, Any],
+                   top_k: Optional[int], min_score: Optional[float]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Select the CVs worth an LLM call; the returned stats omit the per-CV ranking."""
+    top_k = top_k if top_k is not None else PRERANK_TOP_K
+    min_score = min_score if min_score is not None else PRERANK_MIN_SCORE
+    if top_k is None and min_score is None:
+        return all_cvs, {"total": len(all_cvs), "selected": len(all_cvs), "pruned": 0}
+
+    selected, stats = prerank_cvs(all_cvs, job_summary, top_k=top_k, min_score=min_score)
+    stats.pop("ranking", None)
+    print(f"Pre-ranking kept {stats['selected']}/{stats['total']} CVs (top_k={top_k}, min_score={min_score})")
+    return selected, stats
+
+def get_batch_matching_report(jd_id: str, top_k: Optional[int] = None, min_score: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Batch matching with its pre-ranking stats: {"results": [rows], "prerank": {"total", "selected", "pruned"}}.
+    Only the CVs kept by the local pre-ranker (`top_k` / `min_score`, see PRERANK_*) are scored by the LLM.
+    """
+    all_cvs, job_summary_data = _load_batch_inputs(jd_id)
+    report = {"results": [], "prerank": {"total": len(all_cvs), "selected": 0, "pruned": 0}}
+    if not all_cvs or not job_summary_data:
+        return report
+
+    selected_cvs, report["prerank"] = _prerank_batch(all_cvs, job_summary_data, top_k, min_score)
+    batch_results = process_cv_batch(selected_cvs, job_summary_data)
+    report["results"] = [_format_match_result(result) for result in batch_results if "match_data" in result]
+    return report
+
+def get_batch_matching_results(jd_id: str, top_k: Optional[int] = None, min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+    return get_batch_matching_report(jd_id, top_k, min_score)["results"]
+
+def stream_batch_matching_results(jd_id: str, top_k: Optional[int] = None, min_score: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of `get_batch_matching_results`.
+    Yields {"event": "match", "data": row} for each scored CV as soon as its LLM call finishes,
+    {"event": "error", "data": {...}} for each CV that failed and a final {"event": "summary", "data": {...}}.
+    """
+    started = time.perf_counter()
+    all_cvs, job_summary_data = _load_batch_inputs(jd_id)
+    summary = {"jd_id": jd_id, "total": len(all_cvs), "pruned": 0, "matched": 0, "failed": 0, "elapsed_seconds": 0.0}
     if not job_summary_data:
-        print(f"CẢNH BÁO: Không tìm thấy JD với ID '{jd_id}' trong thư mục DB.")
-        return []
-    
-    batch_results = process_cv_batch(all_cvs, job_summary_data)
-    
-    formatted_results = []
-    for result in batch_results:
-        if "match_data" in result:
-            match_data = result["match_data"]
-            
-            formatted_results.append({
-                "key": result["cv_id"],
-                "cv_id": result["cv_id"],
-                "job_title": result["job_title"],
-                "name": match_data.get("name"), 
-                "phone_number": match_data.get("phone_number"),
-                "email": match_data.get("email"),
-                "work":match_data.get("work"),
-                "education":match_data.get("education"),
-                "skills":match_data.get("skills"),
-                "awards":match_data.get("awards"),
-                "match_score": match_data.get("match_score"),
-                "explanation": match_data.get("explanation"),
-                "missing_skills": match_data.get("missing_skills"),
-            })
-            
-    return formatted_results
+        summary["error"] = f"JD '{jd_id}' not found"
 
-def find_infor_cv_jd(jd_id: str, cv_id: str) -> List[Dict[str, Any]]:
-    current_dir = Path(__file__).resolve().parent.parent.parent
-    jd_folder = os.path.join(current_dir,'data', 'upload', 'JD')
-    cv_folder = os.path.join(current_dir,'data', 'upload', 'CV')
-    all_cvs = read_cv_by_json(cv_folder, 'cv')
-    
-    job_summaries = read_cv_by_json(jd_folder, 'jd')
-    
-    job_name = None
-    for jd in job_summaries:
-        if jd.get('metadata', {}).get('jd_id') == jd_id:
-            job_name = jd.get('basic_info', {}).get('job_title')
-            break
-        
-    cv_name = None
-    for cv in all_cvs:
-    # 1. Check if the ID matches
-        if cv.get('id') == cv_id:
-            cv_content_str = cv.get('content')
-            if cv_content_str:
-                try:
-                    # Use json.loads() to parse a JSON string
-                    cv_data = json.loads(cv_content_str)
-                    # Safely retrieve the nested name
-                    cv_name = cv_data.get('basics', {}).get('name')
-                    print(f"Found name: {cv_name}")
-                    break
-                except json.JSONDecodeError as e:
-                    print(f"Error decoding JSON for CV ID {cv_id}: {e}")
-                    cv_name = None
+    if all_cvs and job_summary_data:
+        selected_cvs, prerank = _prerank_batch(all_cvs, job_summary_data, top_k, min_score)
+        summary["pruned"] = prerank["pruned"]
+        for _, result in iter_cv_batch(selected_cvs, job_summary_data):
+            if "match_data" in result:
+                summary["matched"] += 1
+                yield {"event": "match", "data": _format_match_result(result)}
             else:
-                print(f"CV ID {cv_id} found but 'content' is missing.")
-                cv_name = None
-            if cv_name is not None:
-                break
-            break
+                summary["failed"] += 1
+                yield {"event": "error", "data": {"cv_id": result["cv_id"], "error": result["error"]}}
+
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    yield {"event": "summary", "data": summary}
+
+def find_infor_cv_jd(jd_id: str, cv_id: str) -> List[Dict[str, Any]]:
+    jd_data = DocumentRepository("jd").get_entry(jd_id)
+    cv_data = DocumentRepository("cv").get_entry(cv_id)
+
+    job_name = jd_data["job_title"] if jd_data else None
+    cv_name = cv_data["name"] if cv_data else None
+    if cv_name:
+        print(f"Found name: {cv_name}")
+    else:
+        print(f"CV ID {cv_id} not found or its name is missing.")
+
     formatted_results = []
     formatted_results.append({
         'cv_name': cv_name,
@@ -1,10 +1,16 @@
 import os
+import re
 import json
+import hashlib
 from pathlib import Path
 
 from dotenv import load_dotenv
-from openai import OpenAI
-from typing import Dict, Any
+from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utilities.token_utils import estimate_tokens
+from app.utilities.llm_gateway import LLMGateway
+from app.utilities.llm_scheduler import llm_priority
 
 from data.schema import CV_SCHEMA, JD_SCHEMA
 
@@ -18,12 +24,36 @@ print(f"env load at {ENV_FILE_PATH}")
 # 3. Load the .env file using its absolute path
 load_dotenv(ENV_FILE_PATH)
 
+# Default structuring model
+PARSE_MODEL = "GPT-4o-mini"
+PARSE_TOOL_DESCRIPTION = "Parses the raw text (e.g., CV or Job Description) into a structured JSON object according to the required schema. In case you can not match value to any field in a schema, return it null instead. DO NOT MISS ANY FIELD FROM THE SCHEMA"
+PARSE_SYSTEM_PROMPT = "You are an expert text parser. Extract all relevant information from the user's text and format it *only* using the 'parse_content' tool. Infer missing fields as 'null' if the information is not found."
+PARSE_CHUNK_NOTE = "==DOCUMENT PART {part} OF {parts}: fill only the fields found in this part, null for the others=="
+# Part of the extraction cache key: any change to the prompts invalidates cached structured JSON
+PARSE_PROMPT_VERSION = hashlib.sha256((PARSE_SYSTEM_PROMPT + PARSE_TOOL_DESCRIPTION + PARSE_CHUNK_NOTE).encode("utf-8")).hexdigest()[:16]
+
+# Chunked structuring: documents estimated above STRUCTURE_CHUNK_THRESHOLD tokens are split into parts of
+# at most STRUCTURE_CHUNK_TOKENS tokens, structured STRUCTURE_CHUNK_CONCURRENCY at a time and merged
+STRUCTURE_CHUNK_THRESHOLD = int(os.getenv("STRUCTURE_CHUNK_THRESHOLD", "4000"))
+STRUCTURE_CHUNK_TOKENS = int(os.getenv("STRUCTURE_CHUNK_TOKENS", "2000"))
+STRUCTURE_CHUNK_CONCURRENCY = int(os.getenv("STRUCTURE_CHUNK_CONCURRENCY", "4"))
+
+# Section headings: short upper-case lines (see `_is_upper_heading`), or lines starting with a usual CV/JD section name
+_UPPER_HEADING_LENGTH = (3, 40)
+_KEYWORD_HEADING = re.compile(
+    r"^(summary|profile|objective|experience|work experience|employment|education|skills|projects|"
+    r"certifications?|languages|awards|activities|references|responsibilities|requirements|benefits|"
+    r"tóm tắt|mục tiêu|kinh nghiệm|học vấn|kỹ năng|dự án|chứng chỉ|ngoại ngữ|trách nhiệm|yêu cầu|phúc lợi|quyền lợi)"
+    r"\b[^\n]{0,30}:?$",
+    re.IGNORECASE
+)
+
 # --- Main Reusable Function ---
 
 def parse_content_to_json(
         content_text: str,
         parameters_schema: Dict[str, Any],
-        model: str = "GPT-4o-mini"
+        model: str = PARSE_MODEL
 ) -> Dict[str, Any]: # <--- FIX 1: Changed return type to Dict
     """
     Parses raw text content (like a CV or JD) into a structured JSON
@@ -45,14 +75,11 @@ def parse_content_to_json(
         Exception: For any API-level errors.
     """
 
-    # 1. Initialize the OpenAI client
+    # 1. Shared OpenAI client (pooled keep-alive connections, see LLMGateway)
     try:
-        client = OpenAI(
-            base_url = os.environ['OPENAI_URL'],
-            api_key = os.environ['OPENAI_API_KEY'],
-        )
-        if not client.api_key:
-            raise EnvironmentError("OPENAI_API_KEY environment variable not set.")
+        if not os.getenv("OPENAI_URL") or not os.getenv("OPENAI_API_KEY"):
+            raise EnvironmentError("OPENAI_URL / OPENAI_API_KEY environment variables not set.")
+        client = LLMGateway().client()
     except Exception as e:
         print(f"Error initializing OpenAI client: {e}")
         raise
@@ -62,26 +89,26 @@ def parse_content_to_json(
         "type": "function",
         "function": {
             "name": "parse_content",
-            "description": "Parses the raw text (e.g., CV or Job Description) into a structured JSON object according to the required schema. In case you can not match value to any field in a schema, return it null instead. DO NOT MISS ANY FIELD FROM THE SCHEMA",
+            "description": PARSE_TOOL_DESCRIPTION,
             "parameters": parameters_schema
         }
     }
 
     # 3. Define the messages (No changes here)
     messages = [
-        {"role": "system",
-         "content": "You are an expert text parser. Extract all relevant information from the user's text and format it *only* using the 'parse_content' tool. Infer missing fields as 'null' if the information is not found."},
+        {"role": "system", "content": PARSE_SYSTEM_PROMPT},
         {"role": "user", "content": content_text}
     ]
 
-    # 4. Make the API call (No changes here)
+    # 4. Make the API call, queued behind live interview turns (upload structuring is background work)
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            tools=[openai_tool],
-            tool_choice={"type": "function", "function": {"name": "parse_content"}}
-        )
+        with llm_priority("batch"):
+            completion = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                tools=[openai_tool],
+                tool_choice={"type": "function", "function": {"name": "parse_content"}}
+            )
     except Exception as e:
         print(f"Error during OpenAI API call: {e}")
         raise
@@ -104,6 +131,142 @@ def parse_content_to_json(
         print(f"--- End of Error ---")
         raise
 
+# ========================================
+#    Chunked (map-reduce) structuring
+# ========================================
+def parse_long_content_to_json(
+        content_text: str,
+        parameters_schema: Dict[str, Any],
+        context: str = "",
+        model: str = PARSE_MODEL,
+        max_chunk_tokens: int = None,
+        concurrency: int = None
+) -> Dict[str, Any]:
+    """
+    Same result as `parse_content_to_json(context + content_text, ...)`, but a document estimated above
+    STRUCTURE_CHUNK_THRESHOLD tokens is split by section into parts of at most `max_chunk_tokens`,
+    each part is structured separately (`concurrency` calls at a time) and the partial JSON objects
+    are merged following the schema (see `merge_by_schema`).
+
+    Args:
+        content_text: The raw text of the document.
+        parameters_schema: The JSON schema of the result (CV_SCHEMA / JD_SCHEMA).
+        context: Text sent with every part (e.g. the upload metadata).
+        model: The OpenAI model to use.
+        max_chunk_tokens: Token budget of a part (STRUCTURE_CHUNK_TOKENS by default).
+        concurrency: Parts structured at the same time (STRUCTURE_CHUNK_CONCURRENCY by default).
+    """
+    if estimate_tokens(content_text) <= STRUCTURE_CHUNK_THRESHOLD:
+        return parse_content_to_json(context + content_text, parameters_schema, model=model)
+
+    chunks = split_into_chunks(content_text, max_chunk_tokens or STRUCTURE_CHUNK_TOKENS)
+    print(f"Structuring {len(chunks)} part(s) of ~{estimate_tokens(content_text)} tokens")
+    prompts = [
+        f"{context}\n{PARSE_CHUNK_NOTE.format(part=part, parts=len(chunks))}\n{chunk}"
+        for part, chunk in enumerate(chunks, start=1)
+    ]
+    with ThreadPoolExecutor(max_workers=min(len(prompts), concurrency or STRUCTURE_CHUNK_CONCURRENCY)) as pool:
+        # map keeps the document order, so scalars come from the earliest part that has them
+        partials = list(pool.map(lambda prompt: parse_content_to_json(prompt, parameters_schema, model=model), prompts))
+    return merge_by_schema(partials, parameters_schema)
+
+
+def _is_upper_heading(line: str) -> bool:
+    """A short line with letters, all of them upper case (any script): "KINH NGHIỆM", not "2019 - 2021" or "3.5/4.0"."""
+    return _UPPER_HEADING_LENGTH[0] <= len(line) <= _UPPER_HEADING_LENGTH[1] and line.isupper()
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split a document into parts of at most `max_tokens` (estimated), cutting at section headings
+    first, then at blank lines, then at line ends; consecutive small sections share a part.
+    """
+    sections, current = [], []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if current and stripped and (_KEYWORD_HEADING.match(stripped) or _is_upper_heading(stripped)):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+
+    pieces = []
+    for section in sections:
+        pieces.extend(_split_oversized(section, max_tokens, ["\n\n", "\n"]))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _split_oversized(text: str, max_tokens: int, separators: List[str]) -> List[str]:
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    if not separators:
+        # A single huge line: hard cut by characters
+        size = max(1, len(text) * max_tokens // estimate_tokens(text))
+        return [text[start:start + size] for start in range(0, len(text), size)]
+
+    pieces, current = [], ""
+    for part in text.split(separators[0]):
+        candidate = f"{current}{separators[0]}{part}" if current else part
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            candidate = part
+        current = candidate
+    if current:
+        pieces.append(current)
+    return [small for piece in pieces for small in _split_oversized(piece, max_tokens, separators[1:])]
+
+
+def merge_by_schema(parts: List[Any], schema: Dict[str, Any]) -> Any:
+    """
+    Merge partial results of the same schema node:
+    - objects: merged property by property,
+    - arrays: concatenated in order, duplicates (and all-null items) dropped,
+    - scalars: the first value that is not null / empty.
+    """
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+
+    schema = schema or {}
+    schema_type = schema.get("type")
+    types = schema_type if isinstance(schema_type, list) else [schema_type]
+
+    if "object" in types or (schema_type is None and all(isinstance(part, dict) for part in parts)):
+        objects = [part for part in parts if isinstance(part, dict)]
+        if not objects:
+            return parts[0]
+        properties = schema.get("properties", {})
+        keys = list(properties) + [key for obj in objects for key in obj if key not in properties]
+        return {key: merge_by_schema([obj.get(key) for obj in objects], properties.get(key, {}))
+                for key in dict.fromkeys(keys)}
+
+    if "array" in types or (schema_type is None and all(isinstance(part, list) for part in parts)):
+        merged, seen = [], set()
+        for part in parts:
+            for item in (part if isinstance(part, list) else [part]):
+                if item is None or (isinstance(item, dict) and all(value in (None, "", []) for value in item.values())):
+                    continue
+                key = json.dumps(item, ensure_ascii=False, sort_keys=True)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        return merged
+
+    return next((part for part in parts if part != ""), parts[0])
+
+
 if __name__ == "__main__":
 
     # --- 1. Define your SCHEMAS ---
@@ -1,21 +1,36 @@
 import csv
 import os
 import re
+import threading
+
+from app.utilities.file_lock import file_lock
+
+# First column of a journal line that deletes the row whose id is in the second column
+TOMBSTONE_MARKER = "__deleted__"
 
 class CsvUtils:
     """
     Class for CSV Utilities.
     Manages reading and writing to a specific CSV file
     with a defined schema.
+
+    In journal mode the file is an append-only log: inserts are appended as regular rows
+    and deletions as tombstone lines `__deleted__,<id>`. Readers fold the log into the
+    current rows (keyed by the first schema column) and the file is compacted back to
+    plain rows once the share of dead lines passes `compact_ratio`.
     """
 
-    def __init__(self, file_path: str, data_schema: list):
+    def __init__(self, file_path: str, data_schema: list, journal: bool = False, compact_ratio: float = 0.5,
+                 compact_min_lines: int = 100):
         """
         Initializes the utility for a specific file path and data schema.
 
         Args:
             file_path (str): The absolute path to the CSV file.
             data_schema (list): A list of strings for the header/schema.
+            journal (bool): Use the append-only journal mode.
+            compact_ratio (float): Journal mode, compact once dead lines / total lines >= this ratio.
+            compact_min_lines (int): Journal mode, never compact files shorter than this.
         """
         # 1. Validate the path format *before* assigning it
         # 2. Assign instance variables
@@ -24,6 +39,15 @@ class CsvUtils:
         self.schema_length = len(data_schema)
         self.__validate_path_format__(file_path)
 
+        self.journal = journal
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        # Journal mode: folded rows + line counters, valid while the file signature is unchanged
+        self._journal_lock = threading.RLock()
+        self._state = None
+        self._total_lines = 0
+        self._file_sig = None
+
         print(f"CSV_Utils initialized for: {self.file_path}")
 
     @staticmethod
@@ -60,7 +84,8 @@ class CsvUtils:
                 writer.writerows(data)
 
             print(f"Successfully wrote {len(data)} rows to {self.file_path}")
-            self.__print_file_content__()
+            # Journal mode: the file was replaced, fold it again on the next read
+            self._state = None
 
         except IOError as e:
             print(f"Error writing to file {self.file_path}: {e}")
@@ -81,6 +106,9 @@ class CsvUtils:
             FileNotFoundError: If self.file_path does not exist.
             Exception: If a row's column count doesn't match the schema.
         """
+        if self.journal:
+            return self.read_journal()
+
         print(f"\n--- Reading from {self.file_path} (no header) ---")
 
         if not os.path.isfile(self.file_path):
@@ -130,3 +158,103 @@ class CsvUtils:
                 print(f.read())
         except IOError as e:
             print(f"Could not read file: {e}")
+
+    # ----------------------------
+    # Journal mode
+    # ----------------------------
+    def _signature(self):
+        try:
+            stat = os.stat(self.file_path)
+            return stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _fold(self) -> None:
+        """Replay the whole log into self._state (id -> row dict)."""
+        state, total_lines = {}, 0
+        if os.path.isfile(self.file_path):
+            with open(self.file_path, mode='r', newline='', encoding='utf-8') as file:
+                for i, row in enumerate(csv.reader(file)):
+                    if not row:
+                        continue
+                    total_lines += 1
+                    if row[0] == TOMBSTONE_MARKER and len(row) == 2:
+                        state.pop(row[1], None)
+                    elif len(row) == self.schema_length:
+                        # A re-inserted id moves to the end, like a fresh insert
+                        state.pop(row[0], None)
+                        state[row[0]] = dict(zip(self.data_schema, row))
+                    else:
+                        raise Exception(
+                            f"Schema mismatch at row {i + 1}: "
+                            f"Expected {self.schema_length} columns, but found {len(row)}."
+                        )
+        self._state = state
+        self._total_lines = total_lines
+        self._file_sig = self._signature()
+
+    def _current_state(self) -> dict:
+        # Re-fold only when someone else (e.g. another worker process) changed the file
+        if self._state is None or self._file_sig != self._signature():
+            self._fold()
+        return self._state
+
+    def read_journal(self) -> list[dict]:
+        """Journal mode: the current rows, in insertion order."""
+        if not os.path.isfile(self.file_path):
+            raise FileNotFoundError(f"File path {self.file_path} not found")
+        with self._journal_lock:
+            return list(self._current_state().values())
+
+    def _append_lines(self, lines: list[list]) -> None:
+        """Append lines and fsync, so an acknowledged insert/delete survives a crash."""
+        with open(self.file_path, mode='a', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def append_rows(self, rows: list[list]) -> None:
+        """Journal mode: append new/updated rows (O(1) file I/O)."""
+        with self._journal_lock, file_lock(self.file_path):
+            state = self._current_state()
+            self._append_lines(rows)
+            for row in rows:
+                state.pop(row[0], None)
+                state[row[0]] = dict(zip(self.data_schema, row))
+            self._total_lines += len(rows)
+            self._file_sig = self._signature()
+
+    def append_tombstones(self, ids: list[str]) -> None:
+        """Journal mode: mark rows as deleted (O(1) file I/O), compacting the file when needed."""
+        with self._journal_lock, file_lock(self.file_path):
+            state = self._current_state()
+            self._append_lines([[TOMBSTONE_MARKER, id] for id in ids])
+            for id in ids:
+                state.pop(id, None)
+            self._total_lines += len(ids)
+            self._file_sig = self._signature()
+            if self._needs_compaction():
+                self._compact_locked()
+
+    def _needs_compaction(self) -> bool:
+        dead_lines = self._total_lines - len(self._state)
+        return (self._total_lines >= self.compact_min_lines
+                and dead_lines / self._total_lines >= self.compact_ratio)
+
+    def _compact_locked(self) -> None:
+        tmp_path = f"{self.file_path}.tmp"
+        rows = [[row.get(key, "") for key in self.data_schema] for row in self._state.values()]
+        with open(tmp_path, mode='w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.file_path)
+        print(f"Compacted {self.file_path}: {self._total_lines} lines -> {len(rows)} rows")
+        self._total_lines = len(rows)
+        self._file_sig = self._signature()
+
+    def compact(self) -> None:
+        """Journal mode: rewrite the file with only the live rows (atomic replace)."""
+        with self._journal_lock, file_lock(self.file_path):
+            self._current_state()
+            self._compact_locked()
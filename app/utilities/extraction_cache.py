@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from pathlib import Path
+from typing  import Any, Dict, Optional
+
+from app.utilities.match_cache import content_hash
+
+__all__ = ["ExtractionCache", "file_hash"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+DEFAULT_CACHE_PATH = BASE_DIR / "data" / "extraction_cache.db"
+# Total size of the cached texts and JSON documents, least recently used entries are evicted beyond it
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# =========================================================
+# Hash helper
+# =========================================================
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# =========================================================
+# Singleton content-addressed extraction cache (SQLite)
+# =========================================================
+class ExtractionCache:
+    """
+    Persistent cache of what an uploaded file turns into, keyed by the SHA-256 of its bytes:
+    - the extracted text (text layer / OCR),
+    - the structured JSON, per (schema, structuring prompt version, model).
+    Size-bounded (EXTRACTION_CACHE_MAX_BYTES): the least recently used entries are evicted first.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: str = None, max_bytes: int = None):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(ExtractionCache, cls).__new__(cls)
+                    cls._instance._db_path = str(db_path or os.getenv("EXTRACTION_CACHE_PATH") or DEFAULT_CACHE_PATH)
+                    cls._instance._max_bytes = int(max_bytes or os.getenv("EXTRACTION_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES)
+                    cls._instance._db_lock = threading.Lock()
+                    cls._instance._conn = cls._instance._connect()
+        return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entry (
+                key          TEXT PRIMARY KEY,
+                value        TEXT NOT NULL,
+                size         INTEGER NOT NULL,
+                last_access  REAL NOT NULL
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entry_access ON cache_entry(last_access)")
+        # Running total of the entry sizes, kept in the same transactions as the entries
+        # so every process sharing the file sees it; computed once when the table is created
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM cache_entry")
+        conn.commit()
+        return conn
+
+    # ========================================
+    #           Extracted text
+    # ========================================
+    def get_text(self, file_sha: str) -> Optional[str]:
+        return self._get(f"text:{file_sha}")
+
+    def put_text(self, file_sha: str, text: str) -> None:
+        self._put(f"text:{file_sha}", text)
+
+    # ========================================
+    #           Structured JSON
+    # ========================================
+    def get_json(self, file_sha: str, schema: Dict[str, Any], model: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        value = self._get(self._json_key(file_sha, schema, model, prompt_version))
+        return json.loads(value) if value is not None else None
+
+    def put_json(self, file_sha: str, schema: Dict[str, Any], model: str, prompt_version: str, data: Dict[str, Any]) -> None:
+        self._put(self._json_key(file_sha, schema, model, prompt_version), json.dumps(data, ensure_ascii=False))
+
+    @staticmethod
+    def _json_key(file_sha: str, schema: Dict[str, Any], model: str, prompt_version: str) -> str:
+        return f"json:{file_sha}:{content_hash(schema)[:16]}:{prompt_version}:{model}"
+
+    # ========================================
+    #           Storage + LRU eviction
+    # ========================================
+    def _get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT value FROM cache_entry WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE cache_entry SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def _put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        with self._db_lock:
+            # Write lock first: the replaced entry's size and the total can't change under us
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self._conn.execute("SELECT size FROM cache_entry WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO cache_entry VALUES (?, ?, ?, ?)", (key, value, size, time.time()))
+                self._add_size(size - (previous[0] if previous else 0))
+                self._evict_locked()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _add_size(self, delta: int) -> None:
+        self._conn.execute("UPDATE cache_size SET total = total + ? WHERE id = 0", (delta,))
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT total FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict_locked(self) -> None:
+        total = self._total_size()
+        if total <= self._max_bytes:
+            return
+        # Evict down to 90% so a full cache doesn't evict on every put
+        target = self._max_bytes * 0.9
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache_entry ORDER BY last_access"):
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM cache_entry WHERE key = ?", evicted)
+        self._conn.execute("UPDATE cache_size SET total = ? WHERE id = 0", (total,))
+
+    def clear(self) -> None:
+        with self._db_lock:
+            self._conn.execute("DELETE FROM cache_entry")
+            self._conn.execute("UPDATE cache_size SET total = 0 WHERE id = 0")
+            self._conn.commit()
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+__all__ = ["file_lock"]
+
+# ========================================
+#    Cross-process exclusive file lock
+# ========================================
+@contextmanager
+def file_lock(path: str):
+    """
+    Hold an exclusive lock on `<path>.lock` for the duration of the block.
+    Works across processes (e.g. several uvicorn workers) on POSIX (flock) and Windows (msvcrt).
+    Not re-entrant: don't nest two locks on the same path in one process.
+    """
+    lock_path = f"{path}.lock"
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            # LK_LOCK retries for ~10s before failing, loop to wait as long as needed
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,114 @@
+import os
+import re
+import sqlite3
+
+from abc     import ABC, abstractmethod
+from pathlib import Path
+from typing  import Callable, Iterable
+
+from app.utilities.file_lock import file_lock
+
+__all__ = ["IdAllocator", "FileCounterIdAllocator", "SqliteSequenceIdAllocator", "format_id", "max_id_number"]
+
+# Minimum number of digits of the generated ids (e.g. CV-001), larger numbers just get longer (CV-1000)
+ID_MIN_WIDTH = int(os.getenv("ID_MIN_WIDTH", "3"))
+
+def format_id(prefix: str, number: int, width: int = None) -> str:
+    return f"{prefix}-{number:0{width or ID_MIN_WIDTH}d}"
+
+def max_id_number(prefix: str, ids: Iterable[str]) -> int:
+    """Highest numeric suffix among ids like `<prefix>-NNN`, whatever their width."""
+    pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)$")
+    last_id_num = 0
+    for current_id_str in ids:
+        match = pattern.match(current_id_str or "")
+        if match:
+            last_id_num = max(last_id_num, int(match.group(1)))
+    return last_id_num
+
+# =========================================================
+# ID allocator interface
+# =========================================================
+class IdAllocator(ABC):
+    """
+    Persisted, monotonic `<prefix>-NNN` id counter for one document type.
+    Every `next_id()` call returns a new id, also across threads and worker processes;
+    ids of deleted documents are never handed out again.
+    `seed` returns the highest number already in use and is only called when the counter doesn't exist yet.
+    """
+
+    def __init__(self, prefix: str, seed: Callable[[], int] = None, width: int = None):
+        self.prefix = prefix
+        self.seed = seed or (lambda: 0)
+        self.width = width
+
+    @abstractmethod
+    def _increment(self) -> int:
+        """Atomically bump the persisted counter and return the new value."""
+
+    def next_id(self) -> str:
+        return format_id(self.prefix, self._increment(), self.width)
+
+# =========================================================
+# Counter file + file lock (CSV deployments)
+# =========================================================
+class FileCounterIdAllocator(IdAllocator):
+    """Counter kept in a small text file, incremented under an exclusive cross-process file lock."""
+
+    def __init__(self, prefix: str, counter_path: str, seed: Callable[[], int] = None, width: int = None):
+        super().__init__(prefix, seed, width)
+        self.counter_path = str(counter_path)
+        Path(self.counter_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _increment(self) -> int:
+        with file_lock(self.counter_path):
+            try:
+                with open(self.counter_path, "r", encoding="utf-8") as f:
+                    value = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                value = self.seed()
+
+            value += 1
+            # Write-then-rename so a crash never leaves a truncated counter behind
+            tmp_path = f"{self.counter_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(value))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.counter_path)
+            return value
+
+# =========================================================
+# SQLite sequence (SQLite metadata backend)
+# =========================================================
+class SqliteSequenceIdAllocator(IdAllocator):
+    """Counter row in an `id_sequence` table, incremented inside a BEGIN IMMEDIATE transaction."""
+
+    def __init__(self, prefix: str, db_path: str, seed: Callable[[], int] = None, width: int = None):
+        super().__init__(prefix, seed, width)
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS id_sequence (prefix TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _increment(self) -> int:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT value FROM id_sequence WHERE prefix = ?", (self.prefix,)).fetchone()
+                value = (row[0] if row else self.seed()) + 1
+                conn.execute("INSERT OR REPLACE INTO id_sequence VALUES (?, ?)", (self.prefix, value))
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return value
+        finally:
+            conn.close()
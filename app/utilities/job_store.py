@@ -0,0 +1,134 @@
+import os
+import json
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing  import Optional
+
+from app.utilities.metadata_store import DEFAULT_DB_PATH
+
+__all__ = ["JobStore"]
+
+_COLUMNS = ("job_id", "doc_type", "document_id", "filename", "status", "stage", "timings", "progress",
+            "error", "version", "created_at", "started_at", "finished_at", "owner", "heartbeat")
+# Stored as JSON text
+_JSON_COLUMNS = ("timings", "progress")
+
+# =========================================================
+# Singleton ingestion job table (SQLite metadata database)
+# =========================================================
+class JobStore:
+    """
+    Ingestion job rows in the `ingestion_job` table of the metadata database (METADATA_DB_PATH),
+    shared by the uvicorn worker processes: any of them answers the status of a job run by another one.
+    A job row is only written by the worker running it (its `owner`), always as a whole, and refreshed
+    by the owner's `heartbeat` while it is queued or running; a finished row is never written again.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: str = None):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(JobStore, cls).__new__(cls)
+                    instance._db_path = str(db_path or os.getenv("METADATA_DB_PATH") or DEFAULT_DB_PATH)
+                    instance._db_lock = threading.Lock()
+                    instance._conn = instance._connect()
+                    cls._instance = instance
+        return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_job (
+                job_id      TEXT PRIMARY KEY,
+                doc_type    TEXT NOT NULL,
+                document_id TEXT NOT NULL,
+                filename    TEXT,
+                status      TEXT NOT NULL,
+                stage       TEXT NOT NULL,
+                timings     TEXT NOT NULL,
+                progress    TEXT NOT NULL,
+                error       TEXT,
+                version     INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                started_at  REAL,
+                finished_at REAL,
+                owner       TEXT,
+                heartbeat   REAL
+            )""")
+        # Tables created before jobs had an owner
+        columns = [column[1] for column in conn.execute("PRAGMA table_info(ingestion_job)")]
+        for column, column_type in (("owner", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE ingestion_job ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ingestion_job_created ON ingestion_job(created_at)")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _job(row) -> dict:
+        job = dict(zip(_COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            job[column] = json.loads(job[column])
+        return job
+
+    def save(self, job: dict) -> bool:
+        """Insert or overwrite the job's row, unless it is finished (e.g. reclaimed by `fail_stale`); returns True when written."""
+        values = [json.dumps(job[column]) if column in _JSON_COLUMNS else job[column] for column in _COLUMNS]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+        with self._db_lock, self._conn:
+            return self._conn.execute(f"""
+                INSERT INTO ingestion_job ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})
+                ON CONFLICT(job_id) DO UPDATE SET {updates} WHERE status NOT IN ('done', 'failed')""", values).rowcount > 0
+
+    def heartbeat(self, owner: str, now: float) -> int:
+        """Refresh the heartbeat of the owner's queued/running jobs; returns their count."""
+        with self._db_lock, self._conn:
+            return self._conn.execute("UPDATE ingestion_job SET heartbeat = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                                      (now, owner)).rowcount
+
+    def active(self) -> list[dict]:
+        """Queued/running jobs of every worker, oldest first."""
+        with self._db_lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM ingestion_job WHERE status IN ('queued', 'running') "
+                                      "ORDER BY created_at, rowid").fetchall()
+        return [self._job(row) for row in rows]
+
+    def fail_stale(self, job_id: str, owner: str, heartbeat: float, error: str, now: float) -> bool:
+        """
+        Mark the job failed if it is still queued/running with the given owner and heartbeat,
+        i.e. its owner wrote nothing since it was found stale. Returns True for the one caller that did it.
+        """
+        with self._db_lock, self._conn:
+            return self._conn.execute("""
+                UPDATE ingestion_job SET status = 'failed', error = ?, finished_at = ?, version = version + 1
+                WHERE job_id = ? AND status IN ('queued', 'running') AND owner IS ? AND heartbeat IS ?""",
+                                      (error, now, job_id, owner, heartbeat)).rowcount > 0
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._db_lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM ingestion_job WHERE job_id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def list(self, doc_type: str = None, status: str = None) -> list[dict]:
+        """Jobs newest first, optionally filtered."""
+        query = f"SELECT {', '.join(_COLUMNS)} FROM ingestion_job WHERE (? IS NULL OR doc_type = ?) AND (? IS NULL OR status = ?)"
+        with self._db_lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC, rowid DESC",
+                                      (doc_type, doc_type, status, status)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def prune(self, keep: int) -> int:
+        """Delete the oldest finished jobs beyond the `keep` most recent ones; returns the deleted count."""
+        with self._db_lock, self._conn:
+            return self._conn.execute("""
+                DELETE FROM ingestion_job WHERE job_id IN (
+                    SELECT job_id FROM ingestion_job WHERE status IN ('done', 'failed')
+                    ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?
+                )""", (keep,)).rowcount
@@ -0,0 +1,106 @@
+import os
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, AzureOpenAI
+
+from app.utilities.llm_resilience import ResilientTransport, AsyncResilientTransport
+
+__all__ = ["LLMGateway"]
+
+# Shared HTTP connection pool of every LLM call (sync and async pools are separate but sized alike)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+
+# =========================================================
+# Singleton LLM gateway
+# =========================================================
+class LLMGateway:
+    """
+    Owns the keep-alive HTTP connection pools used by every OpenAI / Azure OpenAI client of the backend,
+    so calls reuse connections (and TLS sessions) instead of each call site opening its own.
+    Clients are created once and shared; they are thread-safe.
+    Every call goes through LLMResilience (retries, circuit breaker, RPM/TPM limiter) in the pool's transport,
+    which replaces the SDK's own retries (max_retries=0).
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(LLMGateway, cls).__new__(cls)
+                    cls._instance._clients = {}
+                    cls._instance._clients_lock = threading.Lock()
+                    cls._instance._http = httpx.Client(
+                        transport=ResilientTransport(httpx.HTTPTransport(limits=cls._limits())),
+                        timeout=cls._timeout()
+                    )
+                    cls._instance._async_http = None
+        return cls._instance
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                            keepalive_expiry=LLM_KEEPALIVE_EXPIRY)
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+    def _get_or_create(self, key: tuple, factory):
+        with self._clients_lock:
+            if key not in self._clients:
+                self._clients[key] = factory()
+            return self._clients[key]
+
+    # ========================================
+    #           Clients
+    # ========================================
+    def client(self) -> OpenAI:
+        """OpenAI-compatible client on OPENAI_URL."""
+        return self._get_or_create(("openai",), lambda: OpenAI(
+            base_url    = os.getenv("OPENAI_URL"),
+            api_key     = os.getenv("OPENAI_API_KEY"),
+            http_client = self._http,
+            max_retries = 0
+        ))
+
+    def azure_client(self, api_version: str) -> AzureOpenAI:
+        """Azure OpenAI client on OPENAI_URL for the given API version."""
+        return self._get_or_create(("azure", api_version), lambda: AzureOpenAI(
+            api_key        = os.getenv("OPENAI_API_KEY"),
+            azure_endpoint = os.getenv("OPENAI_URL"),
+            api_version    = api_version,
+            http_client    = self._http,
+            max_retries    = 0
+        ))
+
+    def async_client(self) -> AsyncOpenAI:
+        """Async OpenAI-compatible client on OPENAI_URL; use it from the application's event loop."""
+        def factory():
+            if self._async_http is None:
+                self._async_http = httpx.AsyncClient(
+                    transport=AsyncResilientTransport(httpx.AsyncHTTPTransport(limits=self._limits())),
+                    timeout=self._timeout()
+                )
+            return AsyncOpenAI(
+                base_url    = os.getenv("OPENAI_URL"),
+                api_key     = os.getenv("OPENAI_API_KEY"),
+                http_client = self._async_http,
+                max_retries = 0
+            )
+        return self._get_or_create(("async",), factory)
+
+    def close(self) -> None:
+        """Close the sync pool (the async pool is closed with `aclose`)."""
+        self._http.close()
+
+    async def aclose(self) -> None:
+        if self._async_http is not None:
+            await self._async_http.aclose()
@@ -0,0 +1,435 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+
+from email.utils import parsedate_to_datetime
+from typing      import Optional
+
+import httpx
+
+from app.utilities.token_utils import estimate_tokens
+from app.utilities.llm_scheduler import LLMScheduler, current_deadline
+
+__all__ = ["LLMResilience", "ResilientTransport", "AsyncResilientTransport", "CircuitOpenError",
+           "LLMDeadlineExceeded", "CircuitBreaker", "TokenBucket"]
+
+# Retries of throttled (429) / failed (5xx, connection) LLM calls: full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+# A Retry-After longer than this is not waited for: the error is returned to the caller
+LLM_RETRY_AFTER_MAX = float(os.getenv("LLM_RETRY_AFTER_MAX", "60"))
+# Per endpoint: consecutive failures that open the circuit, and how long it stays open before a probe call
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+# Deployment quota (0 = unlimited): requests and tokens (prompt + max completion) per minute,
+# spent at most LLM_RATE_BURST_SECONDS worth of quota at once
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+LLM_RATE_BURST_SECONDS = float(os.getenv("LLM_RATE_BURST_SECONDS", "10"))
+# Share of that quota batch calls may use: the rest stays free for interview turns, which then don't queue behind them
+LLM_BATCH_QUOTA_SHARE = float(os.getenv("LLM_BATCH_QUOTA_SHARE", "0.9"))
+
+RETRY_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without calling the endpoint while its circuit is open."""
+
+class LLMDeadlineExceeded(httpx.TimeoutException):
+    """Raised when the caller's llm_deadline passes before the call could be sent or retried."""
+
+# =========================================================
+# Rate limiting
+# =========================================================
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `per_minute` tokens per minute, holding at most `burst_seconds` of refill.
+    `reserve(n)` takes the tokens right away (the balance may go negative) and returns how many seconds
+    the caller has to wait before spending them: waiters are served in arrival order, from threads and event loops alike.
+    `refund(n)` gives back a reservation that won't be spent.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = LLM_RATE_BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float = 1) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+# =========================================================
+# Circuit breaking
+# =========================================================
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures (5xx, connection errors, timeouts);
+    open -> half_open once `cooldown` seconds have passed: a single probe call is let through,
+    its success closes the circuit again and its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probe_started = None
+            # A probe that never reported back (e.g. cancelled) is replaced after a cooldown
+            if self.state == "half_open" and (self._probe_started is None or now - self._probe_started >= self.cooldown):
+                self._probe_started = now
+                return True
+            return self.state == "closed"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at)) if self.state == "open" else 0.0
+
+# =========================================================
+# Singleton resilience policy shared by every LLM client
+# =========================================================
+class LLMResilience:
+    """
+    Retry, circuit breaker and rate limiter state of the LLM calls. It is applied to every call made through
+    LLMGateway's clients by their HTTP transport (ResilientTransport / AsyncResilientTransport),
+    so the OpenAI / Azure OpenAI call sites don't need their own retry loops.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(LLMResilience, cls).__new__(cls)
+                    instance._requests_bucket = TokenBucket(LLM_RPM_LIMIT)
+                    instance._tokens_bucket = TokenBucket(LLM_TPM_LIMIT)
+                    instance._batch_requests_bucket = TokenBucket(LLM_RPM_LIMIT * LLM_BATCH_QUOTA_SHARE)
+                    instance._batch_tokens_bucket = TokenBucket(LLM_TPM_LIMIT * LLM_BATCH_QUOTA_SHARE)
+                    instance._breakers = {}
+                    instance._state_lock = threading.Lock()
+                    instance._stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0,
+                                       "circuit_rejections": 0, "rate_limit_wait": 0.0}
+                    cls._instance = instance
+        return cls._instance
+
+    def breaker(self, request: httpx.Request) -> CircuitBreaker:
+        """The circuit breaker of the request's endpoint (host + path, e.g. one Azure deployment)."""
+        key = f"{request.url.host}{request.url.path}"
+        with self._state_lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker()
+            return self._breakers[key]
+
+    def rate_limit_delay(self, request: httpx.Request, deadline: float = None) -> float:
+        """Reserve the request's share of the RPM/TPM quota, return how long to wait before sending it."""
+        return self._reserve(request, ((self._requests_bucket, 1), (self._tokens_bucket, self._request_tokens(request))), deadline)
+
+    def batch_rate_limit_delay(self, request: httpx.Request, priority_class: str, deadline: float = None) -> float:
+        """
+        Batch calls first wait for their own, smaller share of the quota (LLM_BATCH_QUOTA_SHARE) and only then
+        reserve from the shared quota (`rate_limit_delay`): they can't pile up reservations in front of interview turns.
+        """
+        if priority_class != "batch":
+            return 0.0
+        return self._reserve(request, ((self._batch_requests_bucket, 1), (self._batch_tokens_bucket, self._request_tokens(request))), deadline)
+
+    def _reserve(self, request: httpx.Request, reservations: tuple, deadline: Optional[float]) -> float:
+        """
+        Reserve `amount` from each `(bucket, amount)`, return the wait; when waiting that long would pass
+        `deadline`, the reservations are given back to the calls behind and LLMDeadlineExceeded is raised.
+        """
+        remaining = self.remaining(request, deadline)
+        delay = max(bucket.reserve(amount) for bucket, amount in reservations)
+        if remaining is not None and delay >= remaining:
+            for bucket, amount in reservations:
+                bucket.refund(amount)
+            raise LLMDeadlineExceeded(f"LLM call deadline passed while rate limited ({delay:.1f}s to wait)", request=request)
+        self._count("rate_limit_wait", delay)
+        return delay
+
+    @staticmethod
+    def _request_tokens(request: httpx.Request) -> int:
+        """Prompt estimate + requested completion tokens: what the provider counts against the TPM quota."""
+        if LLM_TPM_LIMIT <= 0:
+            return 0
+        try:
+            body = json.loads(request.content or b"{}")
+        except (httpx.RequestNotRead, ValueError):
+            return 0
+        prompt = json.dumps(body.get("messages", []), ensure_ascii=False) + json.dumps(body.get("tools", []), ensure_ascii=False)
+        return estimate_tokens(prompt) + int(body.get("max_tokens") or body.get("max_completion_tokens") or 0)
+
+    def next_delay(self, attempt: int, response: Optional[httpx.Response] = None, deadline: float = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying a failed attempt (`response` None for a connection error), None to give up,
+        also when the retry couldn't start before `deadline` (time.monotonic()).
+        """
+        if attempt >= LLM_MAX_RETRIES:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+        backoff = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+        retry_after = self._retry_after(response.headers) if response is not None else None
+        # Never earlier than the provider asked, spread out so the throttled calls don't all come back at once
+        delay = backoff if retry_after is None else retry_after + backoff if retry_after <= LLM_RETRY_AFTER_MAX else None
+        if delay is not None and deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def remaining(request: httpx.Request, deadline: Optional[float]) -> Optional[float]:
+        """Seconds left before `deadline` (None = unbounded); raises LLMDeadlineExceeded once it has passed."""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded(f"LLM call deadline passed for {request.url.host}{request.url.path}", request=request)
+        return remaining
+
+    @staticmethod
+    def bound_attempt(request: httpx.Request, remaining: Optional[float]) -> None:
+        """Cap the request's connect / read / write / pool timeouts to the time left."""
+        if remaining is None:
+            return
+        timeouts = request.extensions.get("timeout") or {}
+        request.extensions["timeout"] = {name: remaining if timeouts.get(name) is None else min(timeouts[name], remaining)
+                                         for name in ("connect", "read", "write", "pool")}
+
+    @staticmethod
+    def _retry_after(headers: httpx.Headers) -> Optional[float]:
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                value = headers["retry-after"]
+                try:
+                    return max(0.0, float(value))
+                except ValueError:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def record(self, breaker: CircuitBreaker, response: Optional[httpx.Response]) -> None:
+        """Update the breaker and counters with an attempt's outcome (`response` None for a connection error)."""
+        if response is None or response.status_code >= 500:
+            breaker.record_failure()
+            self._count("failures")
+            return
+        if response.status_code == 429:
+            # Throttled, but the endpoint is up: the rate limiter and Retry-After deal with it, not the breaker
+            self._count("throttled")
+        breaker.record_success()
+
+    def reject(self, breaker: CircuitBreaker, request: httpx.Request) -> CircuitOpenError:
+        self._count("circuit_rejections")
+        return CircuitOpenError(f"Circuit open for {request.url.host}{request.url.path}, "
+                                f"retry in {breaker.retry_in():.0f}s", request=request)
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._state_lock:
+            self._stats[name] += value
+
+    def stats(self) -> dict:
+        with self._state_lock:
+            return {**self._stats,
+                    "circuits": {key: breaker.state for key, breaker in self._breakers.items()}}
+
+# =========================================================
+# Scheduler slots
+# =========================================================
+class _Slot:
+    """An LLMScheduler slot held by one attempt, released once: on failure, or when the response is closed
+    (after the body is read, or at the end of a streamed reply)."""
+
+    def __init__(self, priority_class: str):
+        self.priority_class = priority_class
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        LLMScheduler().release(self.priority_class)
+
+    def wrap(self, response: httpx.Response) -> httpx.Response:
+        stream = _AsyncSlotStream(response.stream, self) if isinstance(response.stream, httpx.AsyncByteStream) \
+            else _SlotStream(response.stream, self)
+        return httpx.Response(status_code=response.status_code, headers=response.headers,
+                              stream=stream, extensions=response.extensions)
+
+class _SlotStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, slot: _Slot):
+        self._stream = stream
+        self._slot = slot
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._slot.release()
+
+class _AsyncSlotStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, slot: _Slot):
+        self._stream = stream
+        self._slot = slot
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._slot.release()
+
+# =========================================================
+# HTTP transports
+# =========================================================
+class ResilientTransport(httpx.BaseTransport):
+    """Wraps a transport with LLMResilience: priority scheduling (LLMScheduler), rate limiting,
+    circuit breaking, retries with backoff."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        resilience = LLMResilience()
+        breaker = resilience.breaker(request)
+        deadline = current_deadline()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise resilience.reject(breaker, request)
+            try:
+                slot = _Slot(LLMScheduler().acquire(timeout=resilience.remaining(request, deadline)))
+            except TimeoutError:
+                raise LLMDeadlineExceeded("LLM call deadline passed while queued for a slot", request=request)
+            try:
+                time.sleep(resilience.batch_rate_limit_delay(request, slot.priority_class, deadline))
+                time.sleep(resilience.rate_limit_delay(request, deadline))
+                resilience.bound_attempt(request, resilience.remaining(request, deadline))
+                resilience._count("calls")
+                response = slot.wrap(self._transport.handle_request(request))
+            except LLMDeadlineExceeded:
+                slot.release()
+                raise
+            except httpx.TransportError:
+                slot.release()
+                resilience.record(breaker, None)
+                delay = resilience.next_delay(attempt, deadline=deadline)
+                if delay is None:
+                    raise
+            except BaseException:
+                slot.release()
+                raise
+            else:
+                resilience.record(breaker, response)
+                delay = resilience.next_delay(attempt, response, deadline)
+                if delay is None:
+                    return response
+                # Drain the error body so the connection goes back to the pool
+                response.read()
+                response.close()
+            resilience._count("retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of ResilientTransport: waits on futures / asyncio.sleep, so the event loop is never blocked."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        resilience = LLMResilience()
+        breaker = resilience.breaker(request)
+        deadline = current_deadline()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise resilience.reject(breaker, request)
+            try:
+                slot = _Slot(await LLMScheduler().aacquire(timeout=resilience.remaining(request, deadline)))
+            except (TimeoutError, asyncio.TimeoutError):
+                raise LLMDeadlineExceeded("LLM call deadline passed while queued for a slot", request=request)
+            try:
+                await asyncio.sleep(resilience.batch_rate_limit_delay(request, slot.priority_class, deadline))
+                await asyncio.sleep(resilience.rate_limit_delay(request, deadline))
+                resilience.bound_attempt(request, resilience.remaining(request, deadline))
+                resilience._count("calls")
+                response = slot.wrap(await self._transport.handle_async_request(request))
+            except LLMDeadlineExceeded:
+                slot.release()
+                raise
+            except httpx.TransportError:
+                slot.release()
+                resilience.record(breaker, None)
+                delay = resilience.next_delay(attempt, deadline=deadline)
+                if delay is None:
+                    raise
+            except BaseException:
+                slot.release()
+                raise
+            else:
+                resilience.record(breaker, response)
+                delay = resilience.next_delay(attempt, response, deadline)
+                if delay is None:
+                    return response
+                await response.aread()
+                await response.aclose()
+            resilience._count("retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,237 @@
+import os
+import time
+import asyncio
+import threading
+import itertools
+import contextvars
+
+from collections import deque
+from contextlib  import contextmanager
+
+__all__ = ["LLMScheduler", "llm_priority", "current_priority", "llm_deadline", "current_deadline", "PRIORITY_CLASSES"]
+
+# Highest priority first
+PRIORITY_CLASSES = ("interactive", "report", "batch")
+
+# LLM calls sent at the same time (0 disables the scheduler), and per class:
+# keeping batch below the total leaves room for live interview turns even while a batch runs
+LLM_SCHEDULER_CONCURRENCY = int(os.getenv("LLM_SCHEDULER_CONCURRENCY", "100"))
+CLASS_CONCURRENCY = {
+    "interactive": int(os.getenv("LLM_INTERACTIVE_CONCURRENCY", "100")),
+    "report": int(os.getenv("LLM_REPORT_CONCURRENCY", "8")),
+    "batch": int(os.getenv("LLM_BATCH_CONCURRENCY", "16")),
+}
+
+_priority = contextvars.ContextVar("llm_priority", default="interactive")
+
+@contextmanager
+def llm_priority(priority_class: str):
+    """Run the LLM calls made inside the block (in this thread / task) under `priority_class`."""
+    if priority_class not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown LLM priority class: {priority_class}")
+    token = _priority.set(priority_class)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    return _priority.get()
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+@contextmanager
+def llm_deadline(seconds: float):
+    """
+    Bound the LLM calls made inside the block (in this thread / task) to `seconds` overall: queueing for a slot,
+    rate limiting, every attempt and the waits between retries. A nested block can only shorten it.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def current_deadline() -> float:
+    """time.monotonic() value the caller's LLM calls must be done by, None when unbounded."""
+    return _deadline.get()
+
+class _Waiter:
+    __slots__ = ("priority_class", "seq", "enqueued", "event", "future", "loop", "granted")
+
+    def __init__(self, priority_class: str, seq: int, future: asyncio.Future = None, loop=None):
+        self.priority_class = priority_class
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.event = threading.Event() if future is None else None
+        self.future = future
+        self.loop = loop
+        self.granted = False
+
+# =========================================================
+# Singleton priority scheduler of the LLM calls
+# =========================================================
+class LLMScheduler:
+    """
+    Admission control of the LLM calls by priority class: interactive (live interview turns) > report > batch
+    (batch matching, upload structuring). A call holds a slot while it is sent and its response read.
+    When a slot frees up it goes to the highest-priority waiting call whose class is under its own limit,
+    FIFO within a class: queued batch calls are preempted by any interactive or report call arriving later.
+    Sync callers wait on a threading.Event, async callers on a future of their event loop.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(LLMScheduler, cls).__new__(cls)
+                    instance._state_lock = threading.Lock()
+                    instance._seq = itertools.count()
+                    instance._waiting = {name: deque() for name in PRIORITY_CLASSES}
+                    instance._running = {name: 0 for name in PRIORITY_CLASSES}
+                    # Sequence number of the last queued call of each class already counted as preempted
+                    instance._preempted_upto = {name: -1 for name in PRIORITY_CLASSES}
+                    instance._stats = {name: {"granted": 0, "wait_total": 0.0, "wait_max": 0.0, "preempted": 0}
+                                       for name in PRIORITY_CLASSES}
+                    cls._instance = instance
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return LLM_SCHEDULER_CONCURRENCY > 0
+
+    # ========================================
+    #           Slots
+    # ========================================
+    def acquire(self, priority_class: str = None, timeout: float = None) -> str:
+        """
+        Block until a slot of `priority_class` (default: the caller's llm_priority) is granted; returns the class.
+        Raises TimeoutError when no slot is granted within `timeout` seconds (None = wait as long as it takes).
+        """
+        priority_class = priority_class or current_priority()
+        if not self.enabled:
+            return priority_class
+        with self._state_lock:
+            if self._can_start(priority_class):
+                self._start(priority_class, 0.0)
+                return priority_class
+            waiter = self._enqueue(priority_class)
+        if not waiter.event.wait(timeout):
+            with self._state_lock:
+                # Granted while timing out: keep the slot
+                if not waiter.granted:
+                    self._waiting[priority_class].remove(waiter)
+                    raise TimeoutError(f"No {priority_class} LLM slot within {timeout:.1f}s")
+        return priority_class
+
+    async def aacquire(self, priority_class: str = None, timeout: float = None) -> str:
+        priority_class = priority_class or current_priority()
+        if not self.enabled:
+            return priority_class
+        loop = asyncio.get_running_loop()
+        with self._state_lock:
+            if self._can_start(priority_class):
+                self._start(priority_class, 0.0)
+                return priority_class
+            waiter = self._enqueue(priority_class, loop.create_future(), loop)
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            with self._state_lock:
+                if waiter.granted:
+                    # Granted while being cancelled: hand the slot over
+                    self._release_locked(priority_class)
+                else:
+                    self._waiting[priority_class].remove(waiter)
+            raise
+        return priority_class
+
+    def release(self, priority_class: str) -> None:
+        if not self.enabled:
+            return
+        with self._state_lock:
+            self._release_locked(priority_class)
+
+    def _can_start(self, priority_class: str) -> bool:
+        rank = PRIORITY_CLASSES.index(priority_class)
+        # FIFO within the class, and no skipping a higher class that only waits for total capacity
+        if self._waiting[priority_class]:
+            return False
+        if any(self._waiting[name] and self._running[name] < CLASS_CONCURRENCY[name] for name in PRIORITY_CLASSES[:rank]):
+            return False
+        return self._has_room(priority_class)
+
+    def _has_room(self, priority_class: str) -> bool:
+        return (sum(self._running.values()) < LLM_SCHEDULER_CONCURRENCY
+                and self._running[priority_class] < CLASS_CONCURRENCY[priority_class])
+
+    def _start(self, priority_class: str, waited: float) -> None:
+        self._running[priority_class] += 1
+        stats = self._stats[priority_class]
+        stats["granted"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        # The lower-class calls still queued have just been overtaken
+        for name in PRIORITY_CLASSES[PRIORITY_CLASSES.index(priority_class) + 1:]:
+            queue = self._waiting[name]
+            if queue and queue[-1].seq > self._preempted_upto[name]:
+                self._stats[name]["preempted"] += sum(1 for waiter in queue if waiter.seq > self._preempted_upto[name])
+                self._preempted_upto[name] = queue[-1].seq
+
+    def _enqueue(self, priority_class: str, future: asyncio.Future = None, loop=None) -> _Waiter:
+        waiter = _Waiter(priority_class, next(self._seq), future, loop)
+        self._waiting[priority_class].append(waiter)
+        return waiter
+
+    def _release_locked(self, priority_class: str) -> None:
+        self._running[priority_class] -= 1
+        # Hand the freed capacity to the waiting calls, highest class first
+        for name in PRIORITY_CLASSES:
+            queue = self._waiting[name]
+            while queue and self._has_room(name):
+                waiter = queue.popleft()
+                self._grant(waiter)
+            if queue and sum(self._running.values()) >= LLM_SCHEDULER_CONCURRENCY:
+                break
+
+    def _grant(self, waiter: _Waiter) -> None:
+        waiter.granted = True
+        self._start(waiter.priority_class, time.monotonic() - waiter.enqueued)
+        if waiter.event is not None:
+            waiter.event.set()
+        else:
+            waiter.loop.call_soon_threadsafe(self._resolve, waiter.future)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
+
+    # ========================================
+    #           Metrics
+    # ========================================
+    def stats(self) -> dict:
+        """Per class: queue depth, running calls, slots granted, mean/max wait in ms and preempted queued calls."""
+        now = time.monotonic()
+        with self._state_lock:
+            return {
+                "enabled": self.enabled,
+                "concurrency": LLM_SCHEDULER_CONCURRENCY,
+                "classes": {
+                    name: {
+                        "limit": CLASS_CONCURRENCY[name],
+                        "queued": len(self._waiting[name]),
+                        "running": self._running[name],
+                        "granted": stats["granted"],
+                        "wait_avg_ms": round(stats["wait_total"] * 1000 / stats["granted"], 1) if stats["granted"] else 0.0,
+                        "wait_max_ms": round(stats["wait_max"] * 1000, 1),
+                        "oldest_queued_ms": round((now - self._waiting[name][0].enqueued) * 1000, 1) if self._waiting[name] else 0.0,
+                        "preempted": stats["preempted"],
+                    }
+                    for name, stats in self._stats.items()
+                },
+            }
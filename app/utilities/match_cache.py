@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from pathlib import Path
+from typing  import Any, Dict, Iterable, Optional
+
+__all__ = ["MatchCache", "content_hash"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+DEFAULT_CACHE_PATH = BASE_DIR / "data" / "match_cache.db"
+
+# =========================================================
+# Hash helper
+# =========================================================
+def content_hash(content: str | dict) -> str:
+    """SHA-256 of a document; dicts are serialized canonically so key order doesn't matter."""
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+# =========================================================
+# Singleton CV x JD match-result cache (SQLite)
+# =========================================================
+class MatchCache:
+    """
+    Persistent cache of LLM match results keyed by
+    (JD content hash, CV content hash, model, prompt version).
+    The jd_id/cv_id columns are only used to drop stale rows when a document changes.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: str = None):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(MatchCache, cls).__new__(cls)
+                    cls._instance._db_path = str(db_path or os.getenv("MATCH_CACHE_PATH") or DEFAULT_CACHE_PATH)
+                    cls._instance._db_lock = threading.Lock()
+                    cls._instance._conn = cls._instance._connect()
+        return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS match_result (
+                jd_hash        TEXT NOT NULL,
+                cv_hash        TEXT NOT NULL,
+                model          TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                jd_id          TEXT,
+                cv_id          TEXT,
+                result         TEXT NOT NULL,
+                created_at     REAL NOT NULL,
+                PRIMARY KEY (jd_hash, cv_hash, model, prompt_version)
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_match_result_jd ON match_result(jd_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_match_result_cv ON match_result(cv_id)")
+        conn.commit()
+        return conn
+
+    def get_many(self, jd_hash: str, cv_hashes: Iterable[str], model: str, prompt_version: str) -> Dict[str, Dict[str, Any]]:
+        """Return {cv_hash: cached result} for every hash that has a cached result."""
+        cv_hashes = list(set(cv_hashes))
+        found = {}
+        with self._db_lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(cv_hashes), 500):
+                chunk = cv_hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"""SELECT cv_hash, result FROM match_result
+                        WHERE jd_hash = ? AND model = ? AND prompt_version = ?
+                        AND cv_hash IN ({",".join("?" * len(chunk))})""",
+                    [jd_hash, model, prompt_version, *chunk]
+                ).fetchall()
+                found.update({cv_hash: json.loads(result) for cv_hash, result in rows})
+        return found
+
+    def put(self, jd_hash: str, cv_hash: str, model: str, prompt_version: str, result: Dict[str, Any],
+            jd_id: Optional[str] = None, cv_id: Optional[str] = None) -> None:
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO match_result VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (jd_hash, cv_hash, model, prompt_version, jd_id, cv_id,
+                 json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, jd_id: Optional[str] = None, cv_id: Optional[str] = None) -> int:
+        """Drop every cached result that involves the given JD and/or CV id. Returns the number of rows removed."""
+        clauses, params = [], []
+        if jd_id:
+            clauses.append("jd_id = ?")
+            params.append(jd_id)
+        if cv_id:
+            clauses.append("cv_id = ?")
+            params.append(cv_id)
+        if not clauses:
+            return 0
+
+        with self._db_lock:
+            cursor = self._conn.execute(f"DELETE FROM match_result WHERE {' OR '.join(clauses)}", params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._db_lock:
+            self._conn.execute("DELETE FROM match_result")
+            self._conn.commit()
@@ -0,0 +1,247 @@
+import os
+import re
+import sqlite3
+import threading
+
+from abc        import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib    import Path
+from typing     import Callable, Iterable
+
+from app.utilities.csv_utils    import CsvUtils
+from app.utilities.id_allocator import IdAllocator, FileCounterIdAllocator, SqliteSequenceIdAllocator, max_id_number
+
+__all__ = ["MetadataStore", "CsvMetadataStore", "SqliteMetadataStore", "create_metadata_store", "migrate_csv_to_sqlite"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+DEFAULT_DB_PATH = BASE_DIR / "data" / "metadata.db"
+
+# =========================================================
+# Metadata store interface
+# =========================================================
+class MetadataStore(ABC):
+    """
+    Storage of the uploaded documents' metadata rows ({"id": ..., <schema fields>}).
+    Rows are plain dicts keyed by the store's schema, "id" (the first schema field) is the primary key.
+    """
+
+    def __init__(self, data_schema: list):
+        self.data_schema = data_schema
+        self.key = data_schema[0]
+
+    @abstractmethod
+    def get_all(self) -> list[dict]:
+        """Every row, in insertion order."""
+
+    @abstractmethod
+    def get(self, id: str) -> dict | None:
+        """The row with the given id, None if missing."""
+
+    @abstractmethod
+    def insert_many(self, rows: list[dict]) -> None:
+        """Add rows in a single write. Raises ValueError if an id already exists."""
+
+    @abstractmethod
+    def delete(self, id: str) -> bool:
+        """Remove a row; returns False when the id doesn't exist."""
+
+    @abstractmethod
+    def id_allocator(self, prefix: str, extra_ids: Callable[[], Iterable[str]] = None) -> IdAllocator:
+        """
+        The id allocator persisted next to this store.
+        Its counter starts after the highest `<prefix>-NNN` among the stored ids and `extra_ids()`.
+        """
+
+    def insert(self, row: dict) -> None:
+        self.insert_many([row])
+
+    def _id_seed(self, prefix: str, extra_ids: Callable[[], Iterable[str]] = None) -> Callable[[], int]:
+        def seed() -> int:
+            ids = [row.get(self.key) for row in self.get_all()] + list(extra_ids() if extra_ids else [])
+            return max_id_number(prefix, ids)
+        return seed
+
+    def _normalize(self, row: dict) -> dict:
+        return {field: ("" if row.get(field) is None else str(row.get(field))) for field in self.data_schema}
+
+# =========================================================
+# Legacy CSV backend
+# =========================================================
+class CsvMetadataStore(MetadataStore):
+    """
+    The original headerless CSV file (cv_file.csv / jd_file.csv), kept for existing deployments.
+    By default every operation reads and rewrites the whole file; with `journal=True`
+    inserts and deletes are single appended lines (see CsvUtils journal mode).
+    """
+
+    def __init__(self, file_path: str, data_schema: list, journal: bool = False, compact_ratio: float = 0.5):
+        super().__init__(data_schema)
+        self.csv_handler = CsvUtils(str(file_path), data_schema, journal=journal, compact_ratio=compact_ratio)
+        self.journal = journal
+        self._lock = threading.Lock()
+
+    def _read(self) -> list[dict]:
+        try:
+            return self.csv_handler.read_from_csv()
+        except FileNotFoundError:
+            return []
+
+    def _write(self, rows: list[dict]) -> None:
+        self.csv_handler.write_to_csv([[row.get(field, "") for field in self.data_schema] for row in rows])
+
+    def get_all(self) -> list[dict]:
+        return self._read()
+
+    def get(self, id: str) -> dict | None:
+        return next((row for row in self._read() if row.get(self.key) == id), None)
+
+    def insert_many(self, rows: list[dict]) -> None:
+        with self._lock:
+            all_rows = self._read()
+            existing = {row.get(self.key) for row in all_rows}
+            for row in rows:
+                if row.get(self.key) in existing:
+                    raise ValueError(f"Duplicate id: {row.get(self.key)}")
+                existing.add(row.get(self.key))
+            if self.journal:
+                self.csv_handler.append_rows([[self._normalize(row)[field] for field in self.data_schema] for row in rows])
+            else:
+                self._write(all_rows + [self._normalize(row) for row in rows])
+
+    def delete(self, id: str) -> bool:
+        with self._lock:
+            all_rows = self._read()
+            if self.journal:
+                if not any(row.get(self.key) == id for row in all_rows):
+                    return False
+                self.csv_handler.append_tombstones([id])
+                return True
+            new_rows = [row for row in all_rows if row.get(self.key) != id]
+            if len(new_rows) == len(all_rows):
+                return False
+            self._write(new_rows)
+            return True
+
+    def id_allocator(self, prefix: str, extra_ids: Callable[[], Iterable[str]] = None) -> IdAllocator:
+        counter_path = f"{self.csv_handler.file_path}.{prefix.lower()}_seq"
+        return FileCounterIdAllocator(prefix, counter_path, seed=self._id_seed(prefix, extra_ids))
+
+# =========================================================
+# SQLite backend
+# =========================================================
+class SqliteMetadataStore(MetadataStore):
+    """
+    One table per document type in a shared SQLite database.
+    Indexed primary key and transactional writes, safe to share between threads and uvicorn worker processes.
+    Ids come from an `id_sequence` table in the same database.
+    """
+
+    def __init__(self, table: str, data_schema: list, db_path: str = None):
+        super().__init__(data_schema)
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.table = table
+        self.db_path = str(db_path or os.getenv("METADATA_DB_PATH") or DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f'"{field}" TEXT' for field in data_schema[1:])
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ("{self.key}" TEXT PRIMARY KEY, {columns})')
+        self._conn.execute("CREATE TABLE IF NOT EXISTS migration (name TEXT PRIMARY KEY, rows INTEGER NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction: BEGIN IMMEDIATE takes the database write lock across processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _row(self, values) -> dict:
+        return dict(zip(self.data_schema, values))
+
+    def get_all(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(f'SELECT * FROM "{self.table}" ORDER BY rowid').fetchall()
+        return [self._row(row) for row in rows]
+
+    def get(self, id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(f'SELECT * FROM "{self.table}" WHERE "{self.key}" = ?', (id,)).fetchone()
+        return self._row(row) if row else None
+
+    def insert_many(self, rows: list[dict]) -> None:
+        placeholders = ", ".join("?" * len(self.data_schema))
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    f'INSERT INTO "{self.table}" VALUES ({placeholders})',
+                    [[self._normalize(row)[field] for field in self.data_schema] for row in rows]
+                )
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Duplicate id: {e}")
+
+    def delete(self, id: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(f'DELETE FROM "{self.table}" WHERE "{self.key}" = ?', (id,)).rowcount > 0
+
+    def id_allocator(self, prefix: str, extra_ids: Callable[[], Iterable[str]] = None) -> IdAllocator:
+        return SqliteSequenceIdAllocator(prefix, self.db_path, seed=self._id_seed(prefix, extra_ids))
+
+    def import_rows_once(self, migration_name: str, rows: list[dict]) -> int:
+        """Import rows a single time per `migration_name` (ids already present are skipped). Returns the imported count."""
+        placeholders = ", ".join("?" * len(self.data_schema))
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM migration WHERE name = ?", (migration_name,)).fetchone():
+                return 0
+            imported = 0
+            for row in rows:
+                imported += conn.execute(
+                    f'INSERT OR IGNORE INTO "{self.table}" VALUES ({placeholders})',
+                    [self._normalize(row)[field] for field in self.data_schema]
+                ).rowcount
+            conn.execute("INSERT INTO migration VALUES (?, ?)", (migration_name, imported))
+        return imported
+
+# =========================================================
+# Factory & migration
+# =========================================================
+def migrate_csv_to_sqlite(csv_path: str, store: SqliteMetadataStore) -> int:
+    """
+    One-shot import of a legacy metadata CSV into the SQLite store; later calls are no-ops.
+    The file is read as a journal: a plain CSV reads the same, and the tombstones of CSV_JOURNAL_MODE
+    deployments drop the deleted rows instead of failing the schema check.
+    """
+    if not os.path.isfile(csv_path):
+        return 0
+    rows = CsvMetadataStore(csv_path, store.data_schema, journal=True).get_all()
+    imported = store.import_rows_once(f"csv:{Path(csv_path).name}", rows)
+    if imported:
+        print(f"Imported {imported} metadata rows from {csv_path} into {store.db_path}:{store.table}")
+    return imported
+
+def create_metadata_store(name: str, data_schema: list, csv_path: str, backend: str = None) -> MetadataStore:
+    """
+    Build the metadata store of a document type from the METADATA_BACKEND setting:
+        - "sqlite" (default): table `name` in METADATA_DB_PATH, the legacy CSV is imported on first use
+        - "csv": the legacy CSV file at `csv_path`, append-only journal when CSV_JOURNAL_MODE is set
+    """
+    backend = (backend or os.getenv("METADATA_BACKEND") or "sqlite").lower()
+    if backend == "csv":
+        return CsvMetadataStore(
+            str(csv_path), data_schema,
+            journal=os.getenv("CSV_JOURNAL_MODE", "").lower() in ("1", "true", "yes"),
+            compact_ratio=float(os.getenv("CSV_COMPACT_RATIO", "0.5"))
+        )
+    if backend == "sqlite":
+        store = SqliteMetadataStore(name, data_schema)
+        migrate_csv_to_sqlite(str(csv_path), store)
+        return store
+    raise ValueError(f"Unknown metadata backend: {backend}")
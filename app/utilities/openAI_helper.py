@@ -2,7 +2,8 @@ import os
 import json
 import threading
 
-from openai    import OpenAI
+from app.utilities.llm_gateway import LLMGateway
+from app.utilities.tool_args_stream import ToolArgsStreamParser
 
 __all__ = ["OpenAIHelper"]
 
@@ -17,11 +18,11 @@ class OpenAIHelper:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(OpenAIHelper, cls).__new__(cls)
-                    cls._instance._client = OpenAI(
-                                    base_url = os.getenv("OPENAI_URL"),
-                                    api_key  = os.getenv("OPENAI_API_KEY")
-                                )
+                    instance = super(OpenAIHelper, cls).__new__(cls)
+                    # Shared pooled client, see LLMGateway
+                    instance._client = LLMGateway().client()
+                    # Published only once initialized: concurrent callers skip the lock when _instance is set
+                    cls._instance = instance
         return cls._instance
 
     def make_request(self, msg_prompt: str = None, func_defs: str | list = None, func_name: str | list = None, temp: int = None, max_ouput_tokens: int = None) -> dict:
@@ -31,28 +32,90 @@ class OpenAIHelper:
         """
         try:
             resp_ai = self._client.chat.completions.create(
-                model        = os.getenv("OPENAI_QNA_MODEL") or "",
-                messages     = msg_prompt or "",
-                tools        = func_defs or [],
-                tool_choice  = func_name if not func_name else ("auto" if func_name == "auto" else {"type": "function", "function": {"name": func_name}}),
-                temperature  = temp or 0,
-                max_tokens   = max_ouput_tokens or 500
+                **self._request_params(msg_prompt, func_defs, func_name, temp, max_ouput_tokens)
             )
+            return self._parse_reply(resp_ai)
+        except Exception as e:
+                return {"error": f"Called openAI API failed: {e}"}
 
-            # --- Handle multiple function calls ---
-            msg_ai_reply = resp_ai.choices[0].message
-            if hasattr(msg_ai_reply, "tool_calls") and msg_ai_reply.tool_calls:
-                func = []
-                for call in msg_ai_reply.tool_calls:
-                    fn_name = call.function.name
-                    try:
-                        args = json.loads(call.function.arguments)
-                    except Exception:
-                        args = {"error": "Failed to parse function arguments"}
-                    func.append({"name": fn_name, "args": args})
-                return {"func": func}
-
-            # Only text response
-            return {"msg_text": msg_ai_reply.content.strip() if msg_ai_reply.content else ""}
+    async def amake_request(self, msg_prompt: str = None, func_defs: str | list = None, func_name: str | list = None, temp: int = None, max_ouput_tokens: int = None) -> dict:
+        """
+        Async counterpart of `make_request` (same parameters and result) on the shared AsyncOpenAI client:
+        the event loop keeps serving other requests during the LLM round-trip.
+        """
+        try:
+            resp_ai = await LLMGateway().async_client().chat.completions.create(
+                **self._request_params(msg_prompt, func_defs, func_name, temp, max_ouput_tokens)
+            )
+            return self._parse_reply(resp_ai)
         except Exception as e:
                 return {"error": f"Called openAI API failed: {e}"}
+
+    async def astream_request(self, msg_prompt: str = None, func_defs: str | list = None, func_name: str | list = None, temp: int = None, max_ouput_tokens: int = None, stream_field: str = "text"):
+        """
+        Streaming counterpart of `amake_request`: an async generator yielding `{"delta": text}` while the reply
+        is generated (the `stream_field` argument of the first tool call, or the text content), then one final
+        result shaped like `amake_request`'s (`{"func": ...}`, `{"msg_text": ...}` or `{"error": ...}`).
+        """
+        try:
+            stream = await LLMGateway().async_client().chat.completions.create(
+                **self._request_params(msg_prompt, func_defs, func_name, temp, max_ouput_tokens),
+                stream = True
+            )
+            calls = {}
+            content = []
+            # Closes the HTTP response even when the consumer stops early (e.g. the client disconnected)
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content.append(delta.content)
+                        yield {"delta": delta.content}
+                    for call_delta in delta.tool_calls or []:
+                        call = calls.setdefault(call_delta.index, {"name": "", "parser": ToolArgsStreamParser(stream_field)})
+                        if not call_delta.function:
+                            continue
+                        call["name"] += call_delta.function.name or ""
+                        text = call["parser"].feed(call_delta.function.arguments or "")
+                        # Only the first tool call is shown to the user
+                        if text and call_delta.index == min(calls):
+                            yield {"delta": text}
+
+            if calls:
+                yield {"func": [self._parse_tool_call(call["name"], call["parser"].arguments) for _, call in sorted(calls.items())]}
+            else:
+                yield {"msg_text": "".join(content).strip()}
+        except Exception as e:
+                yield {"error": f"Called openAI API failed: {e}"}
+
+    @staticmethod
+    def _request_params(msg_prompt, func_defs, func_name, temp, max_ouput_tokens) -> dict:
+        return {
+            "model"       : os.getenv("OPENAI_QNA_MODEL") or "",
+            "messages"    : msg_prompt or "",
+            "tools"       : func_defs or [],
+            "tool_choice" : func_name if not func_name else ("auto" if func_name == "auto" else {"type": "function", "function": {"name": func_name}}),
+            "temperature" : temp or 0,
+            "max_tokens"  : max_ouput_tokens or 500
+        }
+
+    @staticmethod
+    def _parse_reply(resp_ai) -> dict:
+        # --- Handle multiple function calls ---
+        msg_ai_reply = resp_ai.choices[0].message
+        if hasattr(msg_ai_reply, "tool_calls") and msg_ai_reply.tool_calls:
+            return {"func": [OpenAIHelper._parse_tool_call(call.function.name, call.function.arguments)
+                             for call in msg_ai_reply.tool_calls]}
+
+        # Only text response
+        return {"msg_text": msg_ai_reply.content.strip() if msg_ai_reply.content else ""}
+
+    @staticmethod
+    def _parse_tool_call(fn_name: str, arguments: str) -> dict:
+        try:
+            args = json.loads(arguments)
+        except Exception:
+            args = {"error": "Failed to parse function arguments"}
+        return {"name": fn_name, "args": args}
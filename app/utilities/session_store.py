@@ -0,0 +1,516 @@
+import os
+import time
+import socket
+import sqlite3
+import threading
+
+from abc          import ABC, abstractmethod
+from contextlib   import contextmanager
+from dataclasses  import dataclass
+from pathlib      import Path
+from urllib.parse import urlparse
+
+__all__ = ["SessionStore", "StoredSession", "SessionConflictError", "MemorySessionStore", "SqliteSessionStore",
+           "RedisSessionStore", "create_session_store"]
+
+BASE_DIR = Path(__file__).parent.parent.parent.resolve()
+DEFAULT_DB_PATH = BASE_DIR / "data" / "sessions.db"
+
+class SessionConflictError(Exception):
+    """The session was updated by another request / worker since it was loaded."""
+
+@dataclass
+class StoredSession:
+    """
+    A serialized session: `state` (phase and questions) is rewritten on every save,
+    `meta` (the JD/CV) is written once, `messages` (the history, one serialized message each) is append-only.
+    `meta` is None when loaded with `with_meta=False`. `summary` is written apart from the versioned fields
+    (see `save_summary`).
+    """
+    version: int
+    state: str
+    meta: bytes | None
+    messages: list[str]
+    last_access: float
+    size: int
+    summary: str | None = None
+
+# =========================================================
+# Session store interface
+# =========================================================
+class SessionStore(ABC):
+    """
+    Storage of the interview sessions, opaque serialized records keyed by session id.
+    Every save is conditional on the version that was loaded (optimistic concurrency): a save that lost
+    the race raises SessionConflictError instead of overwriting the other update.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, state: str, meta: bytes, messages: list[str], size: int) -> None:
+        """Add a new session at version 1."""
+
+    @abstractmethod
+    def load(self, session_id: str, with_meta: bool = True) -> StoredSession | None:
+        """The session, None if missing."""
+
+    @abstractmethod
+    def save(self, session_id: str, version: int, state: str, messages_from: int, messages: list[str], size: int) -> int:
+        """
+        Replace the state and the history from index `messages_from` on (the messages before it are kept),
+        if the stored version is still `version`. Returns the new version, raises SessionConflictError otherwise.
+        """
+
+    @abstractmethod
+    def save_summary(self, session_id: str, summary: str) -> bool:
+        """
+        Store the session's summary without changing its version, so a background summary never makes
+        the concurrent turn's save fail. Returns False when the session doesn't exist.
+        """
+
+    @abstractmethod
+    def touch(self, session_id: str) -> None:
+        """Mark the session as used now."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a session; returns False when it doesn't exist."""
+
+    @abstractmethod
+    def pop(self, session_id: str, last_access: float) -> StoredSession | None:
+        """Remove and return the session, unless it was used after `last_access` (None then)."""
+
+    @abstractmethod
+    def usage(self) -> list[tuple[str, float, int]]:
+        """(session id, last access, size) of every session, least recently used first."""
+
+    @abstractmethod
+    def totals(self) -> tuple[int, int]:
+        """Number of sessions and their total size."""
+
+# =========================================================
+# In-process backend
+# =========================================================
+class MemorySessionStore(SessionStore):
+    """Sessions in a dict of this process: lost on restart and not shared between uvicorn workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[str, StoredSession] = {}
+        self._size = 0
+
+    def create(self, session_id: str, state: str, meta: bytes, messages: list[str], size: int) -> None:
+        with self._lock:
+            self._sessions[session_id] = StoredSession(1, state, meta, list(messages), time.time(), size)
+            self._size += size
+
+    def load(self, session_id: str, with_meta: bool = True) -> StoredSession | None:
+        with self._lock:
+            stored = self._sessions.get(session_id)
+            if stored is None:
+                return None
+            return StoredSession(stored.version, stored.state, stored.meta if with_meta else None,
+                                 list(stored.messages), stored.last_access, stored.size, stored.summary)
+
+    def save(self, session_id: str, version: int, state: str, messages_from: int, messages: list[str], size: int) -> int:
+        with self._lock:
+            stored = self._sessions.get(session_id)
+            if stored is None or stored.version != version:
+                raise SessionConflictError(f"Session {session_id} was modified or removed (version {version})")
+            stored.messages[messages_from:] = messages
+            stored.state = state
+            stored.version += 1
+            stored.last_access = time.time()
+            self._size += size - stored.size
+            stored.size = size
+            return stored.version
+
+    def save_summary(self, session_id: str, summary: str) -> bool:
+        with self._lock:
+            stored = self._sessions.get(session_id)
+            if stored is not None:
+                stored.summary = summary
+            return stored is not None
+
+    def touch(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id].last_access = time.time()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            stored = self._sessions.pop(session_id, None)
+            if stored is not None:
+                self._size -= stored.size
+            return stored is not None
+
+    def pop(self, session_id: str, last_access: float) -> StoredSession | None:
+        with self._lock:
+            stored = self._sessions.get(session_id)
+            if stored is None or stored.last_access > last_access:
+                return None
+            self._size -= stored.size
+            return self._sessions.pop(session_id)
+
+    def usage(self) -> list[tuple[str, float, int]]:
+        with self._lock:
+            return sorted(((session_id, stored.last_access, stored.size) for session_id, stored in self._sessions.items()),
+                          key=lambda item: item[1])
+
+    def totals(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._sessions), self._size
+
+# =========================================================
+# SQLite backend
+# =========================================================
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite database shared by every uvicorn worker process, kept across restarts.
+    One row per session plus one row per history message, so a turn only inserts its new messages.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = str(db_path or os.getenv("SESSION_DB_PATH") or DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session (
+                id          TEXT PRIMARY KEY,
+                version     INTEGER NOT NULL,
+                state       TEXT NOT NULL,
+                meta        BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                size        INTEGER NOT NULL,
+                summary     TEXT
+            )
+        """)
+        # Databases created before the summary column
+        if "summary" not in [column[1] for column in self._conn.execute("PRAGMA table_info(session)")]:
+            self._conn.execute("ALTER TABLE session ADD COLUMN summary TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS session_last_access ON session (last_access)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_message (
+                session_id TEXT NOT NULL,
+                seq        INTEGER NOT NULL,
+                message    TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction: BEGIN IMMEDIATE takes the database write lock across processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _load(self, conn: sqlite3.Connection, session_id: str, with_meta: bool) -> StoredSession | None:
+        row = conn.execute(
+            f"SELECT version, state, {'meta' if with_meta else 'NULL'}, last_access, size, summary FROM session WHERE id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        messages = [message for message, in conn.execute(
+            "SELECT message FROM session_message WHERE session_id = ? ORDER BY seq", (session_id,)
+        )]
+        return StoredSession(row[0], row[1], row[2], messages, row[3], row[4], row[5])
+
+    def create(self, session_id: str, state: str, meta: bytes, messages: list[str], size: int) -> None:
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO session VALUES (?, 1, ?, ?, ?, ?, NULL)", (session_id, state, meta, time.time(), size))
+            conn.executemany("INSERT INTO session_message VALUES (?, ?, ?)",
+                             [(session_id, seq, message) for seq, message in enumerate(messages)])
+
+    def load(self, session_id: str, with_meta: bool = True) -> StoredSession | None:
+        # Read transaction: the session row and its messages come from the same snapshot
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                return self._load(self._conn, session_id, with_meta)
+            finally:
+                self._conn.execute("COMMIT")
+
+    def save(self, session_id: str, version: int, state: str, messages_from: int, messages: list[str], size: int) -> int:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE session SET version = version + 1, state = ?, last_access = ?, size = ? WHERE id = ? AND version = ?",
+                (state, time.time(), size, session_id, version)
+            ).rowcount
+            if not updated:
+                raise SessionConflictError(f"Session {session_id} was modified or removed (version {version})")
+            conn.execute("DELETE FROM session_message WHERE session_id = ? AND seq >= ?", (session_id, messages_from))
+            conn.executemany("INSERT INTO session_message VALUES (?, ?, ?)",
+                             [(session_id, messages_from + i, message) for i, message in enumerate(messages)])
+        return version + 1
+
+    def save_summary(self, session_id: str, summary: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("UPDATE session SET summary = ? WHERE id = ?", (summary, session_id)).rowcount > 0
+
+    def touch(self, session_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("UPDATE session SET last_access = ? WHERE id = ?", (time.time(), session_id))
+
+    def delete(self, session_id: str) -> bool:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM session_message WHERE session_id = ?", (session_id,))
+            return conn.execute("DELETE FROM session WHERE id = ?", (session_id,)).rowcount > 0
+
+    def pop(self, session_id: str, last_access: float) -> StoredSession | None:
+        with self._transaction() as conn:
+            stored = self._load(conn, session_id, with_meta=True)
+            if stored is None or stored.last_access > last_access:
+                return None
+            conn.execute("DELETE FROM session_message WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session WHERE id = ?", (session_id,))
+            return stored
+
+    def usage(self) -> list[tuple[str, float, int]]:
+        with self._lock:
+            return self._conn.execute("SELECT id, last_access, size FROM session ORDER BY last_access").fetchall()
+
+    def totals(self) -> tuple[int, int]:
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM session").fetchone()
+        return count, size
+
+# =========================================================
+# Redis backend (RESP protocol, no client library)
+# =========================================================
+class _RespError(Exception):
+    pass
+
+class _RespConnection:
+    """One connection speaking the Redis protocol (RESP2): commands are arrays of bulk strings."""
+
+    def __init__(self, host: str, port: int, db: int, password: str = None, timeout: float = 10):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            return _RespError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise _RespError(f"Unexpected reply: {line!r}")
+
+    def pipeline(self, *commands) -> list:
+        """Send the commands in one write, return their replies (errors are raised)."""
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = [self._read() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, _RespError):
+                raise reply
+        return replies
+
+    def execute(self, *args):
+        return self.pipeline(args)[0]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions in Redis (or any server speaking its protocol), shared by every worker and host.
+    Keys (under `prefix`): `<id>` hash of version/state/meta/summary, `<id>:h` list of messages,
+    `lru` sorted set of the last accesses, `sizes` hash of the session sizes and the `bytes` counter.
+    Saves are WATCH / MULTI / EXEC transactions on the session hash; one connection per thread.
+    """
+
+    def __init__(self, url: str = None, prefix: str = None):
+        parsed = urlparse(url or os.getenv("SESSION_REDIS_URL") or "redis://localhost:6379/0")
+        self._address = (parsed.hostname or "localhost", parsed.port or 6379,
+                         int(parsed.path.lstrip("/") or 0), parsed.password)
+        self.prefix = prefix if prefix is not None else os.getenv("SESSION_REDIS_PREFIX", "qna:session:")
+        self._local = threading.local()
+
+    def _conn(self) -> _RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _RespConnection(*self._address)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """This thread's connection, dropped on error so a half-read reply or a pending WATCH never leaks."""
+        try:
+            yield self._conn()
+        except (OSError, ConnectionError, _RespError):
+            conn, self._local.conn = getattr(self._local, "conn", None), None
+            if conn is not None:
+                conn.close()
+            raise
+
+    def _key(self, session_id: str, suffix: str = "") -> str:
+        return f"{self.prefix}{session_id}{suffix}"
+
+    def _stored(self, fields: list, messages: list, last_access, size, with_meta: bool = True) -> StoredSession | None:
+        version, state, meta, summary = fields
+        if version is None or last_access is None:
+            return None
+        return StoredSession(int(version), state.decode("utf-8"), meta if with_meta else None,
+                             [message.decode("utf-8") for message in messages], float(last_access), int(size or 0),
+                             summary.decode("utf-8") if summary is not None else None)
+
+    def _load(self, conn: _RespConnection, session_id: str, with_meta: bool) -> StoredSession | None:
+        fields = ["version", "state", "meta" if with_meta else "version", "summary"]
+        *_, (values, messages, last_access, size) = conn.pipeline(
+            ("MULTI",), ("HMGET", self._key(session_id), *fields), ("LRANGE", self._key(session_id, ":h"), 0, -1),
+            ("ZSCORE", self._key("lru"), session_id), ("HGET", self._key("sizes"), session_id), ("EXEC",)
+        )
+        return self._stored(values, messages, last_access, size, with_meta)
+
+    def create(self, session_id: str, state: str, meta: bytes, messages: list[str], size: int) -> None:
+        commands = [("MULTI",),
+                    ("HSET", self._key(session_id), "version", 1, "state", state, "meta", meta)]
+        if messages:
+            commands.append(("RPUSH", self._key(session_id, ":h"), *messages))
+        commands += [("ZADD", self._key("lru"), time.time(), session_id), ("HSET", self._key("sizes"), session_id, size),
+                     ("INCRBY", self._key("bytes"), size), ("EXEC",)]
+        with self._connection() as conn:
+            conn.pipeline(*commands)
+
+    def load(self, session_id: str, with_meta: bool = True) -> StoredSession | None:
+        with self._connection() as conn:
+            return self._load(conn, session_id, with_meta)
+
+    def save(self, session_id: str, version: int, state: str, messages_from: int, messages: list[str], size: int) -> int:
+        key, history = self._key(session_id), self._key(session_id, ":h")
+        with self._connection() as conn:
+            _, stored_version, old_size = conn.pipeline(("WATCH", key), ("HGET", key, "version"),
+                                                        ("HGET", self._key("sizes"), session_id))
+            if stored_version is None or int(stored_version) != version:
+                conn.execute("UNWATCH")
+                raise SessionConflictError(f"Session {session_id} was modified or removed (version {version})")
+            now = time.time()
+            commands = [("MULTI",), ("HSET", key, "version", version + 1, "state", state)]
+            commands.append(("LTRIM", history, 0, messages_from - 1) if messages_from else ("DEL", history))
+            if messages:
+                commands.append(("RPUSH", history, *messages))
+            commands += [("ZADD", self._key("lru"), now, session_id), ("HSET", self._key("sizes"), session_id, size),
+                         ("INCRBY", self._key("bytes"), size - int(old_size or 0)), ("EXEC",)]
+            if conn.pipeline(*commands)[-1] is None:
+                raise SessionConflictError(f"Session {session_id} was modified concurrently (version {version})")
+        return version + 1
+
+    def save_summary(self, session_id: str, summary: str) -> bool:
+        key = self._key(session_id)
+        with self._connection() as conn:
+            while True:
+                # WATCH: never re-creates the hash of a session deleted meanwhile
+                _, exists = conn.pipeline(("WATCH", key), ("EXISTS", key))
+                if not exists:
+                    conn.execute("UNWATCH")
+                    return False
+                if conn.pipeline(("MULTI",), ("HSET", key, "summary", summary), ("EXEC",))[-1] is not None:
+                    return True
+
+    def touch(self, session_id: str) -> None:
+        with self._connection() as conn:
+            # XX: never re-adds a session deleted meanwhile
+            conn.execute("ZADD", self._key("lru"), "XX", time.time(), session_id)
+
+    def _remove(self, conn: _RespConnection, session_id: str, size) -> list:
+        return conn.pipeline(("MULTI",), ("DEL", self._key(session_id), self._key(session_id, ":h")),
+                             ("ZREM", self._key("lru"), session_id), ("HDEL", self._key("sizes"), session_id),
+                             ("INCRBY", self._key("bytes"), -int(size or 0)), ("EXEC",))[-1]
+
+    def delete(self, session_id: str) -> bool:
+        with self._connection() as conn:
+            while True:
+                _, size, exists = conn.pipeline(("WATCH", self._key(session_id)),
+                                                ("HGET", self._key("sizes"), session_id), ("EXISTS", self._key(session_id)))
+                if not exists:
+                    conn.execute("UNWATCH")
+                    return False
+                # Aborted (None) when the session was saved meanwhile: read its new size and retry
+                if self._remove(conn, session_id, size) is not None:
+                    return True
+
+    def pop(self, session_id: str, last_access: float) -> StoredSession | None:
+        with self._connection() as conn:
+            _, values, messages, stored_access, size = conn.pipeline(
+                ("WATCH", self._key(session_id)), ("HMGET", self._key(session_id), "version", "state", "meta", "summary"),
+                ("LRANGE", self._key(session_id, ":h"), 0, -1), ("ZSCORE", self._key("lru"), session_id),
+                ("HGET", self._key("sizes"), session_id)
+            )
+            stored = self._stored(values, messages, stored_access, size)
+            if stored is None or stored.last_access > last_access:
+                conn.execute("UNWATCH")
+                return None
+            # EXEC is aborted (None) when the session was saved meanwhile
+            return stored if self._remove(conn, session_id, size) is not None else None
+
+    def usage(self) -> list[tuple[str, float, int]]:
+        with self._connection() as conn:
+            entries, sizes = conn.pipeline(("ZRANGE", self._key("lru"), 0, -1, "WITHSCORES"),
+                                           ("HGETALL", self._key("sizes")))
+        sizes = dict(zip(sizes[::2], sizes[1::2]))
+        return [(member.decode("utf-8"), float(score), int(sizes.get(member) or 0))
+                for member, score in zip(entries[::2], entries[1::2])]
+
+    def totals(self) -> tuple[int, int]:
+        with self._connection() as conn:
+            count, size = conn.pipeline(("ZCARD", self._key("lru")), ("GET", self._key("bytes")))
+        return count, int(size or 0)
+
+# =========================================================
+# Factory
+# =========================================================
+def create_session_store(backend: str = None) -> SessionStore:
+    """
+    Build the interview session store from the SESSION_BACKEND setting:
+        - "sqlite" (default): SESSION_DB_PATH, shared by the worker processes of the host and kept across restarts
+        - "redis": SESSION_REDIS_URL, shared by every worker of every host
+        - "memory": this process only, lost on restart
+    """
+    backend = (backend or os.getenv("SESSION_BACKEND") or "sqlite").lower()
+    if backend == "sqlite":
+        return SqliteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -1,10 +1,33 @@
 import docx
 import fitz  # PyMuPDF
 import pytesseract
+from pytesseract import Output
 from PIL import Image
-import io
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Callable, Iterator
 from pathlib import Path
 
+# OCR presets: starting DPI, DPI of the second render when the mean word confidence of a page is
+# below `min_confidence` (None = never re-render), grayscale rendering and binarization threshold (None = off)
+OCR_PRESETS = {
+    "legacy":   {"dpi": 300, "retry_dpi": None, "min_confidence": 0,  "grayscale": False, "binarize": None},
+    "fast":     {"dpi": 150, "retry_dpi": None, "min_confidence": 0,  "grayscale": True,  "binarize": None},
+    "adaptive": {"dpi": 200, "retry_dpi": 300,  "min_confidence": 70, "grayscale": True,  "binarize": None},
+    "accurate": {"dpi": 300, "retry_dpi": 400,  "min_confidence": 80, "grayscale": True,  "binarize": 160},
+}
+OCR_PRESET = os.getenv("OCR_PRESET", "adaptive")
+# A PDF page with less text than this in its text layer (and an image or vector drawing) is OCRed
+MIN_PAGE_TEXT_CHARS = int(os.getenv("MIN_PAGE_TEXT_CHARS", "50"))
+# Processes used to OCR the pages of a scanned PDF (default: one per CPU, 1 = sequential)
+OCR_PROCESSES = int(os.getenv("OCR_PROCESSES") or os.cpu_count() or 1)
+# Pages handed to the OCR pool at a time (default: 2 per process); pages are rendered inside the
+# workers, so at most one page image per process is alive whatever the page count
+OCR_MAX_INFLIGHT_PAGES = int(os.getenv("OCR_MAX_INFLIGHT_PAGES") or 0)
+
 
 # You have to install OCR on your local machine!
 # link https://github.com/h/pytesseract?tab=readme-ov-file#installation
@@ -22,63 +45,220 @@ def extract_text_from_docx (path: str):
         return ""
 
 
-def extract_text_from_pdf(path: str) -> str:
+def extract_text_from_pdf(path: str, ocr_processes: int = None) -> str:
     """
     Extracts text from a .pdf file.
-    It tries direct text extraction first. If that fails (e.g., scanned PDF),
-    it falls back to OCR.
+    Each page uses its text layer when it has one, pages without it (scanned) are OCRed,
+    see `iter_pdf_pages`.
     """
     print(f"Processing PDF: {path}")
-
+    texts, sources, seconds = [], [], 0.0
     try:
-        doc = fitz.open(path)
-        full_text = []
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            full_text.append(page.get_text("text"))
-
-        doc.close()
-        combined_text = "\n".join(full_text).strip()
-
-        # If text is very short, it's likely a scanned image.
-        # We set a threshold (e.g., 50 characters) to trigger OCR.
-        if len(combined_text) > 50:
-            print("Successfully extracted text directly (digital PDF).")
-            return combined_text
-        else:
-            print("Direct extraction yielded little text. Attempting OCR...")
-            # Fall through to OCR logic below
-
+        for page in iter_pdf_pages(path, ocr_processes=ocr_processes):
+            texts.append(page["text"])
+            sources.append(page["source"])
+            seconds += page["seconds"]
     except Exception as e:
-        print(f"Error during direct text extraction: {e}. Attempting OCR...")
-        # Fall through to OCR logic
+        print(f"Error reading pdf {path}: {e}")
+        return ""
 
-    # --- Attempt 2: OCR Fallback (for scanned PDFs) ---
-    full_text = []
-    try:
-        doc = fitz.open(path)
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
+    print(f"Extracted {len(texts)} page(s): {sources.count('text')} from the text layer, "
+          f"{sources.count('ocr')} OCRed, {sources.count('ocr_failed')} OCR failed in {seconds:.2f}s")
+    return "\n".join(texts).strip()
 
-            # Render page to an image (pixmap)
-            # Increase zoom for better OCR resolution
-            pix = page.get_pixmap(dpi=300)
-            img_data = pix.tobytes("png")
 
-            # Open image using PIL
-            image = Image.open(io.BytesIO(img_data))
+def extract_pdf_pages(path: str, ocr_processes: int = None) -> list[dict]:
+    """All the pages of `iter_pdf_pages` as a list."""
+    return list(iter_pdf_pages(path, ocr_processes=ocr_processes))
 
-            # Perform OCR using Tesseract for English and Vietnamese
-            # 'eng+vie' tells Tesseract to look for both languages
-            page_text = pytesseract.image_to_string(image, lang='eng+vie')
-            full_text.append(page_text)
 
-        doc.close()
-        return "\n".join(full_text)
+def iter_pdf_pages(path: str, ocr_processes: int = None, preset: str = None) -> Iterator[dict]:
+    """
+    Extracts a .pdf page by page, opening the document once, and yields each page as soon as it
+    and the pages before it are done.
+    A page keeps its text layer when it has at least MIN_PAGE_TEXT_CHARS characters (or nothing drawn to read),
+    only the other pages are OCRed with the OCR_PRESETS entry `preset` (OCR_PRESET by default), in a pool of
+    `ocr_processes` worker processes (OCR_PROCESSES by default, 1 = in this process) rendering the pages themselves.
+    At most OCR_MAX_INFLIGHT_PAGES pages wait for OCR at a time, so memory doesn't grow with the page count.
+
+    Yields:
+        dict: One entry per page, in order:
+            {"page": 1-based number, "pages": page count, "text", "source": "text" | "ocr" | "ocr_failed",
+            "chars", "seconds"}, OCRed pages also have "ocr_dpi" (kept render), "confidence" (0-100),
+            "ocr_renders" and "ocr_image_bytes" (largest render).
+    """
+    with fitz.open(path) as doc:
+        page_count = len(doc)
+        processes = min(ocr_processes or OCR_PROCESSES, page_count)
+        max_inflight = OCR_MAX_INFLIGHT_PAGES or 2 * processes
+        pool = None
+        waiting = deque()       # (page entry, OCR future or None), in page order
+        try:
+            for page_num, page in enumerate(doc):
+                started = time.perf_counter()
+                text = page.get_text("text")
+                entry = {
+                    "page": page_num + 1,
+                    "pages": page_count,
+                    "text": text,
+                    "source": "text",
+                    "chars": len(text.strip()),
+                    "seconds": time.perf_counter() - started,
+                }
+                future = None
+                # Scans are images; text converted to outlines (design tools, some "print to PDF") is vector drawings
+                if len(text.strip()) < MIN_PAGE_TEXT_CHARS and (page.get_images() or page.get_drawings()):
+                    if processes <= 1:
+                        _apply_ocr(entry, lambda: _ocr_page(page_num, doc, preset))
+                    else:
+                        if pool is None:
+                            # spawn: forking a threaded server process can deadlock the children
+                            pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                                       initializer=_init_ocr_worker, initargs=(str(path),))
+                        future = pool.submit(_ocr_page, page_num, None, preset)
+                waiting.append((entry, future))
+
+                # Hand out every finished page; block on the oldest one when too many are in flight
+                while waiting and (waiting[0][1] is None or waiting[0][1].done()
+                                   or sum(1 for _, f in waiting if f is not None) >= max_inflight):
+                    entry, future = waiting.popleft()
+                    if future is not None:
+                        _apply_ocr(entry, future.result)
+                    yield entry
+
+            while waiting:
+                entry, future = waiting.popleft()
+                if future is not None:
+                    _apply_ocr(entry, future.result)
+                yield entry
+        finally:
+            if pool is not None:
+                # Only wait for the workers when every page was handed out (not when the caller stopped early)
+                pool.shutdown(wait=not waiting, cancel_futures=True)
 
+
+def _apply_ocr(entry: dict, run_ocr: Callable[[], dict]) -> None:
+    """Replace a page's text layer by its OCR result; keep the text layer if OCR fails."""
+    try:
+        ocr = run_ocr()
     except Exception as e:
-        print(f"Error during OCR extraction {file_path}: {e}")
-        return ""
+        print(f"Error during OCR of page {entry['page']}: {e}")
+        entry["source"] = "ocr_failed"
+        return
+    entry.update(text=ocr["text"], source="ocr", chars=len(ocr["text"].strip()),
+                 seconds=entry["seconds"] + ocr["seconds"], ocr_dpi=ocr["dpi"], confidence=ocr["confidence"],
+                 ocr_renders=ocr["renders"], ocr_image_bytes=ocr["image_bytes"])
+
+
+# ========================================
+#    OCR: pages spread over a process pool
+# ========================================
+_ocr_doc = None
+
+def _init_ocr_worker(path: str):
+    """Open the PDF once per worker process instead of once per page."""
+    global _ocr_doc
+    _ocr_doc = fitz.open(path)
+
+
+def _ocr_page(page_num: int, doc=None, preset: str = None) -> dict:
+    """
+    OCR one page with an OCR_PRESETS entry: render at the preset DPI, re-render at `retry_dpi`
+    when the confidence is too low and keep the more confident result.
+    Returns {"text", "confidence", "dpi", "renders", "image_bytes" (largest render), "seconds"}.
+    """
+    started = time.perf_counter()
+    settings = OCR_PRESETS[preset or OCR_PRESET]
+    page = (doc or _ocr_doc).load_page(page_num)
+
+    best = None
+    image_bytes = 0
+    renders = 0
+    for dpi in (settings["dpi"], settings["retry_dpi"]):
+        if not dpi or (best and best["confidence"] >= settings["min_confidence"]):
+            break
+        image, rendered_bytes = _render_page(page, dpi, settings["grayscale"] or settings["binarize"] is not None, settings["binarize"])
+        image_bytes = max(image_bytes, rendered_bytes)
+        renders += 1
+        text, confidence = _ocr_image(image)
+        if not best or confidence > best["confidence"]:
+            best = {"text": text, "confidence": confidence, "dpi": dpi}
+
+    return {**best, "renders": renders, "image_bytes": image_bytes, "seconds": time.perf_counter() - started}
+
+
+def _render_page(page, dpi: int, grayscale: bool, binarize: int = None) -> tuple[Image.Image, int]:
+    """Render a page straight from the pixmap samples (no PNG encode/decode round trip). Returns (image, pixmap bytes)."""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY if grayscale else fitz.csRGB, alpha=False)
+    image = Image.frombytes("L" if grayscale else "RGB", (pix.width, pix.height), pix.samples)
+    if binarize is not None:
+        image = image.point(lambda value: 255 if value > binarize else 0, mode="1")
+    return image, pix.stride * pix.height
+
+
+def _ocr_image(image: Image.Image) -> tuple[str, float]:
+    """Text and mean word confidence (0-100) from a single Tesseract pass."""
+    # Perform OCR using Tesseract for English and Vietnamese
+    # 'eng+vie' tells Tesseract to look for both languages
+    data = pytesseract.image_to_data(image, lang='eng+vie', output_type=Output.DICT)
+
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(word)
+        if float(data["conf"][i]) >= 0:
+            confidences.append(float(data["conf"][i]))
+
+    text_lines = []
+    previous_paragraph = None
+    for (block_num, par_num, _), words in lines.items():
+        if previous_paragraph and previous_paragraph != (block_num, par_num):
+            text_lines.append("")
+        text_lines.append(" ".join(words))
+        previous_paragraph = (block_num, par_num)
+    return "\n".join(text_lines), (sum(confidences) / len(confidences) if confidences else 0.0)
+
+
+def iter_text_from_file(path: str, ocr_processes: int = None) -> Iterator[dict]:
+    """
+    Streaming counterpart of `extract_text_from_file`: yields the pages of a .pdf as they are
+    extracted (see `iter_pdf_pages`); a .docx has no pages and comes as a single entry.
+    Raises ValueError for other extensions.
+    """
+    extension = Path(path).suffix.lower()
+    if extension == '.docx':
+        started = time.perf_counter()
+        text = extract_text_from_docx(str(path))
+        yield {"page": 1, "pages": 1, "text": text, "source": "docx", "chars": len(text.strip()),
+               "seconds": time.perf_counter() - started}
+    elif extension == '.pdf':
+        yield from iter_pdf_pages(str(path), ocr_processes=ocr_processes)
+    else:
+        raise ValueError(f"Unsupported file extension: {extension}")
+
+
+def count_pages(path: str) -> int:
+    """Page count of a .pdf (without extracting it); a .docx counts as a single page, like in `iter_text_from_file`."""
+    if Path(path).suffix.lower() == '.pdf':
+        with fitz.open(str(path)) as doc:
+            return len(doc)
+    return 1
+
+
+def extract_text_from_file(path: str, ocr_processes: int = None) -> str:
+    """
+    Extracts text from a .pdf or .docx file, chosen by extension.
+    Module-level and picklable so it can run in a process pool (bulk uploads).
+    Raises ValueError for other extensions.
+    """
+    extension = Path(path).suffix.lower()
+    if extension == '.docx':
+        return extract_text_from_docx(str(path))
+    elif extension == '.pdf':
+        return extract_text_from_pdf(str(path), ocr_processes=ocr_processes)
+    raise ValueError(f"Unsupported file extension: {extension}")
 
 
 def parse_cv_or_jd(file_path: str) -> str:
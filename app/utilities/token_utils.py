@@ -0,0 +1,22 @@
+import os
+import json
+import math
+
+__all__ = ["estimate_tokens", "estimate_message_tokens", "CHARS_PER_TOKEN", "MESSAGE_OVERHEAD_TOKENS"]
+
+# Average characters per token used to estimate prompt sizes without a tokenizer.
+# ~4 for English, lower for Vietnamese (diacritics split into more tokens): 3 errs on the large side.
+CHARS_PER_TOKEN = float(os.getenv("CHARS_PER_TOKEN", "3"))
+# Tokens the chat format adds around every message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (no tokenizer dependency)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def estimate_message_tokens(message: dict) -> int:
+    """Rough token count of a chat message: its text, or its JSON for tool calls and other shapes."""
+    content = message.get("content")
+    if isinstance(content, str) and message.keys() <= {"role", "content"}:
+        return estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    return estimate_tokens(json.dumps(message, ensure_ascii=False, default=str)) + MESSAGE_OVERHEAD_TOKENS
@@ -0,0 +1,103 @@
+import json
+
+__all__ = ["ToolArgsStreamParser"]
+
+# =========================================================
+# Incremental parser of streamed tool-call arguments
+# =========================================================
+class ToolArgsStreamParser:
+    """
+    Reads the JSON arguments of a tool call as they are streamed (arbitrary fragments, e.g.
+    `{"te`, `xt": "Great ans`, `wer!\\n", "next_st`...) and returns the decoded characters of one
+    top-level string field (`field`, "text" by default) as soon as they arrive, so they can be shown
+    before the completion ends.
+    The other fields are only skipped here: parse `arguments` with `json.loads` once the stream is complete.
+    """
+
+    def __init__(self, field: str = "text"):
+        self.field = field
+        self.arguments = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        # Role of the string being read: "key", "value" (the streamed field) or "other"
+        self._string_role = None
+        self._key = []
+        self._last_key = None
+        self._expect_key = False
+
+    def feed(self, fragment: str) -> str:
+        """Append a fragment of the arguments and return the newly decoded text of the field ("" if none)."""
+        self.arguments += fragment
+        out = []
+        buf = self.arguments
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if self._in_string:
+                if char == "\\":
+                    escape = self._read_escape(buf, self._pos)
+                    if escape is None:
+                        # Incomplete escape sequence: wait for the next fragment
+                        break
+                    decoded, length = escape
+                    self._string_char(decoded, out)
+                    self._pos += length
+                    continue
+                if char == '"':
+                    self._end_string()
+                else:
+                    self._string_char(char, out)
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._string_role = "key"
+                    self._key = []
+                elif self._depth == 1 and self._last_key == self.field:
+                    self._string_role = "value"
+                else:
+                    self._string_role = "other"
+            elif char in "{[":
+                self._depth += 1
+                self._expect_key = char == "{" and self._depth == 1
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+                self._last_key = None
+            self._pos += 1
+        return "".join(out)
+
+    def _string_char(self, char: str, out: list) -> None:
+        if self._string_role == "key":
+            self._key.append(char)
+        elif self._string_role == "value":
+            out.append(char)
+
+    def _end_string(self) -> None:
+        if self._string_role == "key":
+            self._last_key = "".join(self._key)
+        self._in_string = False
+        self._string_role = None
+
+    @staticmethod
+    def _read_escape(buf: str, pos: int):
+        """(decoded text, length) of the escape sequence at `pos`, None while it is incomplete."""
+        if pos + 1 >= len(buf):
+            return None
+        length = 2
+        if buf[pos + 1] == "u":
+            length = 6
+            if pos + length > len(buf):
+                return None
+            # A high surrogate is only decodable together with the low surrogate that follows it
+            if 0xD800 <= int(buf[pos + 2:pos + 6], 16) <= 0xDBFF and buf[pos + 6:pos + 8] in ("\\u", "\\", ""):
+                length = 12
+                if pos + length > len(buf):
+                    return None
+        try:
+            return json.loads(f'"{buf[pos:pos + length]}"'), length
+        except json.JSONDecodeError:
+            # Malformed escape: keep the raw characters rather than stalling the stream
+            return buf[pos:pos + length], length
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+# ========================================
+#    Benchmark: batch CV scoring throughput
+# ========================================
+def _run(nb_cvs: int, concurrency_levels: list[int], latency: float):
+    with FakeOpenAIServer(latency=latency) as server:
+        # The scoring client is created at import time, point it to the fake server first
+        os.environ["OPENAI_API_KEY"] = "stub-key"
+        os.environ["OPENAI_URL"] = server.url
+        os.environ["OPENAI_QNA_MODEL"] = "stub-model"
+        # Private match cache, cleared between levels
+        os.environ["MATCH_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "match_cache.db")
+        from app.services import scan_cv_jd
+        from app.utilities.match_cache import MatchCache
+
+        job_summary = {"basic_info": {"job_title": "Benchmark Engineer"}, "match_criteria": {}}
+        cv_list = [{"id": f"CV-{i:03d}", "content": f'{{"basics": {{"cv_id": "CV-{i:03d}"}}}}'} for i in range(1, nb_cvs + 1)]
+
+        print(f"{nb_cvs} CVs, simulated LLM latency {latency:.2f}s")
+        print(f"{'concurrency':>12} {'seconds':>10} {'CV/s':>8} {'speedup':>8} {'peak':>6} {'errors':>7}")
+        baseline = None
+        for level in concurrency_levels:
+            # Every level must score for real, not replay the match cache
+            MatchCache().clear()
+            server.reset_stats()
+            started = time.perf_counter()
+            results = scan_cv_jd.process_cv_batch(cv_list, job_summary, max_concurrency=level)
+            elapsed = time.perf_counter() - started
+
+            assert [r["cv_id"] for r in results] == [cv["id"] for cv in cv_list], "results lost the CV order"
+            errors = sum(1 for r in results if "error" in r)
+            baseline = baseline or elapsed
+            print(f"{level:>12} {elapsed:>10.2f} {nb_cvs / elapsed:>8.1f} {baseline / elapsed:>7.1f}x {server.max_in_flight:>6} {errors:>7}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process_cv_batch against a fake OpenAI server")
+    parser.add_argument("--cvs", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    _run(args.cvs, args.levels, args.latency)
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+# ========================================
+#    Synthetic long CV
+# ========================================
+def _long_cv(jobs: int) -> str:
+    lines = ["NGUYEN VAN A", "Senior Backend Engineer - nguyen.van.a@example.com - +84 912 345 678", "",
+             "SUMMARY", "Backend engineer with a long career building distributed systems in Python and Go.", "",
+             "EXPERIENCE"]
+    for job in range(jobs):
+        lines += [f"Company {job} - Software Engineer (20{10 + job % 15}-20{11 + job % 15})"]
+        lines += [f"- Built service {job}.{task} with FastAPI, PostgreSQL, Redis and Kafka, cutting latency by {task * 7}%"
+                  for task in range(1, 9)]
+        lines.append("")
+    lines += ["EDUCATION", "Bachelor of Computer Science, Hanoi University of Science and Technology", "",
+              "SKILLS", "Python, Go, FastAPI, Django, PostgreSQL, Redis, Kafka, Docker, Kubernetes, AWS"]
+    return "\n".join(lines)
+
+# ========================================
+#    Benchmark: single call vs chunked map-reduce
+# ========================================
+def _run(jobs_list: list[int], latency: float, latency_per_kchar: float):
+    with FakeOpenAIServer(latency=latency, latency_per_kchar=latency_per_kchar) as server:
+        os.environ["OPENAI_URL"] = server.url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        from app.utilities import content_2_json as Content2Json
+        from app.utilities.token_utils import estimate_tokens
+        from data.schema import CV_SCHEMA
+
+        print(f"{'tokens':>7} {'mode':>8} {'calls':>6} {'seconds':>8}")
+        for jobs in jobs_list:
+            text = _long_cv(jobs)
+            for mode, parse in (("single", lambda: Content2Json.parse_content_to_json(text, CV_SCHEMA)),
+                                ("chunked", lambda: Content2Json.parse_long_content_to_json(text, CV_SCHEMA))):
+                server.reset_stats()
+                started = time.perf_counter()
+                parse()
+                elapsed = time.perf_counter() - started
+                print(f"{estimate_tokens(text):>7} {mode:>8} {server.requests:>6} {elapsed:>8.2f}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of chunked vs single-call structuring against a fake LLM")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10, 40, 80], help="work entries of the synthetic CV")
+    parser.add_argument("--latency", type=float, default=0.3, help="fixed seconds per call")
+    parser.add_argument("--latency-per-kchar", type=float, default=0.15, help="extra seconds per 1000 prompt characters")
+    args = parser.parse_args()
+    _run(args.jobs, args.latency, args.latency_per_kchar)
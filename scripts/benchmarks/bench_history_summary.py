@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+SYSTEM_PROMPT = "You are an AI interview assistant designed to support and manage interview processes. " * 30
+
+# ========================================
+#    Benchmark: prompt size and context kept over a long interview
+# ========================================
+def _interview(turns: int, answer_delay: float, seed: int) -> list:
+    """Play `turns` answers on one session, as _apply_and_save does; one row per turn."""
+    from app.services.qna_session_mgr import SessionManager, SessionPhase
+    from app.services.qna_summarizer import schedule_summary
+
+    rng = random.Random(seed)
+    manager = SessionManager()
+    session_id = manager.create_session(phase_state=SessionPhase.INTERVIEW, sys_prompt=SYSTEM_PROMPT, jd_meta={}, cv_meta={})
+    rows = []
+    for turn in range(turns):
+        session = manager.get_session(session_id)
+        manager.trim_history(session)
+        length, total, tokens = session.window
+        summary = session.get("summary") or {"upto": 0}
+        pinned, start = manager.history_window(session)
+        # History messages the prompt covers: sent as is, or folded into the summary
+        covered = length if start == pinned else pinned + (total - start) + max(summary["upto"] - pinned, 0)
+        rows.append((turn + 1, total, tokens, length, min(covered, total)))
+
+        session["conversation_history"].append({"role": "user", "content": f"Answer {turn}: " + "details " * rng.choice((5, 20, 60, 250))})
+        session["conversation_history"].append({"role": "assistant", "content": f"Question {turn + 1}: " + "why " * rng.randint(20, 80)})
+        manager.save_session(session)
+        schedule_summary(session)
+        time.sleep(answer_delay)
+    return rows
+
+def _main(args):
+    from app.utilities.log_manager import LoggingManager
+
+    with FakeOpenAIServer(latency=args.latency, reply_words=args.summary_words) as server:
+        os.environ.update(OPENAI_URL=server.url, OPENAI_API_KEY="stub", SESSION_BACKEND="memory",
+                          SESSION_ARCHIVE_DIR="", SESSION_SWEEP_INTERVAL="0", HISTORY_TOKEN_BUDGET=str(args.budget),
+                          HISTORY_SUMMARY_TOKENS=str(args.summary_tokens))
+        LoggingManager().setup_logger()
+        rows = _interview(args.turns, args.answer_delay, seed=args.turns)
+        print(f"One interview of {args.turns} turns, history budget {args.budget} tokens, summary {args.summary_tokens} "
+              f"(0 = dropped turns are lost), summarizer latency {args.latency}s, candidate answers every {args.answer_delay}s")
+        print(f"{'turn':>5} {'history msgs':>13} {'prompt tok':>11} {'sent msgs':>10} {'covered msgs':>13}")
+        for turn, total, tokens, length, covered in rows[::max(len(rows) // 10, 1)] + rows[-1:]:
+            print(f"{turn:>5} {total:>13} {tokens:>11} {length:>10} {covered:>13}")
+        print(f"LLM calls for summaries: {server.requests}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interview history window with and without the rolling summary")
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=4000, help="HISTORY_TOKEN_BUDGET")
+    parser.add_argument("--summary-tokens", type=int, default=400, help="HISTORY_SUMMARY_TOKENS")
+    parser.add_argument("--summary-words", type=int, default=150, help="words in each summary of the fake LLM")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency per summary")
+    parser.add_argument("--answer-delay", type=float, default=1.0, help="seconds between two answers")
+    _main(parser.parse_args())
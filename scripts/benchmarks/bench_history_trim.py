@@ -0,0 +1,85 @@
+import os
+import sys
+import copy
+import time
+import random
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+__all__ = []
+
+SYSTEM_PROMPT = "You are an AI interview assistant designed to support and manage interview processes. " * 30
+
+# ========================================
+#    Previous implementation (baseline)
+# ========================================
+def _legacy_trim(history: list, max_hst: int = 20, msg_nb_first: int = 6) -> list:
+    """get_trim_history before: deep copy of the whole history, then a window by message count."""
+    chat_hst = copy.deepcopy(history)
+    if len(chat_hst) <= max_hst:
+        return chat_hst
+    stat = min(msg_nb_first, max_hst)
+    end = max_hst - stat
+    return chat_hst[:stat] + chat_hst[-end:] if end > 0 else chat_hst[:]
+
+# ========================================
+#    Interview histories
+# ========================================
+def _session(turns: int, seed: int):
+    """A loaded session after `turns` answers: short and long answers (pasted code, detailed stories)."""
+    from app.services.qna_session_mgr import Session, SessionPhase
+    rng = random.Random(seed)
+    history = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for turn in range(turns):
+        history.append({"role": "user", "content": "details of my answer " * rng.choice((5, 20, 60, 250))})
+        history.append({"role": "assistant", "content": f"Feedback and question {turn + 1}: " + "why " * rng.randint(20, 80)})
+    session = Session(phase=SessionPhase.INTERVIEW, question={"total": turns, "current": turns, "items": []},
+                      jd_meta={}, cv_meta={}, conversation_history=history)
+    session.message_tokens = []
+    session.window = None
+    return session
+
+def _timed(function, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+# ========================================
+#    Benchmark: trimming CPU and prompt size per turn
+# ========================================
+def _run(turn_counts: list, budget: int, repeat: int):
+    from app.services.qna_session_mgr import SessionManager
+    from app.utilities.token_utils import estimate_message_tokens
+
+    manager = SessionManager()
+    print(f"History sent with one turn: previous window (deep copy, 20 messages) vs token budget {budget}")
+    print(f"{'turns':>6} {'history tok':>12} {'before us':>10} {'before msgs':>12} {'before tok':>11} "
+          f"{'after us':>9} {'after msgs':>11} {'after tok':>10}")
+    for turns in turn_counts:
+        session = _session(turns, seed=turns)
+        history = session["conversation_history"]
+        total_tokens = sum(estimate_message_tokens(message) for message in history)
+
+        before = _legacy_trim(history)
+        before_us = _timed(lambda: _legacy_trim(history), repeat)
+        # Every turn appends two messages: the per-message token counts are cached after the first call
+        after = manager.trim_history(session, token_budget=budget)
+        after_us = _timed(lambda: manager.trim_history(session, token_budget=budget), repeat)
+        print(f"{turns:>6} {total_tokens:>12} {before_us:>10.1f} {len(before):>12} "
+              f"{sum(map(estimate_message_tokens, before)):>11} {after_us:>9.1f} {len(after):>11} {session.window[2]:>10}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="get_trim_history: deep copy + message count vs token-budget window")
+    parser.add_argument("--turns", type=int, nargs="+", default=[3, 10, 20, 40])
+    parser.add_argument("--budget", type=int, default=4000, help="HISTORY_TOKEN_BUDGET")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SESSION_BACKEND", "memory")
+    _run(args.turns, args.budget, args.repeat)
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import anyio
+import httpx
+
+from fastapi import FastAPI
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+SAMPLE_JD = {
+    "basic_info": {"job_title": "Backend Engineer"},
+    "metadata": {"jd_id": "JD-LOAD"},
+    "requirements": ["Python", "FastAPI", "SQL"]
+}
+
+# ========================================
+#    Apps under test
+# ========================================
+def _build_app() -> FastAPI:
+    """The real /routes/qna router, plus a `/sync/answer` baseline that runs the blocking handlers
+    on the threadpool the way the route did before it was async."""
+    from app.routes import qna
+    from app.services import qna_generator as qna_svc
+    from app.services.qna_session_mgr import SessionManager, SessionPhase
+
+    sync_handlers = {
+        SessionPhase.UNKNOWN: qna_svc.handle_start_interview,
+        SessionPhase.INTRO: qna_svc.handle_readniess_interview,
+        SessionPhase.READINESS: qna_svc.handle_readniess_interview,
+        SessionPhase.INTERVIEW: qna_svc.handle_qna_interview,
+        SessionPhase.WARMUP: qna_svc.handle_warmup_interview,
+    }
+
+    app = FastAPI()
+    app.include_router(qna.router, prefix="/routes/qna")
+
+    @app.post("/sync/answer")
+    def sync_answer(param_in: qna.InterviewAnswerRequest):
+        session = SessionManager().get_session(param_in.session_id)
+        return {"reply": sync_handlers[session["phase"]](param_in.session_id, param_in.answer)}
+
+    return app
+
+# ========================================
+#    Simulated candidates
+# ========================================
+async def _candidate(client: httpx.AsyncClient, answer_path: str, turns: int, latencies: list) -> bool:
+    resp = await client.post("/routes/qna/start", json={"jd_id": "JD-LOAD", "cv_id": ""})
+    if resp.status_code != 200:
+        return False
+    session_id = resp.json()["session_id"]
+    for turn in range(turns):
+        started = time.perf_counter()
+        resp = await client.post(answer_path, json={"session_id": session_id, "answer": f"answer {turn}"})
+        latencies.append(time.perf_counter() - started)
+        if resp.status_code != 200:
+            return False
+    await client.delete("/routes/qna/interview", params={"session_id": session_id})
+    return True
+
+async def _run_mode(app: FastAPI, answer_path: str, candidates: int, turns: int) -> dict:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_candidate(client, answer_path, turns, latencies) for _ in range(candidates)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ok": sum(results),
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+    }
+
+async def _main(args):
+    app = _build_app()
+    # Starlette runs sync endpoints on anyio's threadpool, bounded by this limiter
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+
+    print(f"{args.candidates} concurrent candidates x {args.turns} answers, stub latency {args.latency * 1000:.0f} ms, "
+          f"threadpool {args.threadpool} threads")
+    print(f"{'mode':>14} {'ok':>5} {'wall s':>8} {'turn p50 ms':>12} {'turn p95 ms':>12} {'max LLM in flight':>18}")
+    for name, path in (("sync route", "/sync/answer"), ("async route", "/routes/qna/answer")):
+        args.server.reset_stats()
+        stats = await _run_mode(app, path, args.candidates, args.turns)
+        print(f"{name:>14} {stats['ok']:>5} {stats['elapsed']:>8.2f} {stats['p50'] * 1000:>12.0f} "
+              f"{stats['p95'] * 1000:>12.0f} {args.server.max_in_flight:>18}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test: concurrent interview sessions against a stub LLM")
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3, help="answers submitted by each candidate")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub LLM latency in seconds")
+    parser.add_argument("--threadpool", type=int, default=40, help="threads available to sync endpoints (Starlette default: 40)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as jd_dir, FakeOpenAIServer(latency=args.latency) as server:
+        os.environ["OPENAI_URL"] = server.url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        with open(os.path.join(jd_dir, "JD-LOAD.json"), "w", encoding="utf-8") as f:
+            json.dump(SAMPLE_JD, f)
+
+        # Serve the sample JD from the temp folder instead of data/upload/JD
+        from app.services import document_repository
+        document_repository.DOCUMENT_TYPES["jd"]["folder"] = jd_dir
+
+        from app.utilities.log_manager import LoggingManager
+        LoggingManager().setup_logger()
+        # Per-turn INFO logs would dominate the output and the timings
+        logging.disable(logging.INFO)
+
+        args.server = server
+        asyncio.run(_main(args))
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from fastapi import FastAPI
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+from scripts.benchmarks.bench_interview_load import SAMPLE_JD
+
+__all__ = []
+
+# ========================================
+#    Minimal ASGI client
+# ========================================
+async def _post(app: FastAPI, path: str, payload: dict) -> dict:
+    """POST straight to the ASGI app, timestamping every body part it sends
+    (httpx's ASGITransport buffers the whole response, which would hide the streaming)."""
+    body = json.dumps(payload).encode("utf-8")
+    received = {"sent": False}
+    parts = []
+    started = time.perf_counter()
+
+    async def receive():
+        if not received["sent"]:
+            received["sent"] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            parts.append((time.perf_counter() - started, message["body"].decode("utf-8")))
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+             "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+             "client": ("127.0.0.1", 0), "server": ("bench", 80)}
+    await app(scope, receive, send)
+    first_delta = next((at for at, text in parts if "event: delta" in text), None)
+    return {"first": first_delta if first_delta is not None else (parts[0][0] if parts else 0.0),
+            "total": parts[-1][0] if parts else 0.0,
+            "text": "".join(text for _, text in parts)}
+
+# ========================================
+#    Benchmark: full completion vs streamed reply
+# ========================================
+async def _candidate(app: FastAPI, path: str, turns: int) -> list[dict]:
+    from app.services import qna_generator as qna_svc
+    session_id = (await qna_svc.ahandle_initialize_interview("JD-LOAD", ""))["session_id"]
+    return [await _post(app, path, {"session_id": session_id, "answer": f"answer {turn}"}) for turn in range(turns)]
+
+async def _main(args):
+    from app.routes import qna
+    app = FastAPI()
+    app.include_router(qna.router, prefix="/routes/qna")
+
+    print(f"{args.candidates} concurrent candidates x {args.turns} answers, stub: {args.latency * 1000:.0f} ms to first token "
+          f"+ {args.token_delay * 1000:.0f} ms per word, {args.reply_words}-word replies")
+    print(f"{'endpoint':>20} {'first text p50 ms':>18} {'first text p95 ms':>18} {'complete p50 ms':>16}")
+    for path in ("/routes/qna/answer", "/routes/qna/answer/stream"):
+        results = await asyncio.gather(*(_candidate(app, path, args.turns) for _ in range(args.candidates)))
+        turns = [turn for candidate in results for turn in candidate]
+        if path.endswith("/stream") and not all("event: done" in turn["text"] for turn in turns):
+            print("FAILED: a streamed turn did not complete")
+        first = sorted(turn["first"] for turn in turns)
+        print(f"{path.rsplit('/qna', 1)[1]:>20} {statistics.median(first) * 1000:>18.0f} "
+              f"{first[int(len(first) * 0.95) - 1] * 1000:>18.0f} "
+              f"{statistics.median(turn['total'] for turn in turns) * 1000:>16.0f}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first reply text: /routes/qna/answer vs /routes/qna/answer/stream")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=2, help="answers submitted by each candidate")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="stub generation time per word in seconds")
+    parser.add_argument("--reply-words", type=int, default=60, help="length of each generated text field")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as jd_dir, \
+            FakeOpenAIServer(latency=args.latency, token_delay=args.token_delay, reply_words=args.reply_words) as server:
+        os.environ["OPENAI_URL"] = server.url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        with open(os.path.join(jd_dir, "JD-LOAD.json"), "w", encoding="utf-8") as f:
+            json.dump(SAMPLE_JD, f)
+
+        # Serve the sample JD from the temp folder instead of data/upload/JD
+        from app.services import document_repository
+        document_repository.DOCUMENT_TYPES["jd"]["folder"] = jd_dir
+
+        from app.utilities.log_manager import LoggingManager
+        LoggingManager().setup_logger()
+        logging.disable(logging.INFO)
+
+        asyncio.run(_main(args))
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from openai import OpenAI, AsyncOpenAI
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+# ========================================
+#    Benchmark: per-call client vs shared gateway
+# ========================================
+def _sync_ms_per_call(calls: int, get_client, per_call: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        client = get_client()
+        client.chat.completions.create(model="stub", messages=MESSAGES)
+        if per_call:
+            client.close()
+    return (time.perf_counter() - started) * 1000 / calls
+
+async def _async_ms_per_call(calls: int, get_client, per_call: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        client = get_client()
+        await client.chat.completions.create(model="stub", messages=MESSAGES)
+        if per_call:
+            await client.close()
+    return (time.perf_counter() - started) * 1000 / calls
+
+def _run(calls: int, latency: float):
+    with FakeOpenAIServer(latency=latency) as server:
+        os.environ["OPENAI_URL"] = server.url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        from app.utilities.llm_gateway import LLMGateway
+
+        print(f"{calls} sequential calls, stub latency {latency * 1000:.0f} ms "
+              f"(plain HTTP to localhost: the TLS handshakes saved against a real endpoint are not included)")
+        print(f"{'mode':>22} {'ms/call':>8} {'connections':>12}")
+
+        def report(name: str, measure):
+            measure()   # warm-up (imports, first connection)
+            server.reset_stats()
+            print(f"{name:>22} {measure():>8.2f} {server.connections:>12}")
+
+        report("sync  per-call client",
+               lambda: _sync_ms_per_call(calls, lambda: OpenAI(base_url=server.url, api_key="stub"), per_call=True))
+        report("sync  shared gateway",
+               lambda: _sync_ms_per_call(calls, LLMGateway().client, per_call=False))
+
+        # The shared async pool is bound to one event loop: run every async measurement on the same loop
+        loop = asyncio.new_event_loop()
+        try:
+            report("async per-call client", lambda: loop.run_until_complete(
+                _async_ms_per_call(calls, lambda: AsyncOpenAI(base_url=server.url, api_key="stub"), per_call=True)))
+            report("async shared gateway", lambda: loop.run_until_complete(
+                _async_ms_per_call(calls, LLMGateway().async_client, per_call=False)))
+            loop.run_until_complete(LLMGateway().aclose())
+        finally:
+            loop.close()
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-call latency of a new OpenAI client per call vs the shared LLMGateway pool")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stub waits before answering")
+    args = parser.parse_args()
+    _run(args.calls, args.latency)
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+JOB_SUMMARY = {"basic_info": {"job_title": "Backend Engineer"}, "metadata": {"jd_id": "JD-BENCH"}}
+
+# ========================================
+#    Worker: one batch match with the environment's LLM_* settings
+# ========================================
+def _worker(cvs: int, concurrency: int):
+    from app.services.scan_cv_jd import process_cv_batch
+    from app.utilities.llm_resilience import LLMResilience
+
+    cv_list = [{"id": f"CV-{i:03d}", "content": json.dumps({"basics": {"name": f"Candidate {i}"}})} for i in range(cvs)]
+    started = time.perf_counter()
+    results = process_cv_batch(cv_list, JOB_SUMMARY, max_concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"ok": sum("match_data" in r for r in results), "elapsed": elapsed,
+                      "stats": LLMResilience().stats()}))
+
+def _run_worker(server: FakeOpenAIServer, cvs: int, concurrency: int, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        worker_env = {**os.environ, "OPENAI_URL": server.url, "OPENAI_API_KEY": "stub",
+                      "OPENAI_QNA_MODEL": "stub", "MATCH_CACHE_PATH": os.path.join(cache_dir, "match.db"), **env}
+        server.reset_stats()
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", "--cvs", str(cvs),
+                                 "--concurrency", str(concurrency)],
+                                env=worker_env, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+# ========================================
+#    Benchmark: batch matching under throttling / outage
+# ========================================
+def _run(cvs: int, concurrency: int, quota_rps: float, latency: float):
+    print(f"Batch of {cvs} CVs, {concurrency} in parallel, provider quota {quota_rps:.0f} req/s "
+          f"({quota_rps * 60:.0f} RPM), {latency * 1000:.0f} ms per call")
+    print(f"{'mode':>30} {'scored':>7} {'wall s':>7} {'429s':>6} {'retries':>8}")
+    with FakeOpenAIServer(latency=latency, quota_rps=quota_rps) as server:
+        modes = (
+            ("no retry (before)", {"LLM_MAX_RETRIES": "0"}),
+            ("backoff + Retry-After", {"LLM_MAX_RETRIES": "6"}),
+            ("backoff + RPM limiter", {"LLM_MAX_RETRIES": "6", "LLM_RPM_LIMIT": str(int(quota_rps * 60)),
+                                       "LLM_RATE_BURST_SECONDS": "1"}),
+        )
+        for name, env in modes:
+            result = _run_worker(server, cvs, concurrency, env)
+            print(f"{name:>30} {result['ok']:>7} {result['elapsed']:>7.2f} {server.throttled:>6} "
+                  f"{result['stats']['retries']:>8}")
+
+    print(f"\nProvider down (every call answered 500), {cvs} CVs")
+    print(f"{'mode':>30} {'scored':>7} {'wall s':>7} {'calls sent':>11} {'circuit':>8}")
+    with FakeOpenAIServer(latency=latency, error_rate=1.0) as server:
+        modes = (
+            ("retries, no breaker", {"LLM_MAX_RETRIES": "2", "LLM_BACKOFF_BASE": "0.05",
+                                     "LLM_BREAKER_FAILURES": str(10 ** 6)}),
+            ("retries + breaker", {"LLM_MAX_RETRIES": "2", "LLM_BACKOFF_BASE": "0.05", "LLM_BREAKER_FAILURES": "5"}),
+        )
+        for name, env in modes:
+            result = _run_worker(server, cvs, concurrency, env)
+            state = next(iter(result["stats"]["circuits"].values()), "-")
+            print(f"{name:>30} {result['ok']:>7} {result['elapsed']:>7.2f} {server.errors:>11} {state:>8}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch matching against a throttling / failing stub LLM")
+    parser.add_argument("--cvs", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--quota-rps", type=float, default=10, help="provider quota, requests per second")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.cvs, args.concurrency)
+    else:
+        _run(args.cvs, args.concurrency, args.quota_rps, args.latency)
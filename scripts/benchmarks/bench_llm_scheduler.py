@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_openai_server import FakeOpenAIServer
+
+__all__ = []
+
+JOB_SUMMARY = {"basic_info": {"job_title": "Backend Engineer"}, "metadata": {"jd_id": "JD-BENCH"}}
+
+# ========================================
+#    Worker: interview turns while a batch match runs
+# ========================================
+def _worker(cvs: int, turns: int, think_time: float):
+    from app.services.scan_cv_jd import process_cv_batch
+    from app.utilities.openAI_helper import OpenAIHelper
+    from app.utilities.llm_scheduler import LLMScheduler
+
+    batch = None
+    if cvs:
+        cv_list = [{"id": f"CV-{i:03d}", "content": json.dumps({"basics": {"name": f"Candidate {i}"}})} for i in range(cvs)]
+        batch = threading.Thread(target=process_cv_batch, args=(cv_list, JOB_SUMMARY), kwargs={"max_concurrency": 32})
+        batch.start()
+        # Let the batch fill the queue first
+        time.sleep(1.0)
+
+    latencies = []
+    for _ in range(turns):
+        started = time.perf_counter()
+        OpenAIHelper().make_request(msg_prompt=[{"role": "user", "content": "my answer"}])
+        latencies.append(time.perf_counter() - started)
+        time.sleep(think_time)
+    stats = LLMScheduler().stats()
+    if batch:
+        batch.join()
+    print(json.dumps({"latencies": latencies, "scheduler": stats}))
+
+def _run_worker(server: FakeOpenAIServer, cvs: int, turns: int, think_time: float, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        worker_env = {**os.environ, "OPENAI_URL": server.url, "OPENAI_API_KEY": "stub", "OPENAI_QNA_MODEL": "stub",
+                      "MATCH_CACHE_PATH": os.path.join(cache_dir, "match.db"), **env}
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", "--cvs", str(cvs),
+                                 "--turns", str(turns), "--think-time", str(think_time)],
+                                env=worker_env, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+# ========================================
+#    Benchmark: interview turn latency during a batch match
+# ========================================
+def _run(cvs: int, turns: int, quota_rps: float, latency: float, think_time: float):
+    print(f"{turns} interview turns while {cvs} CVs are batch matched (32 threads), provider quota "
+          f"{quota_rps:.0f} req/s enforced by LLM_RPM_LIMIT, {latency * 1000:.0f} ms per call")
+    print(f"{'mode':>26} {'turn p50 ms':>12} {'turn max ms':>12} {'batch queued':>13} {'batch preempted':>16}")
+    quota_env = {"LLM_RPM_LIMIT": str(int(quota_rps * 60)), "LLM_RATE_BURST_SECONDS": "1"}
+    with FakeOpenAIServer(latency=latency, quota_rps=quota_rps) as server:
+        modes = (
+            ("interview alone", 0, {}),
+            ("batch, FIFO (before)", cvs, {"LLM_SCHEDULER_CONCURRENCY": "0", "LLM_BATCH_QUOTA_SHARE": "1"}),
+            ("batch, scheduler", cvs, {"LLM_BATCH_QUOTA_SHARE": "1"}),
+            ("batch, scheduler + share", cvs, {}),
+        )
+        for name, mode_cvs, env in modes:
+            result = _run_worker(server, mode_cvs, turns, think_time, {**quota_env, **env})
+            batch = result["scheduler"]["classes"]["batch"]
+            print(f"{name:>26} {statistics.median(result['latencies']) * 1000:>12.0f} "
+                  f"{max(result['latencies']) * 1000:>12.0f} {batch['queued']:>13} {batch['preempted']:>16}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interview turn latency while a batch match saturates the LLM quota")
+    parser.add_argument("--cvs", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--quota-rps", type=float, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--think-time", type=float, default=0.3, help="pause between two turns of the candidate")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.cvs, args.turns, args.think_time)
+    else:
+        _run(args.cvs, args.turns, args.quota_rps, args.latency, args.think_time)
@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.utilities.metadata_store import CsvMetadataStore, SqliteMetadataStore
+
+__all__ = []
+
+DATA_SCHEMA = ["id", "name", "uploadBy", "uploadDate"]
+
+# ========================================
+#    Benchmark: metadata get/insert/delete latency
+# ========================================
+def _rows(start: int, count: int) -> list[dict]:
+    return [{"id": f"CV-{i:06d}", "name": f"cv_{i}.pdf", "uploadBy": "Admin User", "uploadDate": "2025111200:00:00"}
+            for i in range(start, start + count)]
+
+def _timed(fn, args_list) -> float:
+    """Mean latency in milliseconds; the CSV backend's console output is swallowed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        elapsed = time.perf_counter() - started
+    return elapsed * 1000 / max(1, len(args_list))
+
+def _bench(name: str, store, size: int, ops: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.insert_many(_rows(0, size))
+
+    ids = [(f"CV-{random.randrange(size):06d}",) for _ in range(ops)]
+    new_rows = [(row,) for row in _rows(size, ops)]
+    get_ms = _timed(store.get, ids)
+    insert_ms = _timed(store.insert, new_rows)
+    delete_ms = _timed(store.delete, [(row["id"],) for (row,) in new_rows])
+    print(f"{name:>8} {size:>8} {get_ms:>10.3f} {insert_ms:>10.3f} {delete_ms:>10.3f}")
+
+def _run(sizes: list[int], ops: int, csv_ops: int):
+    print(f"{'backend':>8} {'records':>8} {'get ms':>10} {'insert ms':>10} {'delete ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            sqlite_store = SqliteMetadataStore(f"bench_{size}", DATA_SCHEMA, db_path=os.path.join(tmp_dir, "bench.db"))
+            _bench("sqlite", sqlite_store, size, ops)
+            csv_store = CsvMetadataStore(os.path.join(tmp_dir, f"bench_{size}.csv"), DATA_SCHEMA)
+            _bench("csv", csv_store, size, csv_ops)
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the SQLite and legacy CSV metadata stores")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--ops", type=int, default=500, help="operations per measurement (SQLite)")
+    parser.add_argument("--csv-ops", type=int, default=10, help="operations per measurement (CSV, O(N) each)")
+    args = parser.parse_args()
+    _run(args.sizes, args.ops, args.csv_ops)
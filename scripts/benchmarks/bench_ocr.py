@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import fitz
+import pytesseract
+
+from app.utilities.text_extraction_utils import iter_pdf_pages
+
+__all__ = []
+
+SAMPLE_LINES = [
+    "Nguyen Van A - Senior Python Developer",
+    "Email: nguyen.van.a@example.com  Phone: +84 912 345 678",
+    "Experience: 2018 - 2024 Backend engineer at FPT Software, FastAPI, PostgreSQL, Docker",
+    "Skills: Python, Django, REST APIs, Kubernetes, AWS, CI/CD, unit testing",
+    "Education: Bachelor of Computer Science, Hanoi University of Science and Technology",
+]
+
+# ========================================
+#    Synthetic scanned PDF (image-only pages)
+# ========================================
+def _page_lines(page_num: int) -> list[str]:
+    """Ground-truth text of a synthetic page."""
+    return [f"{line} ({page_num + 1}.{repeat})" for repeat in range(6) for line in SAMPLE_LINES]
+
+def _make_scanned_pdf(path: str, pages: int, dpi: int = 200) -> None:
+    """Render text pages to images and rebuild a PDF from them, so it has no text layer."""
+    source = fitz.open()
+    for page_num in range(pages):
+        page = source.new_page()
+        for i, line in enumerate(_page_lines(page_num)):
+            page.insert_text((56, 72 + 18 * i), line, fontsize=10)
+    scanned = fitz.open()
+    for page in source:
+        pix = page.get_pixmap(dpi=dpi)
+        target = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        target.insert_image(target.rect, pixmap=pix)
+    scanned.save(path)
+    scanned.close()
+    source.close()
+
+# ========================================
+#    Benchmark: wall-clock per process count
+# ========================================
+def _run(pages: int, process_counts: list[int]):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "scanned.pdf")
+        _make_scanned_pdf(path, pages)
+
+        print(f"{'processes':>9} {'seconds':>8} {'speedup':>8} {'chars':>7}")
+        baseline = None
+        for processes in process_counts:
+            started = time.perf_counter()
+            texts = [page["text"] for page in iter_pdf_pages(path, ocr_processes=processes)]
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{processes:>9} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x {sum(len(t) for t in texts):>7}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR wall-clock time of a synthetic scanned PDF per process count")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        print("Tesseract is not installed, see https://github.com/h/pytesseract#installation")
+        sys.exit(1)
+    _run(args.pages, args.processes)
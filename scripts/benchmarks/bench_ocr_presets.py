@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import difflib
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pytesseract
+
+from app.utilities.text_extraction_utils import OCR_PRESETS, iter_pdf_pages
+from scripts.benchmarks.bench_ocr import _make_scanned_pdf, _page_lines
+
+__all__ = []
+
+# ========================================
+#    Benchmark: OCR presets, time / memory / quality
+# ========================================
+def _similarity(expected: str, actual: str) -> float:
+    """Word-level similarity (0-1) of two texts."""
+    return difflib.SequenceMatcher(None, expected.split(), actual.split(), autojunk=False).ratio()
+
+def _run(pages: int, scan_dpi: int, presets: list[str]):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "scanned.pdf")
+        _make_scanned_pdf(path, pages, dpi=scan_dpi)
+        truth = "\n".join(line for page_num in range(pages) for line in _page_lines(page_num))
+
+        print(f"{'preset':>9} {'s/page':>7} {'image MB':>9} {'renders':>8} {'conf':>5} {'accuracy':>9} {'vs legacy':>10}")
+        legacy_text = None
+        for preset in ["legacy"] + [name for name in presets if name != "legacy"]:
+            started = time.perf_counter()
+            # One process: per-page cost without pool noise
+            results = list(iter_pdf_pages(path, ocr_processes=1, preset=preset))
+            elapsed = time.perf_counter() - started
+
+            text = "\n".join(page["text"] for page in results)
+            legacy_text = legacy_text if legacy_text is not None else text
+            print(f"{preset:>9} {elapsed / pages:>7.2f} "
+                  f"{max(page.get('ocr_image_bytes', 0) for page in results) / 1024 / 1024:>9.1f} "
+                  f"{sum(page.get('ocr_renders', 0) for page in results) / pages:>8.1f} "
+                  f"{sum(page.get('confidence', 0) for page in results) / pages:>5.0f} "
+                  f"{_similarity(truth, text):>9.3f} {_similarity(legacy_text, text):>10.3f}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the OCR presets on a synthetic scanned PDF "
+                                                 "(legacy = the previous 300 DPI RGB pipeline)")
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--scan-dpi", type=int, default=200, help="resolution of the synthetic scan")
+    parser.add_argument("--presets", nargs="+", default=list(OCR_PRESETS), choices=list(OCR_PRESETS))
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        print("Tesseract is not installed, see https://github.com/h/pytesseract#installation")
+        sys.exit(1)
+    _run(args.pages, args.scan_dpi, args.presets)
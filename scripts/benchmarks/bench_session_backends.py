@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.benchmarks.fake_redis_server import FakeRedisServer
+
+__all__ = []
+
+JD = {"metadata": {"jd_id": "JD-BENCH"}, "description": "Backend engineer, Python / FastAPI / SQL. " * 200}
+CV = {"metadata": {"cv_id": "CV-BENCH"}, "experience": "Five years of Python services and SQL tuning. " * 200}
+
+# ========================================
+#    Worker processes (one per uvicorn worker)
+# ========================================
+def _answer(session, turn: int) -> None:
+    """What a turn's apply_reply does: append the exchange, move to the next question."""
+    from app.services.qna_session_mgr import SessionPhase
+    session["phase"] = SessionPhase.INTERVIEW
+    session["question"]["current"] += 1
+    session["conversation_history"].append({"role": "user", "content": f"Answer {turn}: " + "details " * 60})
+    session["conversation_history"].append({"role": "assistant", "content": f"Question {turn + 1}: " + "why " * 30})
+
+def _save(session) -> str:
+    from app.services.qna_session_mgr import SessionManager, SessionConflictError
+    try:
+        SessionManager().save_session(session)
+    except SessionConflictError:
+        return "conflict"
+    return "ok"
+
+def _turn(session_id: str, turn: int) -> str:
+    """One interview turn without the LLM: load, answer, save."""
+    from app.services.qna_session_mgr import SessionManager
+    session = SessionManager().get_session(session_id)
+    if session is None:
+        return "lost"
+    _answer(session, turn)
+    return _save(session)
+
+def _worker(worker_id: int, workers: int, session_ids: list, turns: int, barrier, results):
+    """Turn t of session i lands on worker (i + t) % workers, like a load balancer without sticky sessions."""
+    from app.services.qna_session_mgr import SessionManager
+    SessionManager()
+    counts = {"ok": 0, "lost": 0, "conflict": 0, "seconds": 0.0}
+    for turn in range(turns):
+        barrier.wait()
+        for index, session_id in enumerate(session_ids):
+            if (index + turn) % workers == worker_id:
+                started = time.perf_counter()
+                counts[_turn(session_id, turn)] += 1
+                counts["seconds"] += time.perf_counter() - started
+    results.put(counts)
+
+def _create(count: int, results):
+    from app.services.qna_session_mgr import SessionManager, SessionPhase
+    results.put([SessionManager().create_session(phase_state=SessionPhase.UNKNOWN, sys_prompt="You are an interviewer.",
+                                                 jd_meta=JD, cv_meta=CV) for _ in range(count)])
+
+def _restarted(session_ids: list, turns: int, results):
+    """A fresh process, as after a --reload restart: which sessions are still complete?"""
+    from app.services.qna_session_mgr import SessionManager
+    sessions = [SessionManager().get_session(session_id) for session_id in session_ids]
+    results.put(sum(bool(session) and session["question"]["current"] == turns for session in sessions))
+
+def _double_submit(session_ids: list, barrier, results):
+    """Both workers load every session, then both save their answer: only one per session may win."""
+    from app.services.qna_session_mgr import SessionManager
+    sessions = [session for session in map(SessionManager().get_session, session_ids) if session is not None]
+    for session in sessions:
+        _answer(session, 99)
+    barrier.wait()
+    results.put([_save(session) for session in sessions])
+
+def _spawn(ctx, target, *args) -> list:
+    results = ctx.Queue()
+    processes = [ctx.Process(target=target, args=(*arg, results)) for arg in args]
+    for process in processes:
+        process.start()
+    values = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return values
+
+# ========================================
+#    Benchmark: sessions shared by worker processes
+# ========================================
+def _run(backend: str, sessions: int, turns: int, workers: int) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    os.environ["SESSION_BACKEND"] = backend
+    session_ids = _spawn(ctx, _create, (sessions,))[0]
+    barrier = ctx.Barrier(workers)
+    counts = _spawn(ctx, _worker, *[(worker_id, workers, session_ids, turns, barrier) for worker_id in range(workers)])
+    ok, lost = sum(c["ok"] for c in counts), sum(c["lost"] for c in counts)
+    per_turn = sum(c["seconds"] for c in counts) / max(ok + lost, 1) * 1e6
+    survived = _spawn(ctx, _restarted, (session_ids, turns))[0]
+    barrier = ctx.Barrier(2)
+    submits = _spawn(ctx, _double_submit, (session_ids, barrier), (session_ids, barrier))
+    accepted = sum(outcome == "ok" for outcomes in submits for outcome in outcomes)
+    rejected = sum(outcome == "conflict" for outcomes in submits for outcome in outcomes)
+    print(f"{backend:>8} {ok:>9} {lost:>10} {per_turn:>12.0f} {survived:>10} {accepted:>15} {rejected:>15}")
+
+def _main(args):
+    print(f"{args.sessions} interviews x {args.turns} turns, each turn on another of {args.workers} worker processes "
+          f"(no sticky sessions), then a restart and a double submit of every session from 2 workers")
+    print(f"{'backend':>8} {'turns ok':>9} {'turns lost':>10} {'store us/turn':>12} {'survived':>10} "
+          f"{'double accepted':>15} {'double rejected':>15}")
+    with tempfile.TemporaryDirectory() as data_dir, FakeRedisServer() as redis_server:
+        os.environ.update(SESSION_DB_PATH=os.path.join(data_dir, "sessions.db"), SESSION_REDIS_URL=redis_server.url,
+                          SESSION_ARCHIVE_DIR="", SESSION_SWEEP_INTERVAL="0")
+        for backend in args.backends:
+            _run(backend, args.sessions, args.turns, args.workers)
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interview sessions shared by worker processes, per session backend")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backends", nargs="+", default=["memory", "sqlite", "redis"])
+    _main(parser.parse_args())
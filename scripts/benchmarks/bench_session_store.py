@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+__all__ = []
+
+# ========================================
+#    Worker: abandoned interviews with the environment's SESSION_* settings
+# ========================================
+def _worker(interviews: int, turns: int, doc_kb: int):
+    import tracemalloc
+    tracemalloc.start()
+    from app.services.qna_session_mgr import SessionManager
+
+    jd = {"metadata": {"jd_id": "JD-BENCH"}, "description": "x" * (doc_kb * 1024)}
+    cv = {"metadata": {"cv_id": "CV-BENCH"}, "experience": "y" * (doc_kb * 1024)}
+    manager = SessionManager()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for i in range(interviews):
+        # Fresh copies, as DocumentRepository loads each JD/CV from disk
+        session_id = manager.create_session(sys_prompt="You are an interviewer.",
+                                            jd_meta=json.loads(json.dumps(jd)), cv_meta=json.loads(json.dumps(cv)))
+        for turn in range(turns):
+            session = manager.get_session(session_id)
+            session["conversation_history"].append({"role": "user", "content": f"answer {turn} " * 40})
+            session["conversation_history"].append({"role": "assistant", "content": f"question {turn} " * 40})
+            manager.save_session(session)
+        # Never deleted: the candidate closed the tab
+    elapsed = time.perf_counter() - started
+    manager.sweep()
+    print(json.dumps({"heap_mb": (tracemalloc.get_traced_memory()[0] - baseline) / 1024 / 1024,
+                      "elapsed": elapsed, "stats": manager.stats()}))
+
+def _run_worker(interviews: int, turns: int, doc_kb: int, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as archive_dir:
+        worker_env = {**os.environ, "SESSION_BACKEND": "memory", "SESSION_ARCHIVE_DIR": archive_dir,
+                      "SESSION_SWEEP_INTERVAL": "0", **env}
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", "--interviews", str(interviews),
+                                 "--turns", str(turns), "--doc-kb", str(doc_kb)],
+                                env=worker_env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["archived"] = len(os.listdir(archive_dir))
+        return result
+
+# ========================================
+#    Benchmark: session store footprint
+# ========================================
+def _run(interviews: int, turns: int, doc_kb: int, max_sessions: int, max_memory_mb: float):
+    print(f"{interviews} abandoned interviews x {turns} turns, {doc_kb} KB JD + {doc_kb} KB CV each")
+    print(f"{'mode':>26} {'sessions':>9} {'heap MB':>8} {'accounted MB':>13} {'evicted':>8} {'archived':>9} {'wall s':>7}")
+    modes = (
+        ("no bounds", {"SESSION_MAX_COUNT": "0", "SESSION_MAX_MEMORY_MB": "0", "SESSION_ARCHIVE_DIR": ""}),
+        (f"max {max_sessions} sessions", {"SESSION_MAX_COUNT": str(max_sessions), "SESSION_MAX_MEMORY_MB": "0"}),
+        (f"max {max_memory_mb:g} MB", {"SESSION_MAX_COUNT": "0", "SESSION_MAX_MEMORY_MB": str(max_memory_mb)}),
+    )
+    for name, env in modes:
+        result = _run_worker(interviews, turns, doc_kb, env)
+        stats = result["stats"]
+        print(f"{name:>26} {stats['sessions']:>9} {result['heap_mb']:>8.1f} {stats['memory_bytes'] / 1024 / 1024:>13.1f} "
+              f"{sum(stats['evicted'].values()):>8} {result['archived']:>9} {result['elapsed']:>7.2f}")
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory held by interview sessions that are never deleted (memory backend)")
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--doc-kb", type=int, default=20, help="size of each JD / CV JSON")
+    parser.add_argument("--max-sessions", type=int, default=200)
+    parser.add_argument("--max-memory-mb", type=float, default=8)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.interviews, args.turns, args.doc_kb)
+    else:
+        _run(args.interviews, args.turns, args.doc_kb, args.max_sessions, args.max_memory_mb)
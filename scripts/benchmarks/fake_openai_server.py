@@ -0,0 +1,281 @@
+import re
+import json
+import time
+import random
+import threading
+import argparse
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = ["FakeOpenAIServer"]
+
+# ========================================
+#    Dummy values for a JSON schema
+# ========================================
+def _fake_value(schema: dict, text: str = "stub"):
+    """Build the smallest value that satisfies the `type` of a JSON schema node (strings are `text`)."""
+    schema_type = schema.get("type", "string")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+
+    if schema_type == "object":
+        return {key: _fake_value(sub, text) for key, sub in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return []
+    if schema_type == "integer":
+        return 50
+    if schema_type == "number":
+        return 1.0
+    if schema_type == "boolean":
+        return False
+    if schema_type == "null":
+        return None
+    return text
+
+def _tokens(text: str) -> list[str]:
+    """Split a completion into word-sized pieces, the unit of `token_delay` and of streamed chunks."""
+    return re.findall(r"\S+\s*|\s+", text) or [""]
+
+# ========================================
+#    Request handler
+# ========================================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: without TCP_NODELAY, keep-alive clients hit ~40 ms delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        # Keep the benchmark output readable
+        pass
+
+    def setup(self):
+        super().setup()
+        # One handler per TCP connection: counts how well clients reuse connections
+        with self.server.owner._lock:
+            self.server.owner.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        server: "FakeOpenAIServer" = self.server.owner
+        rejected = server._admit()
+        if rejected:
+            self._send_error_reply(*rejected)
+            return
+
+        server._enter()
+        try:
+            prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []) if isinstance(m, dict))
+            # Time to first token
+            time.sleep(server.latency + server.latency_per_kchar * prompt_chars / 1000)
+            completion = server.build_completion(body)
+            if body.get("stream"):
+                self._stream(server, completion)
+                return
+            message = completion["choices"][0]["message"]
+            time.sleep(server.token_delay * len(_tokens(server.completion_text(message))))
+            payload = json.dumps(completion).encode("utf-8")
+        finally:
+            server._leave()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error_reply(self, status: int, retry_after: float = None):
+        payload = json.dumps({"error": {"message": "Rate limit exceeded" if status == 429 else "Server error",
+                                        "type": "rate_limit" if status == 429 else "server_error"}}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(max(1, round(retry_after))))
+            self.send_header("retry-after-ms", str(int(retry_after * 1000)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, server: "FakeOpenAIServer", completion: dict):
+        """Send the completion as `chat.completion.chunk` Server-Sent Events, one word-sized piece every `token_delay`."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        message = completion["choices"][0]["message"]
+        call = (message.get("tool_calls") or [None])[0]
+        for i, piece in enumerate(_tokens(server.completion_text(message))):
+            if i:
+                time.sleep(server.token_delay)
+            if call:
+                function = {"arguments": piece, **({"name": call["function"]["name"]} if i == 0 else {})}
+                delta = {"tool_calls": [{"index": 0, "function": function,
+                                         **({"id": call["id"], "type": "function"} if i == 0 else {})}]}
+            else:
+                delta = {"content": piece}
+            self._send_event({**completion, "object": "chat.completion.chunk",
+                              "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        self._send_event({**completion, "object": "chat.completion.chunk",
+                          "choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls" if call else "stop"}]})
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+    def _send_event(self, data: dict):
+        self._send_chunk(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+class _Server(ThreadingHTTPServer):
+    # socketserver's default listen backlog (5) drops SYNs when many clients connect at once: ~1 s retransmit stalls
+    request_queue_size = 256
+    daemon_threads = True
+
+# ========================================
+#    Fake OpenAI-compatible server
+# ========================================
+class FakeOpenAIServer:
+    """
+    Minimal OpenAI/Azure OpenAI compatible `/chat/completions` endpoint for benchmarks.
+    Every call sleeps `latency` seconds, plus `latency_per_kchar` per 1000 prompt characters
+    (to mimic long prompts being slower), before its first token, then `token_delay` per word-sized
+    piece of the completion; `stream: true` calls get the pieces as SSE chunks as they are "generated".
+    Forced tool calls are answered with dummy arguments generated from the tool's JSON schema
+    (strings are `reply_words` words long, "stub" by default), other calls with a short text.
+    Provider failures can be simulated: a `quota_rps` requests/second quota (1 s burst) answered with
+    429 + Retry-After beyond it, and a random `error_rate` share of 500 responses.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2, latency_per_kchar: float = 0.0,
+                 token_delay: float = 0.0, reply_words: int = 0, quota_rps: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.latency_per_kchar = latency_per_kchar
+        self.token_delay = token_delay
+        self.reply_words = reply_words
+        self.quota_rps = quota_rps
+        self.error_rate = error_rate
+        self._quota = quota_rps
+        self._quota_updated = time.monotonic()
+        self.throttled = 0
+        self.errors = 0
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.owner = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _enter(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _admit(self):
+        """None if the call is served, else (status, retry_after) of the simulated provider error."""
+        with self._lock:
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                return 500, None
+            if not self.quota_rps:
+                return None
+            now = time.monotonic()
+            self._quota = min(self.quota_rps, self._quota + (now - self._quota_updated) * self.quota_rps)
+            self._quota_updated = now
+            if self._quota < 1:
+                self.throttled += 1
+                return 429, (1 - self._quota) / self.quota_rps
+            self._quota -= 1
+            return None
+
+    def reset_stats(self):
+        with self._lock:
+            self.throttled = 0
+            self.errors = 0
+            self.requests = 0
+            self.connections = 0
+            self.max_in_flight = 0
+
+    @staticmethod
+    def completion_text(message: dict) -> str:
+        calls = message.get("tool_calls")
+        return calls[0]["function"]["arguments"] if calls else (message.get("content") or "")
+
+    def build_completion(self, body: dict) -> dict:
+        text = " ".join(f"word{i}" for i in range(self.reply_words)) if self.reply_words else "stub"
+        message = {"role": "assistant", "content": "stub reply" if not self.reply_words else text}
+        tool_choice = body.get("tool_choice")
+        tools = body.get("tools") or []
+        if tools and tool_choice and tool_choice != "none":
+            wanted = tool_choice.get("function", {}).get("name") if isinstance(tool_choice, dict) else None
+            tool = next((t for t in tools if t["function"]["name"] == wanted), tools[0])
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_stub",
+                    "type": "function",
+                    "function": {
+                        "name": tool["function"]["name"],
+                        "arguments": json.dumps(_fake_value(tool["function"].get("parameters", {}), text))
+                    }
+                }]
+            }
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible server")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--reply-words", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(port=args.port, latency=args.latency, token_delay=args.token_delay, reply_words=args.reply_words)
+    print(f"Fake OpenAI server listening on {server.url} (latency {args.latency}s)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,247 @@
+import threading
+import argparse
+
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+__all__ = ["FakeRedisServer"]
+
+# ========================================
+#    Commands
+# ========================================
+def _score(value: float) -> bytes:
+    return repr(float(value)).encode()
+
+class _Store:
+    """Keyspace of the stand-in: hashes, lists, sorted sets and strings, plus a write counter per key for WATCH."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.writes = {}
+
+    def touch(self, *keys) -> None:
+        for key in keys:
+            self.writes[key] = self.writes.get(key, 0) + 1
+
+    def run(self, name: str, args: list):
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return Exception(f"ERR unknown command '{name}'")
+        return handler(*args)
+
+    def cmd_ping(self, *args):
+        return "PONG"
+
+    def cmd_hset(self, key, *pairs):
+        value = self.data.setdefault(key, {})
+        added = sum(field not in value for field in pairs[::2])
+        value.update(zip(pairs[::2], pairs[1::2]))
+        self.touch(key)
+        return added
+
+    def cmd_hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def cmd_hmget(self, key, *fields):
+        value = self.data.get(key, {})
+        return [value.get(field) for field in fields]
+
+    def cmd_hgetall(self, key):
+        return [item for pair in self.data.get(key, {}).items() for item in pair]
+
+    def cmd_hdel(self, key, *fields):
+        value = self.data.get(key, {})
+        removed = sum(value.pop(field, None) is not None for field in fields)
+        if removed:
+            self.touch(key)
+        return removed
+
+    def cmd_rpush(self, key, *items):
+        value = self.data.setdefault(key, [])
+        value.extend(items)
+        self.touch(key)
+        return len(value)
+
+    def cmd_lrange(self, key, start, stop):
+        value = self.data.get(key, [])
+        start, stop = int(start), int(stop)
+        stop = len(value) if stop == -1 else stop + 1
+        return value[start:stop]
+
+    def cmd_ltrim(self, key, start, stop):
+        if key in self.data:
+            self.data[key] = self.cmd_lrange(key, start, stop)
+            self.touch(key)
+        return "OK"
+
+    def cmd_del(self, *keys):
+        removed = sum(self.data.pop(key, None) is not None for key in keys)
+        self.touch(*keys)
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def cmd_zadd(self, key, *args):
+        flags = set()
+        while args and args[0].upper() in (b"XX", b"NX", b"CH"):
+            flags.add(args[0].upper())
+            args = args[1:]
+        value = self.data.get(key, {})
+        changed = 0
+        for score, member in zip(args[::2], args[1::2]):
+            if (b"XX" in flags and member not in value) or (b"NX" in flags and member in value):
+                continue
+            changed += member not in value or (b"CH" in flags and value[member] != float(score))
+            value[member] = float(score)
+        if value:
+            self.data[key] = value
+            self.touch(key)
+        return changed
+
+    def cmd_zrem(self, key, *members):
+        value = self.data.get(key, {})
+        removed = sum(value.pop(member, None) is not None for member in members)
+        self.touch(key)
+        return removed
+
+    def cmd_zscore(self, key, member):
+        score = self.data.get(key, {}).get(member)
+        return None if score is None else _score(score)
+
+    def cmd_zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def cmd_zrange(self, key, start, stop, *options):
+        entries = sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        start, stop = int(start), int(stop)
+        entries = entries[start:len(entries) if stop == -1 else stop + 1]
+        if options and options[0].upper() == b"WITHSCORES":
+            return [item for member, score in entries for item in (member, _score(score))]
+        return [member for member, _ in entries]
+
+    def cmd_incrby(self, key, amount):
+        value = int(self.data.get(key, b"0")) + int(amount)
+        self.data[key] = str(value).encode()
+        self.touch(key)
+        return value
+
+    def cmd_get(self, key):
+        return self.data.get(key)
+
+# ========================================
+#    Connection handler (RESP2)
+# ========================================
+class _Handler(StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, Exception):
+            return b"-" + str(reply).encode() + b"\r\n"
+        if isinstance(reply, str):
+            return b"+" + reply.encode() + b"\r\n"
+        if isinstance(reply, bool) or isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+
+    def handle(self):
+        store = self.server.owner.store
+        watched, queued = {}, None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name = args[0].decode().upper()
+            with store.lock:
+                self.server.owner.commands += 1
+                if name in ("AUTH", "SELECT"):
+                    reply = "OK"
+                elif name == "WATCH":
+                    watched.update({key: store.writes.get(key, 0) for key in args[1:]})
+                    reply = "OK"
+                elif name == "UNWATCH":
+                    watched, reply = {}, "OK"
+                elif name == "MULTI":
+                    queued, reply = [], "OK"
+                elif name == "DISCARD":
+                    watched, queued, reply = {}, None, "OK"
+                elif name == "EXEC":
+                    if any(store.writes.get(key, 0) != version for key, version in watched.items()):
+                        reply = None
+                        self.server.owner.aborted += 1
+                    else:
+                        reply = [store.run(command[0].decode(), command[1:]) for command in queued]
+                    watched, queued = {}, None
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    reply = store.run(name, args[1:])
+            self.wfile.write(self._encode(reply))
+
+class _Server(ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 256
+
+# ========================================
+#    Stand-in Redis server
+# ========================================
+class FakeRedisServer:
+    """
+    In-process stand-in for Redis speaking RESP2, with the commands RedisSessionStore uses
+    (hashes, lists, sorted sets, INCRBY and WATCH / MULTI / EXEC). Usable as a context manager.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.store = _Store()
+        self.commands = 0
+        self.aborted = 0
+        self._server = _Server((host, port), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Redis server for SESSION_BACKEND=redis")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    with FakeRedisServer(port=args.port) as server:
+        print(f"Listening on {server.url}")
+        threading.Event().wait()
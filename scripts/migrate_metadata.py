@@ -0,0 +1,30 @@
+import os
+import sys
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.utilities.metadata_store import SqliteMetadataStore, migrate_csv_to_sqlite
+
+__all__ = []
+
+# Same schema as app/services/cv_service.py and job_description_service.py
+DATA_SCHEMA = ["id", "name", "uploadBy", "uploadDate"]
+LEGACY_FILES = {
+    "cv": os.path.join(PROJECT_ROOT, "data", "upload", "CV", "cv_file.csv"),
+    "jd": os.path.join(PROJECT_ROOT, "data", "upload", "JD", "jd_file.csv"),
+}
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="One-shot import of the legacy CV/JD metadata CSV files into SQLite")
+    parser.add_argument("--db", default=None, help="SQLite database path (default: METADATA_DB_PATH or data/metadata.db)")
+    args = parser.parse_args()
+
+    for table, csv_path in LEGACY_FILES.items():
+        store = SqliteMetadataStore(table, DATA_SCHEMA, db_path=args.db)
+        imported = migrate_csv_to_sqlite(csv_path, store)
+        print(f"{table}: {imported} rows imported from {csv_path} ({len(store.get_all())} rows in {store.db_path})")
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.utilities.id_allocator import FileCounterIdAllocator, SqliteSequenceIdAllocator, max_id_number
+
+__all__ = []
+
+# ========================================
+#    Stress test: parallel uploads across processes
+# ========================================
+def _build_allocator(backend: str, work_dir: str, upload_dir: str):
+    # Seeded like the services: from the files already in the upload directory
+    seed = lambda: max_id_number("CV", (name.rsplit(".", 1)[0] for name in os.listdir(upload_dir)))
+    if backend == "file":
+        return FileCounterIdAllocator("CV", os.path.join(work_dir, "cv_file.csv.cv_seq"), seed=seed)
+    return SqliteSequenceIdAllocator("CV", os.path.join(work_dir, "metadata.db"), seed=seed)
+
+def _upload_worker(args) -> list[str]:
+    """One 'uvicorn worker': several threads allocating ids and saving files the way cv_service.upload does."""
+    backend, work_dir, upload_dir, threads, uploads_per_thread = args
+    allocator = _build_allocator(backend, work_dir, upload_dir)
+
+    def upload(_):
+        ids = []
+        for _ in range(uploads_per_thread):
+            new_id = allocator.next_id()
+            # 'xb' raises FileExistsError if two uploads ever got the same id
+            with open(os.path.join(upload_dir, f"{new_id}.pdf"), "xb") as f:
+                f.write(b"%PDF-stub")
+            ids.append(new_id)
+        return ids
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return [new_id for ids in pool.map(upload, range(threads)) for new_id in ids]
+
+def _run(backend: str, processes: int, threads: int, uploads: int, preexisting: int) -> bool:
+    with tempfile.TemporaryDirectory() as work_dir:
+        upload_dir = os.path.join(work_dir, "CV")
+        os.makedirs(upload_dir)
+        for i in range(1, preexisting + 1):
+            open(os.path.join(upload_dir, f"CV-{i:03d}.json"), "w").close()
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            all_ids = [new_id for ids in pool.map(_upload_worker, [(backend, work_dir, upload_dir, threads, uploads)] * processes) for new_id in ids]
+        elapsed = time.perf_counter() - started
+
+        expected = processes * threads * uploads
+        numbers = sorted(int(new_id.split("-")[1]) for new_id in all_ids)
+        unique = len(set(all_ids)) == len(all_ids) == expected
+        contiguous = numbers == list(range(preexisting + 1, preexisting + expected + 1))
+        print(f"{backend:>7}: {expected} uploads from {processes} processes x {threads} threads in {elapsed:.2f}s "
+              f"-> unique={unique} contiguous={contiguous} last={max(all_ids, key=lambda i: int(i.split('-')[1]))}")
+        return unique and contiguous
+
+# ========================================
+#           Entry Point
+# ========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel upload stress test for the CV/JD id allocators")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--uploads", type=int, default=40, help="uploads per thread")
+    parser.add_argument("--preexisting", type=int, default=5, help="CV files already on disk before the test")
+    args = parser.parse_args()
+
+    results = [_run(backend, args.processes, args.threads, args.uploads, args.preexisting) for backend in ("file", "sqlite")]
+    if not all(results):
+        print("FAILED: duplicate or missing ids")
+        sys.exit(1)
+    print("OK: every id is unique")